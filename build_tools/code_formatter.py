@@ -42,6 +42,7 @@ except ImportError:
     # Python 2 fallback
     import __builtin__ as builtins
 import inspect
+import io
 import os
 import re
 
@@ -171,8 +172,9 @@ class code_formatter(metaclass=code_formatter_meta):
         self._data = []
 
     def write(self, *args):
-        f = open(os.path.join(*args), "w")
-        name, extension = os.path.splitext(f.name)
+        filename = os.path.join(*args)
+        name, extension = os.path.splitext(filename)
+        f = io.StringIO()
 
         # Add a comment to inform which file generated the generated file
         # to make it easier to backtrack and modify generated code
@@ -210,7 +212,18 @@ class code_formatter(metaclass=code_formatter_meta):
 
         for data in self._data:
             f.write(data)
-        f.close()
+
+        # Leave a file with the right contents untouched, so that what is
+        # built from it is not rebuilt.
+        contents = f.getvalue()
+        try:
+            with open(filename) as old:
+                if old.read() == contents:
+                    return
+        except (OSError, UnicodeDecodeError):
+            pass
+        with open(filename, "w") as new:
+            new.write(contents)
 
     def __str__(self):
         data = "".join(self._data)
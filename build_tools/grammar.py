@@ -25,9 +25,65 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
+import pickle
 
 import ply.lex
 import ply.yacc
+from parse_cache import (
+    cache_dir,
+    digest,
+)
+
+
+def grammar_digest(module):
+    """A digest of everything PLY builds the LR tables of ``module`` from:
+    the tokens, the precedence rules and the names and docstrings of the
+    rule functions."""
+    parts = [ply.yacc.__tabversion__]
+    for name in ("start", "precedence", "tokens"):
+        parts.append(repr(getattr(module, name, None)))
+    for name in sorted(dir(module)):
+        if name.startswith("p_") and name != "p_error":
+            parts += [name, getattr(module, name).__doc__]
+    return digest(*parts)
+
+
+def cached_yacc(module, **kwargs):
+    """ply.yacc.yacc() for ``module``, reusing the LR tables built by a
+    previous run for the same grammar, in any process.
+
+    The tables are pickled in the parser cache, under a digest of the
+    grammar. Building them is by far the most expensive part of setting up
+    a parser.
+    """
+    directory = cache_dir("tables")
+    if directory is None or "tabmodule" in kwargs or "picklefile" in kwargs:
+        return ply.yacc.yacc(module=module, **kwargs)
+
+    name = getattr(module, "__name__", type(module).__name__)
+    path = os.path.join(directory, f"{name}-{grammar_digest(module)}.pickle")
+    if os.path.exists(path):
+        try:
+            return ply.yacc.yacc(module=module, picklefile=path, **kwargs)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        writable = os.access(directory, os.W_OK)
+    except OSError:
+        writable = False
+    if not writable:
+        # e.g. without a writable home directory: build the parser uncached
+        return ply.yacc.yacc(module=module, **kwargs)
+    # write the tables aside, parallel builds may read them meanwhile
+    tmp = f"{path}.{os.getpid()}.tmp"
+    parser = ply.yacc.yacc(module=module, picklefile=tmp, **kwargs)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return parser
 
 
 class ParseError(Exception):
@@ -47,7 +103,7 @@ class Grammar:
             raise AttributeError("module is an illegal attribute")
 
         if "output" in kwargs:
-            dir, tab = os.path.split(output)
+            dir, tab = os.path.split(kwargs.pop("output"))
             if not tab.endswith(".py"):
                 raise AttributeError("The output file must end with .py")
             kwargs["outputdir"] = dir
@@ -60,6 +116,10 @@ class Grammar:
             self.lexers = []
             return self.lexers
 
+        if attr == "input_files":
+            self.input_files = []
+            return self.input_files
+
         if attr == "lex_kwargs":
             self.setupLexerFactory()
             return self.lex_kwargs
@@ -73,7 +133,7 @@ class Grammar:
             return self.lex
 
         if attr == "yacc":
-            self.yacc = ply.yacc.yacc(module=self, **self.yacc_kwargs)
+            self.yacc = cached_yacc(self, **self.yacc_kwargs)
             return self.yacc
 
         if attr == "current_lexer":
@@ -119,13 +179,14 @@ class Grammar:
         if isinstance(f, str):
             source = f
             f = open(f)
-        elif isinstance(f, file):
+        elif hasattr(f, "read"):
             source = f.name
         else:
             raise AttributeError(
                 "argument must be either a string or file, was '%s'" % type(f)
             )
 
+        self.input_files.append(os.path.abspath(source))
         return self.parse_string(f.read(), source, **kwargs)
 
     def p_error(self, t):
@@ -0,0 +1,198 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Caches of the parsers generating code at build time.
+
+Parsers built with PLY keep their LR tables here, so that the tables are
+only generated again when the grammar changes. The code generators built on
+top of them (the ISA parser and SLICC) keep their outputs here, so that an
+input which did not change since the last run, in this or any other build
+directory, is not parsed again.
+
+The caches live in M5_PARSER_CACHE, ~/.cache/gem5/parser by default. Setting
+it to "none" disables them. A cache which cannot be written to is skipped:
+the parsers then run uncached.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+
+def cache_dir(kind: str) -> Optional[str]:
+    """The directory of the ``kind`` cache, None if caching is disabled."""
+    directory = os.environ.get(
+        "M5_PARSER_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "gem5", "parser"),
+    )
+    if directory.lower() == "none":
+        return None
+    return os.path.join(directory, kind)
+
+
+def digest(*parts) -> str:
+    """A hex digest of the ``repr`` of ``parts``."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """The hex digest of the contents of ``path``, None if it is missing."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def python_sources(*paths: str) -> List[str]:
+    """The python files in ``paths``, walking the directories."""
+    sources = []
+    for path in paths:
+        if not os.path.isdir(path):
+            sources.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            sources += [
+                os.path.join(os.path.abspath(root), f)
+                for f in sorted(files)
+                if f.endswith(".py")
+            ]
+    return sources
+
+
+def module_sources(names: Iterable[str]) -> List[str]:
+    """The source files of the loaded modules called ``names``."""
+    sources = []
+    for name in names:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and path.endswith(".py"):
+            sources.append(os.path.abspath(path))
+    return sorted(sources)
+
+
+def read_outputs(directory: str, names: Iterable[str]) -> Dict[str, bytes]:
+    """The contents of the files ``names`` in ``directory``."""
+    outputs = {}
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def write_outputs(directory: str, outputs: Dict[str, bytes]) -> None:
+    """Write ``outputs`` into ``directory``. Files which already have the
+    right contents are left untouched, timestamp included."""
+    os.makedirs(directory, exist_ok=True)
+    for name, data in outputs.items():
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    continue
+        except OSError:
+            pass
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class ParseCache:
+    """The outputs of one run of a code generator.
+
+    An entry is found by its ``key``, which holds everything the outputs
+    depend on that is known before parsing: the generator's options and the
+    (flattened) input, or its path. It stays valid while every dependency
+    recorded when it was stored, e.g. the sources of the generator or the
+    files included by the input, keeps the contents it had then.
+
+    .. code-block:: python
+
+        cache = ParseCache("slicc", path)
+        outputs = cache.lookup()
+        if outputs is None:
+            outputs = generate(path)
+            cache.store(dependencies, outputs)
+    """
+
+    def __init__(self, kind: str, *key):
+        """
+        :param kind: Name of the generator, a directory of the cache.
+        :param key: Anything with a stable ``repr``.
+        """
+        directory = cache_dir(kind)
+        self.path = None
+        if directory is not None:
+            self.path = os.path.join(directory, digest(*key) + ".pickle")
+
+    def lookup(self) -> Optional[Dict[str, bytes]]:
+        """The outputs of the entry, None if there is no valid entry."""
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        for path, expected in entry["dependencies"].items():
+            if file_digest(path) != expected:
+                return None
+        return entry["outputs"]
+
+    def store(
+        self, dependencies: Iterable[str], outputs: Dict[str, bytes]
+    ) -> None:
+        """Store ``outputs``, valid until one of the ``dependencies`` (file
+        paths) changes."""
+        if self.path is None:
+            return
+        entry = {
+            "dependencies": {
+                os.path.abspath(path): file_digest(path)
+                for path in dependencies
+            },
+            "outputs": outputs,
+        }
+        # parallel builds may store the same entry concurrently
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except OSError:
+            # an unwritable cache only costs the next run a parse
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
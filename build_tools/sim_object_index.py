@@ -0,0 +1,150 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Generate the index of the names exported by every m5.objects module.
+
+m5.objects looks names up in this index to import only the modules which
+are used, rather than every module at startup. The names of a module are
+the names ``from module import *`` gives: its ``__all__`` if it is a literal
+list, else every public name bound at its top level, including in ``if`` and
+``try`` blocks. A name is indexed under the module defining it rather than
+the modules importing it, so that looking it up imports as little as
+possible. Names only bound by star imports cannot be found statically;
+m5.objects imports every module to look them up.
+"""
+
+import argparse
+import ast
+import sys
+
+from code_formatter import code_formatter
+
+parser = argparse.ArgumentParser()
+parser.add_argument("index_py", help="index file to generate")
+parser.add_argument(
+    "modules",
+    nargs="*",
+    help="MODPATH=FILE of each module, in the order they are embedded",
+)
+
+args = parser.parse_args()
+
+
+def _target_names(target):
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _target_names(element)
+    elif isinstance(target, ast.Starred):
+        yield from _target_names(target.value)
+
+
+def _bound_names(body):
+    """``(name, defined)`` for every name bound, where ``defined`` is False
+    for the names bound by imports."""
+    for node in body:
+        if isinstance(
+            node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+        ):
+            yield node.name, True
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                for name in _target_names(target):
+                    yield name, True
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            for name in _target_names(node.target):
+                yield name, True
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != "*":
+                    yield alias.asname or alias.name.split(".")[0], False
+        elif isinstance(node, ast.If):
+            yield from _bound_names(node.body)
+            yield from _bound_names(node.orelse)
+        elif isinstance(node, ast.Try):
+            yield from _bound_names(node.body)
+            for handler in node.handlers:
+                yield from _bound_names(handler.body)
+            yield from _bound_names(node.orelse)
+            yield from _bound_names(node.finalbody)
+        elif isinstance(node, (ast.For, ast.While, ast.With)):
+            if isinstance(node, ast.For):
+                for name in _target_names(node.target):
+                    yield name, True
+            yield from _bound_names(node.body)
+            yield from _bound_names(getattr(node, "orelse", []))
+
+
+def _explicit_all(tree):
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "__all__"
+        ):
+            try:
+                return list(ast.literal_eval(node.value))
+            except ValueError:
+                return None
+    return None
+
+
+def exported_names(path):
+    """``(name, defined)`` for every name the module exports."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    bound = {}
+    for name, defined in _bound_names(tree.body):
+        bound[name] = bound.get(name, False) or defined
+    names = _explicit_all(tree)
+    if names is None:
+        names = [name for name in bound if not name.startswith("_")]
+    return [(name, bound.get(name, False)) for name in names]
+
+
+defined = {}
+imported = {}
+for module in args.modules:
+    modpath, path = module.split("=", 1)
+    for name, is_defined in exported_names(path):
+        # like successive star imports, the last module exporting a name
+        # wins
+        (defined if is_defined else imported)[name] = modpath
+
+index = dict(imported)
+index.update(defined)
+
+code = code_formatter()
+code("index = {")
+code.indent()
+for name, modpath in index.items():
+    code(f"{name!r}: {modpath!r},")
+code.dedent()
+code("}")
+code.write(args.index_py)
@@ -174,10 +174,11 @@ if args.cmd:
     p = Process(pid=100)
     w = args.cmd.split(";")[0]
     pargs = args.opts.strip("\\").split()
-    # inputs = args.input.replace('"','').split()
     p.executable = w
     p.cmd = [w] + pargs
-    # p.inputs = [inputs]
+    # benchmarks like bwaves_r and roms_r read their input from stdin
+    if args.input:
+        p.input = args.input
 
     multiprocesses, numThreads = (p, 1)
 else:
@@ -168,10 +168,15 @@ if args.cmd:
         fatal(
             "mismatched cmd and argument string sizes! make sure there are an matching number of commands per set of args. if one of your commands requires no arguments, put a blank set with an extra semi-colon"
         )
+    # benchmarks like bwaves_r and roms_r read their input from stdin
+    inputs = args.input.split(";") if args.input else []
+
     for command, parg in zip(commands, pargs):
         p = Process(pid=100 + idx)
         p.executable = command
         p.cmd = [command] + [parg]
+        if len(inputs) > idx and inputs[idx]:
+            p.input = inputs[idx]
         multiprocesses.append(p)
         idx += 1
 
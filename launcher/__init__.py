@@ -0,0 +1 @@
+"""Shared building blocks for the ``run_*.py`` launchers in the repo root."""
@@ -0,0 +1,255 @@
+"""The SPEC CPU2017 rate benchmarks, as run by the ``run_*_spec.py``
+launchers.
+
+Every launcher used to carry its own copy of this list. Now it only picks
+the benchmarks it wants with ``select()`` and turns them into gem5 arguments
+with ``SpecBenchmark.gem5_args()``.
+
+A benchmark may override the launcher's instruction counts, e.g. to fast
+forward past a long initialization, and carries a relative cost. Both feed
+``SpecBenchmark.estimated_runtime()``, which orders the scheduler's first
+runs longest-first until its history has measured run times.
+"""
+
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+# defaults for benchmarks that do not set their own
+DEFAULT_FAST_FORWARD = 10000000
+DEFAULT_MAXINSTS = 250000000
+
+# Rough simulation rates in instructions per second, used to estimate the
+# run time of benchmarks the scheduler has no history for.
+FAST_FORWARD_RATE = 2000000  # atomic CPU
+DETAILED_RATE = 100000  # O3 CPU with caches
+
+
+@dataclass(frozen=True)
+class SpecBenchmark:
+    # Name of the benchmark, e.g. "mcf_r"
+    name: str
+    # Directory of the benchmark in the SPEC tree, e.g. "505.mcf_r"
+    directory: str
+    # Benchmark binary name, in the run directory
+    binary: str
+    # Options for the benchmark command
+    options: str = ""
+    # File fed to the benchmark's stdin, relative to the run directory
+    stdin: Optional[str] = None
+    # Instructions to fast forward and to simulate in detail. None means
+    # the launcher's default.
+    fast_forward: Optional[int] = None
+    maxinsts: Optional[int] = None
+    # Relative cost: how much slower than average this benchmark simulates,
+    # to scale the run time estimate
+    slowdown: float = 1.0
+
+    def run_dir(self, spec_root: str) -> str:
+        """The directory the benchmark must be run from."""
+        return (
+            f"{spec_root}/{self.directory}/run/run_base_train_main-m64.0000/"
+        )
+
+    def instructions(
+        self,
+        fast_forward: int = DEFAULT_FAST_FORWARD,
+        maxinsts: int = DEFAULT_MAXINSTS,
+    ) -> tuple:
+        """``(fast_forward, maxinsts)`` for this benchmark, falling back to
+        the given launcher defaults."""
+        return (
+            fast_forward if self.fast_forward is None else self.fast_forward,
+            maxinsts if self.maxinsts is None else self.maxinsts,
+        )
+
+    def gem5_args(
+        self,
+        fast_forward: int = DEFAULT_FAST_FORWARD,
+        maxinsts: int = DEFAULT_MAXINSTS,
+    ) -> List[str]:
+        """Workload arguments for the se_deriv.py configs."""
+        fast_forward, maxinsts = self.instructions(fast_forward, maxinsts)
+        # `=` keeps argparse from reading options starting with '-' as flags
+        args = ["--cmd", self.binary, f"--opts={self.options}"]
+        if self.stdin:
+            args.append(f"--input={self.stdin}")
+        args += ["--fast-forward", str(fast_forward)]
+        args += ["--maxinsts", str(maxinsts)]
+        return args
+
+    def estimated_runtime(
+        self,
+        fast_forward: int = DEFAULT_FAST_FORWARD,
+        maxinsts: int = DEFAULT_MAXINSTS,
+    ) -> float:
+        """A rough estimate of the simulation time in seconds."""
+        fast_forward, maxinsts = self.instructions(fast_forward, maxinsts)
+        return self.slowdown * (
+            fast_forward / FAST_FORWARD_RATE + maxinsts / DETAILED_RATE
+        )
+
+
+_BENCHMARKS = [
+    SpecBenchmark(
+        "perlbench_r",
+        "500.perlbench_r",
+        "perlbench_r_base.main-m64",
+        "-I./lib splitmail.pl 535 13 25 24 1091 1",
+    ),
+    SpecBenchmark(
+        "gcc_r",
+        "502.gcc_r",
+        "cpugcc_r_base.main-m64",
+        "train01.c -O3 -finline-limit=50000 -o train01.opts-O3_-finline-limit_50000.s",
+    ),
+    SpecBenchmark(
+        "bwaves_r",
+        "503.bwaves_r",
+        "bwaves_r_base.main-m64",
+        stdin="bwaves_1.in",
+        # skips reading and setting up the grid
+        fast_forward=50000000,
+        slowdown=3.0,
+    ),
+    SpecBenchmark(
+        "mcf_r",
+        "505.mcf_r",
+        "mcf_r_base.main-m64",
+        "inp.in",
+        slowdown=2.0,
+    ),
+    SpecBenchmark(
+        "cactuBSSN_r",
+        "507.cactuBSSN_r",
+        "cactusBSSN_r_base.main-m64",
+        "spec_train.par",
+        slowdown=1.5,
+    ),
+    SpecBenchmark(
+        "namd_r",
+        "508.namd_r",
+        "namd_r_base.main-m64",
+        "--input apoa1.input --iterations 7 --output apoa1.train.output",
+    ),
+    SpecBenchmark(
+        "povray_r",
+        "511.povray_r",
+        "povray_r_base.main-m64",
+        "SPEC-benchmark-train.ini",
+    ),
+    SpecBenchmark(
+        "lbm_r",
+        "519.lbm_r",
+        "lbm_r_base.main-m64",
+        "300 reference.dat 0 1",
+        slowdown=2.0,
+    ),
+    SpecBenchmark(
+        "omnetpp_r",
+        "520.omnetpp_r",
+        "omnetpp_r_base.main-m64",
+        "-c General -r 0",
+    ),
+    SpecBenchmark(
+        "wrf_r",
+        "521.wrf_r",
+        "wrf_r_base.main-m64",
+        "namelist.input",
+    ),
+    SpecBenchmark(
+        "xalancbmk_r",
+        "523.xalancbmk_r",
+        "cpuxalan_r_base.main-m64",
+        "allbooks.xml xalanc.xsl",
+    ),
+    SpecBenchmark(
+        "x264_r",
+        "525.x264_r",
+        "x264_r_base.main-m64",
+        "--dumpyuv 50 --frames 142 -o BuckBunny_New.264 BuckBunny.yuv 1280x720",
+    ),
+    SpecBenchmark(
+        "blender_r",
+        "526.blender_r",
+        "blender_r_base.main-m64",
+        "sh5_reduced.blend --render-output sh5_reduced_ --threads 1 -b -F RAWTGA -s 234 -e 234 -a",
+    ),
+    SpecBenchmark(
+        "cam4_r",
+        "527.cam4_r",
+        "cam4_r_base.main-m64",
+    ),
+    SpecBenchmark(
+        "deepsjeng_r",
+        "531.deepsjeng_r",
+        "deepsjeng_r_base.main-m64",
+        "train.txt",
+    ),
+    SpecBenchmark(
+        "imagick_r",
+        "538.imagick_r",
+        "imagick_r_base.main-m64",
+        "-limit disk 0 train_input.tga -resize 320x240 -shear 31 -edge 140 -negate -flop -resize 900x900 -edge 10 train_output.tga",
+    ),
+    SpecBenchmark(
+        "leela_r",
+        "541.leela_r",
+        "leela_r_base.main-m64",
+        "train.sgf",
+    ),
+    SpecBenchmark(
+        "nab_r",
+        "544.nab_r",
+        "nab_r_base.main-m64",
+        "gcn4dna 1850041461 300",
+    ),
+    SpecBenchmark(
+        "exchange2_r",
+        "548.exchange2_r",
+        "exchange2_r_base.main-m64",
+        "1",
+    ),
+    SpecBenchmark(
+        "fotonik3d_r",
+        "549.fotonik3d_r",
+        "fotonik3d_r_base.main-m64",
+        slowdown=1.5,
+    ),
+    SpecBenchmark(
+        "roms_r",
+        "554.roms_r",
+        "roms_r_base.main-m64",
+        stdin="ocean_benchmark1.in.x",
+        # skips reading the input and initializing the ocean model
+        fast_forward=50000000,
+        slowdown=2.5,
+    ),
+    SpecBenchmark(
+        "xz_r",
+        "557.xz_r",
+        "xz_r_base.main-m64",
+        "IMG_2560.cr2.xz 40 ec03e53b02deae89b6650f1de4bed76a012366fb3d4bdc791e8633d1a5964e03004523752ab008eff0d9e693689c53056533a05fc4b277f0086544c6c3cbbbf6 40822692 40824404 4",
+    ),
+]
+
+SPEC_BENCHMARKS: Dict[str, SpecBenchmark] = {b.name: b for b in _BENCHMARKS}
+
+
+def select(names: Optional[Iterable[str]] = None) -> List[SpecBenchmark]:
+    """The benchmarks called ``names``, in registry order. All of them if
+    ``names`` is empty or None."""
+    if not names:
+        return list(_BENCHMARKS)
+    names = set(names)
+    unknown = names - SPEC_BENCHMARKS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown benchmark(s) {sorted(unknown)}. "
+            f"Choose from {list(SPEC_BENCHMARKS)}"
+        )
+    return [b for b in _BENCHMARKS if b.name in names]
@@ -0,0 +1,349 @@
+"""A memory-aware scheduler for running many gem5 simulations on one host.
+
+Jobs are admitted while the host has enough available memory for them, based
+on a per-benchmark estimate of the peak RSS learned from previous runs. Jobs
+are started longest-expected-first, which shortens the makespan when a few
+benchmarks run much longer than the others. Peak RSS and run time of every
+finished job are written back to a small json history file.
+
+.. code-block:: python
+
+    scheduler = Scheduler()
+    scheduler.run([Job("mcf_r", "mcf_r", Command([...]), stdout="...")])
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+GiB = 2**30
+
+DEFAULT_HISTORY = "runs/.scheduler_history.json"
+
+# estimate for benchmarks never run before
+DEFAULT_MEM_ESTIMATE = 4 * GiB
+# memory left untouched for the rest of the system
+DEFAULT_HEADROOM = 2 * GiB
+# margin added to learned peak RSS estimates
+ESTIMATE_MARGIN = 1.1
+
+WAITING = "Waiting 🕑"
+RUNNING = "Running ⏳"
+DONE = "Done ✅"
+FAILED = "Failed ❌"
+CANCELLED = "Cancelled"
+
+
+class Command(NamedTuple):
+    """How to run a job: an argv list (no shell) and a working directory."""
+
+    argv: List[str]
+    cwd: Optional[str] = None
+
+
+def available_memory() -> int:
+    """Bytes of memory available to new processes (MemAvailable)."""
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("MemAvailable not found in /proc/meminfo")
+
+
+def process_rss(pid: int) -> int:
+    """Current resident set size of ``pid`` in bytes, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        benchmark: str,
+        command: Command,
+        stdout: Optional[str] = None,
+        stderr: Optional[str] = None,
+        on_finish: Optional[Callable[["Job"], None]] = None,
+        runtime_estimate: Optional[float] = None,
+    ):
+        """
+        :param name: Name shown in the status table.
+        :param benchmark: Key of the memory and run time estimates. Jobs of
+            the same benchmark are expected to behave alike.
+        :param command: What to run.
+        :param stdout: File to redirect stdout to. Inherited if not given.
+        :param stderr: File to redirect stderr to. Inherited if not given.
+        :param on_finish: Called with the job once it has finished.
+        :param runtime_estimate: Expected run time in seconds, used until the
+            history knows better.
+        """
+        self.name = name
+        self.benchmark = benchmark
+        self.command = command
+        self.stdout = stdout
+        self.stderr = stderr
+        self.on_finish = on_finish
+
+        self.state = WAITING
+        self.returncode = None
+        self.started = None
+        self.finished = None
+        # why the job could not be started, if it could not
+        self.error = None
+        self.peak_rss = 0
+        self.mem_estimate = 0
+        self.runtime_estimate = runtime_estimate
+        self._process = None
+        self._files = []
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def rss(self) -> int:
+        if self._process is None or self.finished is not None:
+            return self.peak_rss
+        return process_rss(self._process.pid)
+
+    def _start(self) -> None:
+        out = err = None
+        if self.stdout:
+            out = open(self.stdout, "wb")
+            self._files.append(out)
+        if self.stderr:
+            err = open(self.stderr, "wb")
+            self._files.append(err)
+        self.started = time.time()
+        self.state = RUNNING
+        self._process = subprocess.Popen(
+            self.command.argv, cwd=self.command.cwd, stdout=out, stderr=err
+        )
+
+    def _fail(self, error: Exception) -> None:
+        """Mark a job that could not be started as failed."""
+        self.finished = time.time()
+        if self.started is None:
+            self.started = self.finished
+        self.error = error
+        self.state = FAILED
+        for f in self._files:
+            f.close()
+
+    def _poll(self) -> bool:
+        """Reap the process if it exited. Returns whether it did."""
+        pid, status, rusage = os.wait4(self._process.pid, os.WNOHANG)
+        if pid == 0:
+            return False
+        self.finished = time.time()
+        self.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in KiB on Linux
+        self.peak_rss = rusage.ru_maxrss * 1024
+        self._process.returncode = self.returncode
+        self.state = DONE if self.returncode == 0 else FAILED
+        for f in self._files:
+            f.close()
+        return True
+
+    def _kill(self) -> None:
+        if self._process is not None and self.finished is None:
+            self._process.send_signal(signal.SIGTERM)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        history: str = DEFAULT_HISTORY,
+        headroom: int = DEFAULT_HEADROOM,
+        default_mem_estimate: int = DEFAULT_MEM_ESTIMATE,
+        poll_interval: float = 1.0,
+        show_status: bool = True,
+    ):
+        """
+        :param max_workers: Upper bound on concurrent jobs. Defaults to the
+            CPU count.
+        :param history: Json file holding the learned estimates.
+        :param headroom: Bytes of memory never handed out to jobs.
+        :param default_mem_estimate: Peak RSS assumed for benchmarks that are
+            not in the history yet.
+        :param poll_interval: Seconds between two scheduling decisions.
+        :param show_status: Keep a live status table on the terminal.
+        """
+        self.max_workers = max_workers or os.cpu_count()
+        self.history_file = history
+        self.headroom = headroom
+        self.default_mem_estimate = default_mem_estimate
+        self.poll_interval = poll_interval
+        self.show_status = show_status
+        self.history = self._load_history()
+        self._lines_drawn = 0
+
+    def _load_history(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.history_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_history(self) -> None:
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.history_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.history, f, indent=4, sort_keys=True)
+        os.replace(tmp, self.history_file)
+
+    def mem_estimate(self, benchmark: str) -> int:
+        entry = self.history.get(benchmark)
+        if entry and entry.get("peak_rss"):
+            return int(entry["peak_rss"] * ESTIMATE_MARGIN)
+        return self.default_mem_estimate
+
+    def runtime_estimate(self, benchmark: str) -> Optional[float]:
+        entry = self.history.get(benchmark)
+        if entry and entry.get("runtime"):
+            return entry["runtime"]
+        return None
+
+    def _record(self, job: Job) -> None:
+        entry = self.history.setdefault(job.benchmark, {})
+        # keep the largest peak seen, an under-estimate is what OOMs the host
+        entry["peak_rss"] = max(entry.get("peak_rss", 0), job.peak_rss)
+        if job.returncode == 0:
+            entry["runtime"] = job.elapsed
+        entry["runs"] = entry.get("runs", 0) + 1
+        self._save_history()
+
+    def _order(self, jobs: List[Job]) -> List[Job]:
+        """Longest expected first. Benchmarks without a known run time go
+        first, both because they may be long and to learn about them."""
+        for job in jobs:
+            job.mem_estimate = self.mem_estimate(job.benchmark)
+            learned = self.runtime_estimate(job.benchmark)
+            if learned is not None:
+                job.runtime_estimate = learned
+        return sorted(
+            jobs,
+            key=lambda j: (
+                j.runtime_estimate is not None,
+                -(j.runtime_estimate or 0),
+            ),
+        )
+
+    def _can_admit(self, job: Job, running: List[Job]) -> bool:
+        if not running:
+            # always make progress, even if the estimate exceeds the host
+            return True
+        if len(running) >= self.max_workers:
+            return False
+        # running jobs may not have reached their peak yet
+        reserved = sum(max(0, j.mem_estimate - j.rss) for j in running)
+        free = available_memory() - reserved - self.headroom
+        return job.mem_estimate <= free
+
+    def run(self, jobs: List[Job]) -> List[Job]:
+        """Run every job and return them, in scheduling order, once all have
+        finished. A job which cannot be started (e.g. a missing binary) is
+        marked as failed. If anything interrupts the scheduler, e.g. a
+        keyboard interrupt or an exception raised by an ``on_finish``
+        callback, the running jobs are terminated."""
+        waiting = self._order(list(jobs))
+        ordered = list(waiting)
+        running: List[Job] = []
+        try:
+            while waiting or running:
+                for job in list(running):
+                    if job._poll():
+                        running.remove(job)
+                        self._record(job)
+                        if job.on_finish is not None:
+                            job.on_finish(job)
+
+                # backfill: a job that does not fit may be passed by smaller
+                # ones further down the list
+                for job in list(waiting):
+                    if self._can_admit(job, running):
+                        waiting.remove(job)
+                        try:
+                            job._start()
+                        except Exception as e:
+                            print(
+                                f"❌ Could not start {job.name}: {e}",
+                                file=sys.stderr,
+                            )
+                            job._fail(e)
+                            if job.on_finish is not None:
+                                job.on_finish(job)
+                            continue
+                        running.append(job)
+
+                if self.show_status:
+                    self.print_status(ordered)
+                if waiting or running:
+                    time.sleep(self.poll_interval)
+        except BaseException as e:
+            if isinstance(e, KeyboardInterrupt):
+                print(
+                    "\n❌ Keyboard interrupt received, terminating running "
+                    "jobs...",
+                    file=sys.stderr,
+                )
+            for job in running:
+                job._kill()
+            for job in running:
+                job._process.wait()
+                job.state = CANCELLED
+            for job in waiting:
+                job.state = CANCELLED
+            raise
+        return ordered
+
+    def print_status(self, jobs: List[Job]) -> None:
+        """Redraw the status table in place."""
+        lines = [
+            f"{'Job':<30} | {'Status':<10} | {'Elapsed':>8} | "
+            f"{'RSS':>7} | {'Est. mem':>8} | {'Est. time':>9}"
+        ]
+        for job in jobs:
+            est_time = (
+                f"{job.runtime_estimate:0.0f}s"
+                if job.runtime_estimate is not None
+                else "?"
+            )
+            lines.append(
+                f"{job.name[:30]:<30} | {job.state:<10} | "
+                f"{job.elapsed:>7.0f}s | {job.rss / GiB:>5.1f}GB | "
+                f"{job.mem_estimate / GiB:>6.1f}GB | {est_time:>9}"
+            )
+        running = sum(1 for j in jobs if j.state == RUNNING)
+        lines.append(
+            f"running {running}/{self.max_workers}, "
+            f"available memory {available_memory() / GiB:0.1f}GB"
+        )
+        if self._lines_drawn:
+            # move the cursor back up to overwrite the previous table
+            print(f"\033[{self._lines_drawn}A", end="")
+        for line in lines:
+            print(f"{line}\033[K")
+        self._lines_drawn = len(lines)
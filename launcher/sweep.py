@@ -0,0 +1,321 @@
+"""Declarative parameter sweeps with per-point result caching.
+
+A sweep is the Cartesian product of a set of axes. Every point of the sweep
+is hashed (from its parameters only) into its own output directory, so the
+same point always lands in the same place. A point whose last run exited
+successfully with a complete ``stats.txt`` is never simulated again, which makes re-running a sweep after a
+crash or a single failed point resume where it left off.
+
+.. code-block:: python
+
+    sweep = Sweep(
+        "raven",
+        axes={
+            "benchmark": ["mm", "lfsr"],
+            "read_issue_latency": [0, 59, 160],
+        },
+        root="runs/raven/sweeps",
+    )
+    sweep.run(lambda point, outdir: Command([...], cwd=None))
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from itertools import product
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .scheduler import (
+    Command,
+    Job,
+    Scheduler,
+)
+
+STATS_FILE = "stats.txt"
+PARAMS_FILE = "params.json"
+STATUS_FILE = "status.json"
+STATS_END_MARKER = b"End Simulation Statistics"
+
+
+class SweepPoint:
+    """One combination of sweep parameters."""
+
+    def __init__(self, params: Mapping[str, Any]):
+        self.params = dict(params)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.params[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.params.get(name, default)
+
+    @property
+    def key(self) -> str:
+        """A stable hash of the parameters, used as the directory name."""
+        blob = json.dumps(self.params, sort_keys=True, default=str)
+        return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+    @property
+    def label(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.params.items())
+
+    def __repr__(self) -> str:
+        return f"SweepPoint({self.label})"
+
+
+def stats_complete(path: str) -> bool:
+    """Whether ``path`` is a stats.txt that gem5 finished writing, i.e. it
+    ends with the "End Simulation Statistics" banner of the last dump."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 256))
+            return STATS_END_MARKER in f.read()
+    except OSError:
+        return False
+
+
+class Sweep:
+    def __init__(
+        self,
+        name: str,
+        axes: Mapping[str, Sequence[Any]],
+        root: str = "runs",
+        fixed: Optional[Mapping[str, Any]] = None,
+    ):
+        """
+        :param name: Name of the sweep. Points live in ``<root>/<name>/``.
+        :param axes: Parameter name to the values it takes. A value may also
+            be a dict, whose items are merged into the point, to vary several
+            parameters together (e.g. a hash name and its latency).
+        :param root: Directory holding all sweeps.
+        :param fixed: Parameters shared by every point. They are part of the
+            hash, so changing them starts fresh points.
+        """
+        self.name = name
+        self.axes = {k: list(v) for k, v in axes.items()}
+        self.root = root
+        self.fixed = dict(fixed or {})
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(self.root, self.name)
+
+    def points(self) -> List[SweepPoint]:
+        points = []
+        for values in product(*self.axes.values()):
+            params = dict(self.fixed)
+            for axis, value in zip(self.axes, values):
+                if isinstance(value, Mapping):
+                    params.update(value)
+                else:
+                    params[axis] = value
+            points.append(SweepPoint(params))
+        return points
+
+    def point_dir(self, point: SweepPoint) -> str:
+        return os.path.join(self.directory, point.key)
+
+    def is_complete(self, point: SweepPoint) -> bool:
+        """Whether the last run of ``point`` exited with 0 and left a
+        complete stats.txt. gem5 writes the end banner after every dump, so
+        a run which crashed after dumping stats has the banner too."""
+        status = self.status(point)
+        return self._complete(point, status and status.get("returncode"))
+
+    def _complete(self, point: SweepPoint, returncode: Optional[int]) -> bool:
+        return returncode == 0 and stats_complete(
+            os.path.join(self.point_dir(point), STATS_FILE)
+        )
+
+    def pending(self) -> List[SweepPoint]:
+        """The points that still need to be simulated."""
+        return [p for p in self.points() if not self.is_complete(p)]
+
+    def status(self, point: SweepPoint) -> Optional[Dict[str, Any]]:
+        """The status recorded by the last run of ``point``, if any."""
+        try:
+            with open(os.path.join(self.point_dir(point), STATUS_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def prepare(self, point: SweepPoint) -> str:
+        """Create the output directory of ``point`` and record its
+        parameters there. Returns the directory."""
+        outdir = self.point_dir(point)
+        os.makedirs(outdir, exist_ok=True)
+        with open(os.path.join(outdir, PARAMS_FILE), "w") as f:
+            json.dump(point.params, f, indent=4, default=str)
+        return outdir
+
+    def record(
+        self,
+        point: SweepPoint,
+        command: Command,
+        returncode: int,
+        started: float,
+        elapsed: float,
+        peak_rss: Optional[int] = None,
+    ) -> None:
+        """Write how a run of ``point`` went to its ``status.json``."""
+        status = {
+            "returncode": returncode,
+            "complete": self._complete(point, returncode),
+            "started": started,
+            "elapsed": elapsed,
+            "peak_rss": peak_rss,
+            "argv": command.argv,
+            "cwd": command.cwd,
+        }
+        with open(os.path.join(self.point_dir(point), STATUS_FILE), "w") as f:
+            json.dump(status, f, indent=4)
+
+    def run_point(
+        self, point: SweepPoint, command: Command, redirect: bool = True
+    ) -> int:
+        """Run ``command`` for ``point`` in the calling thread and record how
+        it went in the point directory. Returns the exit code.
+
+        :param redirect: Write stdout/stderr to ``stdout``/``stderr`` files in
+            the point directory instead of the terminal.
+        """
+        outdir = self.prepare(point)
+        started = time.time()
+        if redirect:
+            with open(os.path.join(outdir, "stdout"), "wb") as out, open(
+                os.path.join(outdir, "stderr"), "wb"
+            ) as err:
+                result = subprocess.run(
+                    command.argv, cwd=command.cwd, stdout=out, stderr=err
+                )
+        else:
+            result = subprocess.run(command.argv, cwd=command.cwd)
+        self.record(
+            point, command, result.returncode, started, time.time() - started
+        )
+        return result.returncode
+
+    def job(
+        self,
+        point: SweepPoint,
+        command: Command,
+        redirect: bool = True,
+        benchmark_param: str = "benchmark",
+        runtime_estimate: Optional[float] = None,
+    ) -> Job:
+        """Wrap ``point`` into a scheduler job which records its status when
+        it finishes.
+
+        :param benchmark_param: The parameter whose value keys the memory and
+            run time estimates of the scheduler.
+        :param runtime_estimate: Expected run time in seconds, for points of
+            benchmarks the scheduler has no history for.
+        """
+        outdir = self.prepare(point)
+
+        def on_finish(job):
+            self.record(
+                point,
+                command,
+                job.returncode,
+                job.started,
+                job.elapsed,
+                job.peak_rss,
+            )
+
+        return Job(
+            f"{point.get(benchmark_param, self.name)} {point.key[:8]}",
+            str(point.get(benchmark_param, self.name)),
+            command,
+            stdout=os.path.join(outdir, "stdout") if redirect else None,
+            stderr=os.path.join(outdir, "stderr") if redirect else None,
+            on_finish=on_finish,
+            runtime_estimate=runtime_estimate,
+        )
+
+    def jobs(
+        self,
+        command: Callable[[SweepPoint, str], Command],
+        force: bool = False,
+    ) -> List[Tuple[SweepPoint, Command]]:
+        """Build the command of every point still to run (every point if
+        ``force``). ``command`` gets the point and its output directory."""
+        points = self.points() if force else self.pending()
+        return [(p, command(p, self.point_dir(p))) for p in points]
+
+    def write_manifest(self) -> None:
+        """Write ``sweep.json`` mapping every point directory to its
+        parameters, for the analysis scripts."""
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = {
+            "name": self.name,
+            "axes": self.axes,
+            "fixed": self.fixed,
+            "points": {p.key: p.params for p in self.points()},
+        }
+        with open(os.path.join(self.directory, "sweep.json"), "w") as f:
+            json.dump(manifest, f, indent=4, default=str)
+
+    def run(
+        self,
+        command: Callable[[SweepPoint, str], Command],
+        workers: Optional[int] = None,
+        force: bool = False,
+        dry_run: bool = False,
+        redirect: bool = True,
+        scheduler: Optional[Scheduler] = None,
+        runtime_estimate: Optional[Callable[[SweepPoint], float]] = None,
+    ) -> Dict[str, int]:
+        """Run every pending point and return the exit code per point key.
+
+        :param command: Builds the command of a point, given the point and
+            its output directory (pass it to gem5 as ``--outdir``).
+        :param workers: Upper bound on simulations run at the same time.
+        :param force: Also re-run the points that already completed.
+        :param dry_run: Only print what would run.
+        :param redirect: Write the output of each simulation to files in its
+            point directory instead of the terminal.
+        :param scheduler: The scheduler to run the points with. By default a
+            memory-aware ``Scheduler`` with ``workers`` slots.
+        :param runtime_estimate: Gives the expected run time of a point in
+            seconds, until the scheduler has learned it.
+        """
+        self.write_manifest()
+        jobs = self.jobs(command, force=force)
+        skipped = len(self.points()) - len(jobs)
+        print(
+            f"INFO: sweep '{self.name}': {len(jobs)} point(s) to run, "
+            f"{skipped} already complete"
+        )
+        if dry_run:
+            for point, cmd in jobs:
+                print(f"INFO: {point.label}: {' '.join(cmd.argv)}")
+            return {}
+
+        scheduler = scheduler or Scheduler(max_workers=workers)
+        keyed = {
+            point.key: self.job(
+                point,
+                cmd,
+                redirect,
+                runtime_estimate=runtime_estimate(point)
+                if runtime_estimate
+                else None,
+            )
+            for point, cmd in jobs
+        }
+        scheduler.run(list(keyed.values()))
+        return {key: job.returncode for key, job in keyed.items()}
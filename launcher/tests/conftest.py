@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The launcher package is imported from the repository root, e.g. by
+# run_all_spec.py.
+ROOT_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,33 @@
+import unittest
+
+from launcher.benchmarks import (
+    SPEC_BENCHMARKS,
+    SpecBenchmark,
+    select,
+)
+
+
+class SpecBenchmarkTestSuite(unittest.TestCase):
+    def test_overrides(self):
+        bench = SpecBenchmark("b", "1.b", "b", fast_forward=5, slowdown=2.0)
+        args = bench.gem5_args(fast_forward=1, maxinsts=100)
+        self.assertEqual(["--fast-forward", "5"], args[-4:-2])
+        # not overridden, the launcher's value is used
+        self.assertEqual(["--maxinsts", "100"], args[-2:])
+        self.assertEqual(
+            2 * SpecBenchmark("a", "1.a", "a").estimated_runtime(5, 100),
+            bench.estimated_runtime(1, 100),
+        )
+
+    def test_long_running_first(self):
+        estimates = {b.name: b.estimated_runtime() for b in select()}
+        longest = max(estimates, key=estimates.get)
+        self.assertEqual("bwaves_r", longest)
+        self.assertGreater(estimates["mcf_r"], estimates["xz_r"])
+
+    def test_select(self):
+        self.assertEqual(
+            ["mcf_r", "lbm_r"], [b.name for b in select(["lbm_r", "mcf_r"])]
+        )
+        self.assertEqual(list(SPEC_BENCHMARKS), [b.name for b in select()])
+        self.assertRaises(ValueError, select, ["nope_r"])
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from launcher.scheduler import Command
+from launcher.sweep import (
+    STATS_FILE,
+    Sweep,
+)
+
+STATS = (
+    "---------- Begin Simulation Statistics ----------\n"
+    "simTicks 100\n"
+    "---------- End Simulation Statistics   ----------\n"
+)
+
+
+class SweepTestSuite(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.sweep = Sweep("test", {"exit": [0, 1]}, root=directory.name)
+
+    def _run(self, point, stats=STATS):
+        """Run a fake simulation of ``point`` which writes ``stats`` and
+        exits with the point's exit code."""
+        outdir = self.sweep.prepare(point)
+        script = (
+            f"open({os.path.join(outdir, STATS_FILE)!r}, 'w')"
+            f".write({stats!r}); raise SystemExit({point['exit']})"
+        )
+        return self.sweep.run_point(
+            point, Command([sys.executable, "-c", script])
+        )
+
+    def test_complete(self):
+        ok, failed = self.sweep.points()
+        self.assertEqual(2, len(self.sweep.pending()))
+        self.assertEqual(0, self._run(ok))
+        self.assertTrue(self.sweep.is_complete(ok))
+        self.assertTrue(self.sweep.status(ok)["complete"])
+        self.assertEqual([failed.key], [p.key for p in self.sweep.pending()])
+
+    def test_failed_after_dump(self):
+        # the stats end with the banner, but gem5 failed afterwards
+        _, failed = self.sweep.points()
+        self.assertEqual(1, self._run(failed))
+        self.assertFalse(self.sweep.is_complete(failed))
+        self.assertFalse(self.sweep.status(failed)["complete"])
+        self.assertIn(failed.key, [p.key for p in self.sweep.pending()])
+
+    def test_incomplete_stats(self):
+        ok, _ = self.sweep.points()
+        self._run(ok, stats=STATS.splitlines(keepends=True)[0])
+        self.assertFalse(self.sweep.is_complete(ok))
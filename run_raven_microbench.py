@@ -1,31 +1,9 @@
 import argparse
-import concurrent.futures
 import os
-import pdb
-import subprocess
-import sys
-from datetime import datetime
-from itertools import product
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "--dry-run",
-    action="store_true",
-    default=False,
-    help="Dry run the command",
-)
-parser.add_argument(
-    "-b",
-    "--bench",
-    "--benchmark",
-    help="Benchmark to run. Without this, program runs all by default",
-)
-parser.add_argument(
-    "-r",
-    "--redirect",
-    action="store_true",
-    default=False,
-    help="Redirect output to file",
+from launcher.sweep import (
+    Command,
+    Sweep,
 )
 
 # Set up argument parser
@@ -47,8 +25,12 @@ parser.add_argument(
     default=False,
     help="Redirect output to file",
 )
-args = parser.parse_args()
-
+parser.add_argument(
+    "--force",
+    action="store_true",
+    default=False,
+    help="Re-run points of the sweep that already completed",
+)
 args = parser.parse_args()
 
 bin_path_base = "microbench/"
@@ -63,36 +45,60 @@ read_latencies = {
     "aes_256": 411 - 42 - 7,
 }
 
+# --bench takes a list of exact benchmark names
+selected = set(args.bench or binaries)
+unknown = selected - set(binaries)
+if unknown:
+    parser.error(
+        f"unknown benchmark(s) {sorted(unknown)}, choose from {binaries}"
+    )
+benchmarks = [b for b in binaries if b in selected]
 
-run_params = list(product(binaries, read_latencies))
-# print("Run Params", run_params)
+gem5_bin = "build/X86/gem5.debug"
+config_file = "configs/malware_detection/latest.py"
 
-session_dir = f"raven/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
-cmd_strs = []
-
-for bench in binaries:
-    for hash, latency in read_latencies.items():
-        output_dir = session_dir + f"/{bench}/{hash}"
-        rl_str = f"--read_latency {latency}"
-        cmd = f"build/X86/gem5.debug --outdir={output_dir}/ configs/malware_detection/latest.py {rl_str} --binary {bin_path_base + bench} --cache"
-        # if args.redirect:
-        #     cmd += f"1> {output_dir}/output.stdout 2> {output_dir}/output.stderr"
-        cmd_strs.append(cmd)
+# Points are stored by the hash of their parameters, so re-running this
+# script only simulates the points that did not complete yet.
+sweep = Sweep(
+    "microbench",
+    axes={
+        "benchmark": benchmarks,
+        # the hash name and its latency vary together
+        "hash": [
+            {"hash": name, "read_latency": latency}
+            for name, latency in read_latencies.items()
+        ],
+    },
+    root="runs/raven/sweeps",
+    fixed={"gem5_bin": gem5_bin, "config": config_file, "cache": True},
+)
 
 
-def execute(cmd_str):
-    print(cmd_str.split())
-    if args.dry_run:
-        return
-    result = subprocess.run(cmd_str, shell=True)
-    print("INFO: process exited with code", result.returncode)
+def build_command(point, outdir):
+    argv = [
+        gem5_bin,
+        f"--outdir={outdir}",
+        config_file,
+        "--read_latency",
+        str(point["read_latency"]),
+        "--binary",
+        bin_path_base + point["benchmark"],
+    ]
+    if point["cache"]:
+        argv.append("--cache")
+    return Command(argv)
 
 
-with concurrent.futures.ThreadPoolExecutor() as executor:
-    executor.map(execute, cmd_strs)
+results = sweep.run(
+    build_command,
+    workers=os.cpu_count(),
+    force=args.force,
+    dry_run=args.dry_run,
+    redirect=args.redirect,
+)
 
 print(f"INFO: Done running all benchmarks. Exiting.")
 print(
-    f"INFO: trace files are stored in {session_dir}. It is highly recommended to move them to a different location or rename the folder."
+    f"INFO: results are stored in {sweep.directory}. Points that completed are skipped when this script is re-run (use --force to re-run them)."
 )
-exit(0)
+exit(0 if all(code == 0 for code in results.values()) else 1)
@@ -37,6 +37,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import io
 import os
 import re
 import sys
@@ -46,11 +47,21 @@ import traceback
 from types import *
 
 from grammar import Grammar
+from parse_cache import (
+    ParseCache,
+    module_sources,
+    python_sources,
+    write_outputs,
+)
 
 from .operand_list import *
 from .operand_types import *
 from .util import *
 
+# Modules imported from here on may be imported by ISA descriptions, so
+# that the generated code depends on them.
+_preloaded_modules = set(sys.modules)
+
 debug = False
 
 ####################
@@ -504,6 +515,21 @@ class InstObjParams:
         self.destRegIdxPadding = padding
 
 
+class OutputFile(io.StringIO):
+    """An output file of the parser, kept in memory. Its contents are
+    recorded in ``outputs`` when it is closed."""
+
+    def __init__(self, outputs, name):
+        super().__init__()
+        self.outputs = outputs
+        self.name = name
+
+    def close(self):
+        if not self.closed:
+            self.outputs[self.name] = self.getvalue()
+        super().close()
+
+
 #######################
 #
 # ISA Parser
@@ -537,6 +563,11 @@ class ISAParser(Grammar):
         self.files = {}
         self.splits = {}
 
+        # Contents of the output files closed so far, by name. They are
+        # only written into output_dir once the whole description has been
+        # parsed.
+        self.outputs = {}
+
         # isa_name / namespace identifier from namespace declaration.
         # before the namespace declaration, None.
         self.isa_name = None
@@ -705,6 +736,8 @@ class ISAParser(Grammar):
 
                 fn = "decoder-ns.cc.inc"
                 assert fn in self.files
+                if splits > 1:
+                    fn = self.split_name(fn, i)
                 print("namespace gem5\n{\n", file=f)
                 print("namespace %s {" % self.namespace, file=f)
                 if splits > 1:
@@ -728,6 +761,8 @@ class ISAParser(Grammar):
 
                 fn = "exec-ns.cc.inc"
                 assert fn in self.files
+                if splits > 1:
+                    fn = self.split_name(fn, i)
                 print("namespace gem5\n{\n", file=f)
                 print("namespace %s {" % self.namespace, file=f)
                 if splits > 1:
@@ -736,6 +771,36 @@ class ISAParser(Grammar):
                 print("} // namespace %s" % self.namespace, file=f)
                 print("} // namespace gem5", file=f)
 
+    def split_name(self, name, i):
+        """The name of the file holding split ``i`` of file ``name``."""
+        return re.sub(r"(\.cc\.inc)$", r"-%d\1" % i, name)
+
+    # Once split, a file is cut into one file per split, which is only
+    # included by the source file compiling that split. A change to the
+    # code of some instructions then only rebuilds the objects of the
+    # splits holding them, rather than those of every split.
+    def split_outputs(self):
+        for name, f in self.files.items():
+            splits = self.splits.get(f, 1)
+            if splits == 1:
+                continue
+            contents = self.outputs.pop(name)
+
+            first = "#if !defined(__SPLIT) || (__SPLIT == 1)\n"
+            header, body = contents.split(first, 1)
+            opening = first
+            for i in range(1, splits + 1):
+                if i < splits:
+                    marker = "\n#endif\n#if __SPLIT == %u\n" % (i + 1)
+                    chunk, body = body.split(marker, 1)
+                    chunk += "\n#endif\n"
+                else:
+                    chunk = body
+                self.outputs[self.split_name(name, i)] = (
+                    header + opening + chunk
+                )
+                opening = "#if __SPLIT == %u\n" % (i + 1)
+
     scaremonger_template = """// DO NOT EDIT
 // This file was automatically generated from an ISA description:
 //   %(filename)s
@@ -938,6 +1003,7 @@ class ISAParser(Grammar):
         for f in self.files.values():  # close ALL the files;
             f.close()  # not doing so can cause compilation to fail
 
+        self.split_outputs()
         self.write_top_level_files()
 
         t[0] = True
@@ -1601,11 +1667,9 @@ StaticInstPtr
 
     def open(self, name, bare=False):
         """Open the output file for writing and include scary warning."""
-        filename = os.path.join(self.output_dir, name)
-        f = open(filename, "w")
-        if f:
-            if not bare:
-                f.write(ISAParser.scaremonger_template % self)
+        f = OutputFile(self.outputs, name)
+        if not bare:
+            f.write(ISAParser.scaremonger_template % self)
         return f
 
     def update(self, file, contents):
@@ -1679,14 +1743,41 @@ StaticInstPtr
         # do this up front.
         isa_desc = self.read_and_flatten(isa_desc_file)
 
+        # A previous run, of any build, may have generated the code of the
+        # same description already.
+        cache = ParseCache(
+            "isa_parser", self.filename, isa_desc, self.decoder_name
+        )
+        outputs = cache.lookup()
+        if outputs is not None:
+            write_outputs(self.output_dir, outputs)
+            ISAParser.AlreadyGenerated[isa_desc_file] = None
+            return
+
         # Initialize lineno tracker
         self.lex.lineno = LineTracker(isa_desc_file)
 
         # Parse.
         self.parse_string(isa_desc)
 
+        # Files whose contents did not change are not written again, so
+        # that the objects built from them are not rebuilt.
+        outputs = {
+            name: contents.encode() for name, contents in self.outputs.items()
+        }
+        write_outputs(self.output_dir, outputs)
+        cache.store(self.dependencies(), outputs)
         ISAParser.AlreadyGenerated[isa_desc_file] = None
 
+    def dependencies(self):
+        """The python sources the generated code depends on besides the
+        ISA description: those of the parser and those of the modules
+        imported by the description's code blocks."""
+        imported = set(sys.modules) - _preloaded_modules
+        return python_sources(os.path.dirname(__file__)) + module_sources(
+            imported | {"grammar"}
+        )
+
     def parse_isa_desc(self, *args, **kwargs):
         try:
             self._parse_isa_desc(*args, **kwargs)
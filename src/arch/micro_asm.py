@@ -32,10 +32,8 @@ import traceback
 # get type names
 from types import *
 
-from ply import (
-    lex,
-    yacc,
-)
+from grammar import cached_yacc
+from ply import lex
 
 ##########################################################################
 #
@@ -575,7 +573,7 @@ def p_error(t):
 class MicroAssembler:
     def __init__(self, macro_type, microops, rom=None, rom_macroop_type=None):
         self.lexer = lex.lex()
-        self.parser = yacc.yacc(write_tables=False)
+        self.parser = cached_yacc(sys.modules[__name__], write_tables=False)
         self.parser.macro_type = macro_type
         self.parser.macroops = {}
         self.parser.microops = microops
@@ -37,6 +37,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import multiprocessing
 import os.path
 import re
 import sys
@@ -46,6 +47,14 @@ from grammar import (
     Grammar,
     ParseError,
 )
+from parse_cache import (
+    ParseCache,
+    file_digest,
+    module_sources,
+    python_sources,
+    read_outputs,
+    write_outputs,
+)
 
 import slicc.ast as ast
 import slicc.util as util
@@ -82,8 +91,76 @@ class SLICC(Grammar):
     def process(self):
         self.decl_list.generate()
 
-    def writeCodeFiles(self, code_path, includes):
-        self.symtab.writeCodeFiles(code_path, includes)
+    def machines(self):
+        """The machine declarations, by machine name."""
+        return {
+            decl.ident: decl
+            for decl in self.decl_list.decls
+            if isinstance(decl, ast.MachineAST)
+        }
+
+    def writeCodeFiles(self, code_path, includes, jobs=1):
+        """Write the code of the protocol into ``code_path``.
+
+        The code of a machine only depends on the files its declarations
+        come from and on the files declaring anything outside of machines.
+        The code of a machine for which none of these files changed since a
+        previous run is taken from the parser cache. The code of the others
+        is generated by up to ``jobs`` worker processes.
+        """
+        self.symtab.writeCommonCodeFiles(code_path, includes)
+
+        machines = self.machines()
+        sources = slicc_sources()
+        common = {
+            decl.location.filename
+            for decl in self.decl_list.decls
+            if not isinstance(decl, ast.MachineAST)
+        }
+        caches = {}
+        stale = []
+        for name, machine in machines.items():
+            files = {machine.location.filename} | {
+                decl.location.filename for decl in machine.decls.decls
+            }
+            inputs = sorted(os.path.abspath(f) for f in common | files)
+            caches[name] = ParseCache(
+                "slicc_machines",
+                self.protocol,
+                sorted(machines),
+                name,
+                includes,
+                sources,
+                [(f, file_digest(f)) for f in inputs],
+            )
+            outputs = caches[name].lookup()
+            if outputs is None:
+                stale.append(name)
+            else:
+                write_outputs(code_path, outputs)
+
+        if jobs > 1 and len(stale) > 1:
+            # The workers are forked to inherit the processed protocol,
+            # which could not be sent to them otherwise.
+            global _generating
+            _generating = self
+            context = multiprocessing.get_context("fork")
+            with context.Pool(min(jobs, len(stale))) as pool:
+                pool.map(
+                    _write_machine,
+                    [(code_path, includes, name) for name in stale],
+                    chunksize=1,
+                )
+            _generating = None
+        else:
+            for name in stale:
+                self.symtab.writeMachineCodeFiles(code_path, includes, name)
+
+        for name in stale:
+            caches[name].store(
+                sources,
+                read_outputs(code_path, sorted(machines[name].files())),
+            )
 
     def writeHTMLFiles(self, html_path):
         self.symtab.writeHTMLFiles(html_path)
@@ -823,3 +900,61 @@ class SLICC(Grammar):
     def p_var(self, p):
         "var : ident"
         p[0] = ast.VarExprAST(self, p[1])
+
+
+# The protocol whose machines are being generated by worker processes.
+_generating = None
+
+
+def _write_machine(args):
+    code_path, includes, name = args
+    _generating.symtab.writeMachineCodeFiles(code_path, includes, name)
+
+
+def slicc_sources():
+    """The python sources the generated code depends on."""
+    slicc_dir = os.path.dirname(os.path.abspath(__file__))
+    return python_sources(slicc_dir) + module_sources(
+        ["code_formatter", "grammar"]
+    )
+
+
+def generate(
+    filename,
+    base_dir,
+    code_path,
+    includes,
+    html_path=None,
+    jobs=1,
+    **kwargs,
+):
+    """Parse the protocol described by ``filename``, write its code into
+    ``code_path`` (and its html into ``html_path``) and return the names of
+    the code files.
+
+    The code written by a previous run, of any build, is reused without
+    parsing anything as long as the protocol files and SLICC itself did
+    not change. The html is not cached.
+
+    :param jobs: Number of processes generating the code of machines.
+    :param kwargs: Passed on to ``SLICC``.
+    """
+    cache = ParseCache(
+        "slicc", os.path.abspath(filename), os.path.abspath(base_dir), includes
+    )
+    outputs = cache.lookup() if html_path is None else None
+    if outputs is not None:
+        write_outputs(code_path, outputs)
+        return sorted(outputs)
+
+    slicc = SLICC(filename, base_dir, **kwargs)
+    slicc.process()
+    slicc.writeCodeFiles(code_path, includes, jobs)
+    if html_path is not None:
+        slicc.writeHTMLFiles(html_path)
+
+    files = sorted(slicc.files())
+    cache.store(
+        slicc.input_files + slicc_sources(), read_outputs(code_path, files)
+    )
+    return files
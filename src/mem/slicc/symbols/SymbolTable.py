@@ -133,7 +133,31 @@ class SymbolTable:
             if isinstance(symbol, type):
                 yield symbol
 
+    def machineOf(self, symbol):
+        """The name of the machine ``symbol`` belongs to, None if it is
+        common to all machines."""
+        if isinstance(symbol, StateMachine):
+            return str(symbol)
+        if isinstance(symbol, Type) and symbol.machine is not None:
+            return str(symbol.machine)
+        return None
+
     def writeCodeFiles(self, path, includes):
+        self.writeCommonCodeFiles(path, includes)
+        for machine in self.getAllType(StateMachine):
+            self.writeMachineCodeFiles(path, includes, str(machine))
+
+    def writeMachineCodeFiles(self, path, includes, machine):
+        """Write the code of the machine called ``machine``, including
+        the types declared in it."""
+        makeDir(path)
+        for symbol in self.sym_vec:
+            if self.machineOf(symbol) == machine:
+                symbol.writeCodeFiles(path, includes)
+
+    def writeCommonCodeFiles(self, path, includes):
+        """Write the code of the symbols which do not belong to any
+        machine."""
         makeDir(path)
 
         code = self.codeFormatter()
@@ -148,7 +172,8 @@ class SymbolTable:
         code.write(path, "Types.hh")
 
         for symbol in self.sym_vec:
-            symbol.writeCodeFiles(path, includes)
+            if self.machineOf(symbol) is None:
+                symbol.writeCodeFiles(path, includes)
 
     def writeHTMLFiles(self, path):
         makeDir(path)
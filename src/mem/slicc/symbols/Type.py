@@ -67,6 +67,8 @@ class Type(Symbol):
         super().__init__(table, ident, location, pairs)
         self.c_ident = ident
         self.abstract_ident = ""
+        # the machine the type is declared in, if any
+        self.machine = machine
         if machine:
             if self.isExternal or self.isPrimitive:
                 if "external_name" in self:
@@ -92,12 +92,15 @@ bool
 EmbeddedPython::addModule() const
 {
     auto importer = py::module_::import("importer");
-    importer.attr("add_module")(abspath, modpath, getCode());
+    // Most embedded modules are never imported, so their code is only
+    // uncompressed and unmarshalled by the importer when they are.
+    importer.attr("add_module")(abspath, modpath,
+            py::cpp_function([this]() { return getCode(); }));
     return true;
 }
 
 /*
- * Load and initialize all of the python parts of M5.
+ * Register all of the python parts of M5 with the importer.
  */
 int
 EmbeddedPython::initAll()
@@ -26,11 +26,15 @@
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import (
     Dict,
+    Iterable,
     List,
     Optional,
+    Tuple,
+    Union,
 )
 
 from m5.util import (
@@ -43,6 +47,10 @@ from _m5 import core
 from gem5.gem5_default_config import config
 
 from .client_api.client_wrapper import ClientWrapper
+from .client_api.metadata_cache import (
+    DEFAULT_TTL,
+    MetadataCache,
+)
 
 
 def getFileContent(file_path: Path) -> Dict:
@@ -63,6 +71,34 @@ def getFileContent(file_path: Path) -> Dict:
 clientwrapper = None
 
 
+def _get_metadata_cache() -> Optional[MetadataCache]:
+    """
+    The cache of the resources metadata fetched by the clients, as set by
+    these environment variables:
+
+    * ``GEM5_RESOURCE_METADATA_CACHE``: The directory of the cache,
+      ``~/.cache/gem5/metadata`` by default. ``none`` disables the cache.
+    * ``GEM5_RESOURCE_METADATA_TTL``: The number of seconds cached metadata
+      is used for before it is revalidated. 3600 by default.
+    * ``GEM5_RESOURCE_OFFLINE``: If ``1``, the metadata is only read from the
+      cache and the sources are never contacted.
+    """
+    directory = os.environ.get(
+        "GEM5_RESOURCE_METADATA_CACHE",
+        os.path.join(Path.home(), ".cache", "gem5", "metadata"),
+    )
+    offline = os.environ.get("GEM5_RESOURCE_OFFLINE", "0") == "1"
+    if directory.lower() == "none":
+        if offline:
+            raise Exception(
+                "GEM5_RESOURCE_OFFLINE requires the resources metadata "
+                "cache, but GEM5_RESOURCE_METADATA_CACHE is 'none'."
+            )
+        return None
+    ttl = float(os.environ.get("GEM5_RESOURCE_METADATA_TTL", DEFAULT_TTL))
+    return MetadataCache(directory, ttl=ttl, offline=offline)
+
+
 def _get_clientwrapper():
     global clientwrapper
     if clientwrapper is None:
@@ -125,7 +161,7 @@ def _get_clientwrapper():
                 f"Appending resources from {os.environ['GEM5_RESOURCE_JSON_APPEND']}"
             )
 
-        clientwrapper = ClientWrapper(gem5_config)
+        clientwrapper = ClientWrapper(gem5_config, _get_metadata_cache())
     return clientwrapper
 
 
@@ -167,3 +203,105 @@ def get_resource_json_obj(
     return _get_clientwrapper().get_resource_json_obj_from_client(
         resource_id, resource_version, clients, gem5_version
     )
+
+
+def _dependencies(resource_json: Dict) -> List[Tuple[str, str]]:
+    """The resources a suite or a workload is made of."""
+    if resource_json["category"] == "suite":
+        return [
+            (workload["id"], workload["resource_version"])
+            for workload in resource_json["workloads"]
+        ]
+    if resource_json["category"] == "workload":
+        return [
+            (value["id"], value["resource_version"])
+            for value in resource_json.get("resources", {}).values()
+        ]
+    return []
+
+
+def prefetch(
+    resource_ids: Iterable[Union[str, Tuple[str, str]]],
+    resource_directory: Optional[str] = None,
+    clients: Optional[List[str]] = None,
+    gem5_version: Optional[str] = core.gem5Version,
+    workers: int = 4,
+    quiet: bool = True,
+) -> Dict[str, str]:
+    """
+    Obtain many resources at once, e.g., before launching a sweep. The
+    metadata of the resources is fetched, and the resources are downloaded,
+    concurrently. The suites and workloads given are expanded into the
+    resources they are made of.
+
+    Once done, ``obtain_resource`` finds the resources in the resource
+    directory, and their metadata in the metadata cache (see
+    ``_get_metadata_cache``), which also allows running offline.
+
+    :param resource_ids: The resources, as IDs or as ``(id, version)``
+                         tuples.
+    :param resource_directory: The directory the resources are downloaded
+                               to. As for ``obtain_resource``, it defaults to
+                               ``GEM5_RESOURCE_DIR`` or ``~/.cache/gem5``.
+    :param clients: The list of clients to query.
+    :param gem5_version: The gem5 version of the resources to get.
+    :param workers: The number of requests and downloads run at once.
+    :param quiet: If ``True``, suppress the download messages.
+
+    :return: The local path of every resource downloaded, by resource ID.
+    """
+    # imported here, as both modules import this one
+    from .downloader import get_resource
+    from .resource import _get_default_resource_dir
+
+    if resource_directory is None:
+        resource_directory = os.getenv(
+            "GEM5_RESOURCE_DIR", _get_default_resource_dir()
+        )
+
+    def resolve(request: Tuple[str, Optional[str]]) -> Dict:
+        return get_resource_json_obj(
+            request[0],
+            resource_version=request[1],
+            clients=clients,
+            gem5_version=gem5_version,
+        )
+
+    requested = set()
+    pending = [
+        (request, None) if isinstance(request, str) else tuple(request)
+        for request in resource_ids
+    ]
+    to_download = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending:
+            pending = [r for r in dict.fromkeys(pending) if r not in requested]
+            requested.update(pending)
+            dependencies = []
+            for resource_json in pool.map(resolve, pending):
+                if resource_json.get("url"):
+                    to_download[resource_json["id"]] = resource_json
+                dependencies.extend(_dependencies(resource_json))
+            pending = dependencies
+
+        if to_download:
+            os.makedirs(resource_directory, exist_ok=True)
+        paths = {
+            resource_id: os.path.join(resource_directory, resource_id)
+            for resource_id in to_download
+        }
+        downloads = [
+            pool.submit(
+                get_resource,
+                resource_name=resource_id,
+                to_path=paths[resource_id],
+                resource_version=resource_json["resource_version"],
+                clients=clients,
+                gem5_version=gem5_version,
+                quiet=quiet,
+            )
+            for resource_id, resource_json in to_download.items()
+        ]
+        for download in downloads:
+            download.result()
+    return paths
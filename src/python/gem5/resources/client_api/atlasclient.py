@@ -44,6 +44,7 @@ from urllib import (
 from m5.util import warn
 
 from .abstract_client import AbstractClient
+from .metadata_cache import MetadataCache
 
 
 class AtlasClientHttpJsonRequestError(Exception):
@@ -73,14 +74,19 @@ class AtlasClientHttpJsonRequestError(Exception):
 
 
 class AtlasClient(AbstractClient):
-    def __init__(self, config: Dict[str, str]):
+    def __init__(
+        self, config: Dict[str, str], cache: Optional[MetadataCache] = None
+    ):
         """
         Initializes a connection to a MongoDB Atlas database.
 
         :param uri: The URI for connecting to the MongoDB server.
         :param db: The name of the database to connect to.
         :param collection: The name of the collection within the database.
+        :param cache: Where to cache the results of the queries. If ``None``,
+                      every query is sent to the database.
         """
+        self.cache = cache
         self.apiKey = config["apiKey"]
         self.url = config["url"]
         self.collection = config["collection"]
@@ -174,17 +180,29 @@ class AtlasClient(AbstractClient):
         if filter:
             data["filter"] = filter
 
-        headers = {
-            "Authorization": f"Bearer {self.get_token()}",
-            "Content-Type": "application/json",
-        }
-
-        resources = self._atlas_http_json_req(
-            url,
-            data_json=data,
-            headers=headers,
-            purpose_of_request="Get Resources",
-        )["documents"]
+        def fetch(etag: Optional[str]) -> Tuple[List[Dict[str, Any]], None]:
+            headers = {
+                "Authorization": f"Bearer {self.get_token()}",
+                "Content-Type": "application/json",
+            }
+            return (
+                self._atlas_http_json_req(
+                    url,
+                    data_json=data,
+                    headers=headers,
+                    purpose_of_request="Get Resources",
+                )["documents"],
+                None,
+            )
+
+        if self.cache is None:
+            resources, _ = fetch(None)
+        else:
+            # The Data API has no ETags, entries are only refreshed after
+            # their TTL.
+            resources = self.cache.get(
+                f"atlas:{url}:{json.dumps(data, sort_keys=True)}", fetch
+            )
 
         # I do this as a lazy post-processing step because I can't figure out
         # how to do this via an Atlas query, which may be more efficient.
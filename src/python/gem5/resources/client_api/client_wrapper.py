@@ -39,10 +39,17 @@ from _m5 import core
 
 from .atlasclient import AtlasClient
 from .jsonclient import JSONClient
+from .metadata_cache import MetadataCache
 
 
 class ClientWrapper:
-    def __init__(self, config):
+    def __init__(self, config, cache: Optional[MetadataCache] = None):
+        """
+        :param config: The sources of resources.
+        :param cache: Where the clients cache the resources metadata they
+                      fetch. If ``None``, nothing is cached.
+        """
+        self.cache = cache
         self.clients = self.create_clients(config)
 
     def create_clients(
@@ -62,9 +69,11 @@ class ClientWrapper:
             client_source = config["sources"][client]
             try:
                 if client_source["isMongo"]:
-                    clients[client] = AtlasClient(client_source)
+                    clients[client] = AtlasClient(client_source, self.cache)
                 else:
-                    clients[client] = JSONClient(client_source["url"])
+                    clients[client] = JSONClient(
+                        client_source["url"], self.cache
+                    )
             except Exception as e:
                 warn(f"Error creating client {client}: {str(e)}")
         return clients
@@ -36,22 +36,29 @@ from typing import (
     Union,
 )
 from urllib import request
-from urllib.error import URLError
+from urllib.error import (
+    HTTPError,
+    URLError,
+)
 
 from m5.util import warn
 
 from .abstract_client import AbstractClient
+from .metadata_cache import MetadataCache
 
 
 class JSONClient(AbstractClient):
-    def __init__(self, path: str):
+    def __init__(self, path: str, cache: Optional[MetadataCache] = None):
         """
         Initializes a JSON client.
 
         :param path: The path to the Resource, either URL or local.
+        :param cache: Where to cache the resources fetched from a URL. If
+                      ``None``, they are fetched every time.
         """
         self.path = path
         self.resources = []
+        self._by_id = None
 
         if Path(self.path).is_file():
             self.resources = json.load(open(self.path))
@@ -59,15 +66,37 @@ class JSONClient(AbstractClient):
             raise Exception(
                 f"Resources location '{self.path}' is not a valid path or URL."
             )
+        elif cache is None:
+            self.resources, _ = self._fetch(None)
         else:
-            req = request.Request(self.path)
-            try:
-                response = request.urlopen(req)
-            except URLError as e:
-                raise Exception(
-                    f"Unable to open Resources location '{self.path}': {e}"
-                )
-            self.resources = json.loads(response.read().decode("utf-8"))
+            self.resources = cache.get(f"json:{self.path}", self._fetch)
+
+    def _fetch(
+        self, etag: Optional[str]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Downloads the resources, unless they still have the ETag
+        ``etag``. Returns the resources, ``None`` if they did not change, and
+        their ETag."""
+        req = request.Request(self.path)
+        if etag:
+            req.add_header("If-None-Match", etag)
+        try:
+            response = request.urlopen(req)
+        except HTTPError as e:
+            if e.code == 304:
+                return None, etag
+            raise Exception(
+                f"Unable to open Resources location '{self.path}': {e}"
+            )
+        except URLError as e:
+            raise Exception(
+                f"Unable to open Resources location '{self.path}': {e}"
+            )
+        headers = getattr(response, "headers", None)
+        return (
+            json.loads(response.read().decode("utf-8")),
+            headers.get("ETag") if headers is not None else None,
+        )
 
     def get_resources_json(self) -> List[Dict[str, Any]]:
         """Returns a JSON representation of the resources."""
@@ -81,11 +110,14 @@ class JSONClient(AbstractClient):
     ) -> List[Dict[str, Any]]:
         filter = self.resources  # Unfiltered.
         if resource_id:
-            filter = [  # Filter by resource_id.
-                resource
-                for resource in filter
-                if resource["id"] == resource_id
-            ]
+            if self._by_id is None:
+                # Index the resources by ID, rather than going through all of
+                # them for every resource obtained.
+                self._by_id = {}
+                for resource in self.resources:
+                    self._by_id.setdefault(resource["id"], []).append(resource)
+            # Filter by resource_id.
+            filter = list(self._by_id.get(resource_id, []))
             if resource_version:
                 filter = [  # Filter by resource_version.
                     resource
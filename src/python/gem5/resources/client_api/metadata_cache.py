@@ -0,0 +1,150 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from m5.util import warn
+
+# Seconds during which cached metadata is used without asking the source
+DEFAULT_TTL = 3600
+
+
+class MetadataCache:
+    """
+    An on-disk cache of the metadata returned by the resources clients, so
+    that the many gem5 instances of a sweep do not all send the same
+    requests.
+
+    Entries younger than ``ttl`` are used as they are. Older entries are
+    revalidated with the source, using the ETag of the entry when the
+    source provides one, and are still used if the source cannot be reached.
+    In offline mode the source is never contacted.
+    """
+
+    def __init__(
+        self, directory: str, ttl: float = DEFAULT_TTL, offline: bool = False
+    ):
+        """
+        :param directory: The directory in which the entries are stored.
+        :param ttl: The number of seconds an entry is used for before it is
+                    revalidated.
+        :param offline: Only serve the metadata from the cache.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """The entry cached for ``key``, or ``None``."""
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        return entry
+
+    def store(self, key: str, data: Any, etag: Optional[str] = None) -> None:
+        """Cache ``data`` for ``key``, as fetched now."""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        entry = {
+            "key": key,
+            "fetched": time.time(),
+            "etag": etag,
+            "data": data,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            # the cache only saves requests, the metadata is still valid
+            warn(f"Could not cache resources metadata in '{path}': {e}")
+
+    def get(
+        self,
+        key: str,
+        fetch: Callable[[Optional[str]], Tuple[Any, Optional[str]]],
+    ) -> Any:
+        """
+        The metadata for ``key``, from the cache if it is fresh, else from
+        ``fetch``.
+
+        :param key: Identifies the request, e.g., the URL and the query.
+        :param fetch: Fetches the metadata from the source. It is passed the
+                      ETag of the cached entry, or ``None``, and returns the
+                      metadata and its new ETag. The metadata is ``None`` if
+                      the source says the cached entry is still valid.
+        """
+        entry = self.load(key)
+        if entry is not None and (
+            self.offline or time.time() - entry["fetched"] < self.ttl
+        ):
+            return entry["data"]
+        if self.offline:
+            raise Exception(
+                f"The resources metadata for '{key}' is not cached and gem5 "
+                "resources are in offline mode. Run once online (e.g., with "
+                "`gem5.resources.client.prefetch`) to cache it."
+            )
+
+        try:
+            data, etag = fetch(None if entry is None else entry["etag"])
+        except Exception as e:
+            if entry is None:
+                raise
+            age = time.time() - entry["fetched"]
+            warn(
+                f"Could not refresh the resources metadata for '{key}', "
+                f"using the copy cached {age:.0f} seconds ago:\n{e}"
+            )
+            return entry["data"]
+
+        if data is None:
+            # not modified
+            data = entry["data"]
+            etag = etag or entry["etag"]
+        self.store(key, data, etag)
+        return data
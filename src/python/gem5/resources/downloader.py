@@ -51,8 +51,9 @@ from ..utils.progress_bar import (
 from .client import get_resource_json_obj
 from .client import list_resources as client_list_resources
 from .md5_utils import (
-    md5_dir,
-    md5_file,
+    MD5_CACHE_SUFFIX,
+    cached_md5,
+    md5,
 )
 
 """
@@ -258,26 +259,30 @@ def get_resource(
                        at ``to_path``.
     """
 
+    resource_json = get_resource_json_obj(
+        resource_name,
+        resource_version=resource_version,
+        clients=clients,
+        gem5_version=gem5_version,
+    )
+
+    # If the resource has not changed since its md5 was last verified, it
+    # can be used without hashing it again, and without waiting for the
+    # lock held by other gem5 instances verifying or using it.
+    verified_md5 = cached_md5(Path(to_path))
+    if verified_md5 is not None and verified_md5 == resource_json["md5sum"]:
+        return
+
     # We apply a lock for a specific resource. This is to avoid circumstances
     # where multiple instances of gem5 are running and trying to obtain the
     # same resources at once. The timeout here is somewhat arbitarily put at 15
     # minutes.Most resources should be downloaded and decompressed in this
     # timeframe, even on the most constrained of systems.
     with FileLock(f"{to_path}.lock", timeout=900):
-        resource_json = get_resource_json_obj(
-            resource_name,
-            resource_version=resource_version,
-            clients=clients,
-            gem5_version=gem5_version,
-        )
-
         if os.path.exists(to_path):
-            if os.path.isfile(to_path):
-                md5 = md5_file(Path(to_path))
-            else:
-                md5 = md5_dir(Path(to_path))
-
-            if md5 == resource_json["md5sum"]:
+            # The md5 is recorded next to the resource, for the next
+            # instances of gem5 to skip the hashing.
+            if md5(Path(to_path), cache=True) == resource_json["md5sum"]:
                 # In this case, the file has already been download, no need to
                 # do so again.
                 return
@@ -286,6 +291,8 @@ def get_resource(
                     os.remove(to_path)
                 else:
                     shutil.rmtree(to_path)
+                if os.path.exists(f"{to_path}{MD5_CACHE_SUFFIX}"):
+                    os.remove(f"{to_path}{MD5_CACHE_SUFFIX}")
             else:
                 raise Exception(
                     "There already a file present at '{}' but "
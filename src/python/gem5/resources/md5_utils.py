@@ -26,15 +26,36 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import hashlib
+import json
+import os
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Type
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
+# Files are hashed in large blocks: 4KB reads make hashing a multi-GB disk
+# image several times slower than the disk allows.
+_BLOCK_SIZE = 8 * 1024 * 1024
+# The number of blocks read ahead of the hashing.
+_READ_AHEAD = 4
 
-def _md5_update_from_file(
-    filename: Path, hash: Type[hashlib.md5]
-) -> Type[hashlib.md5]:
-    assert filename.is_file()
+# The md5 of a resource is cached in a file next to it, with this suffix.
+MD5_CACHE_SUFFIX = ".md5cache"
+# Files modified this recently are not cached, as they could be modified
+# again without their mtime changing.
+_RACY_SECONDS = 2
 
+
+def _open(filename: Path):
     if filename.stat().st_size < 1024 * 1024 * 100:
         from ..utils.progress_bar import FakeTQDM
 
@@ -43,46 +64,217 @@ def _md5_update_from_file(
     else:
         from ..utils.progress_bar import tqdm
 
-    with tqdm.wrapattr(
+    return tqdm.wrapattr(
         open(str(filename), "rb"),
         "read",
         miniters=1,
         desc=f"Computing md5sum on {filename}",
         total=filename.stat().st_size,
-    ) as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash.update(chunk)
+    )
+
+
+def _read_blocks(items: Iterable[Union[bytes, Path]]) -> Iterator[bytes]:
+    """The bytes to hash for ``items``: either bytes, or files to read."""
+    for item in items:
+        if isinstance(item, bytes):
+            yield item
+            continue
+        with _open(item) as f:
+            for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+                yield block
+
+
+def _read_ahead(blocks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Iterate over ``blocks`` while a separate thread reads the next ones.
+    hashlib releases the GIL while it hashes large blocks, so reading and
+    hashing run in parallel.
+    """
+    blocks_read = queue.Queue(_READ_AHEAD)
+    stop = threading.Event()
+    done = object()
+
+    def read() -> None:
+        try:
+            for block in blocks:
+                blocks_read.put(block)
+                if stop.is_set():
+                    return
+            blocks_read.put(done)
+        except BaseException as e:
+            blocks_read.put(e)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    try:
+        while True:
+            block = blocks_read.get()
+            if block is done:
+                return
+            if isinstance(block, BaseException):
+                raise block
+            yield block
+    finally:
+        stop.set()
+        # unblock the reader if it is waiting for room in the queue
+        while reader.is_alive():
+            try:
+                blocks_read.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _md5_update(
+    items: Iterable[Union[bytes, Path]], hash: Type[hashlib.md5]
+) -> Type[hashlib.md5]:
+    for block in _read_ahead(_read_blocks(items)):
+        hash.update(block)
     return hash
 
 
-def _md5_update_from_dir(
-    directory: Path, hash: Type[hashlib.md5]
+def _md5_update_from_file(
+    filename: Path, hash: Type[hashlib.md5]
 ) -> Type[hashlib.md5]:
-    assert directory.is_dir()
+    assert filename.is_file()
+    return _md5_update([filename], hash)
+
+
+def _dir_items(directory: Path) -> Iterator[Union[bytes, Path]]:
+    """
+    What the md5 of a directory is computed over, in order: the name of
+    every entry, followed by its contents if it is a file or by its own
+    entries if it is a directory.
+    """
     for path in sorted(directory.iterdir(), key=lambda p: str(p).lower()):
-        hash.update(path.name.encode())
+        yield path.name.encode()
         if path.is_file():
-            hash = _md5_update_from_file(path, hash)
+            yield path
         elif path.is_dir():
-            hash = _md5_update_from_dir(path, hash)
-    return hash
+            yield from _dir_items(path)
 
 
-def md5(path: Path) -> str:
+def _md5_update_from_dir(
+    directory: Path, hash: Type[hashlib.md5]
+) -> Type[hashlib.md5]:
+    assert directory.is_dir()
+    return _md5_update(_dir_items(directory), hash)
+
+
+def _fingerprint(path: Path) -> Tuple[List, int]:
+    """
+    What a cached md5 of ``path`` is valid for, and the most recent mtime
+    in it. This is the size, mtime and inode of the file, or of every entry
+    of the directory. Only the metadata is read, none of the contents.
+    """
+    st = os.stat(path)
+    if not os.path.isdir(path):
+        return [st.st_size, st.st_mtime_ns, st.st_ino], st.st_mtime_ns
+
+    entries = []
+    newest = st.st_mtime_ns
+    for root, dirs, files in os.walk(path, followlinks=True):
+        dirs.sort()
+        for name in sorted(dirs + files):
+            entry = os.path.join(root, name)
+            st = os.stat(entry)
+            entries.append(
+                [
+                    os.path.relpath(entry, path),
+                    st.st_size,
+                    st.st_mtime_ns,
+                    st.st_ino,
+                ]
+            )
+            newest = max(newest, st.st_mtime_ns)
+    # keeps the cache file small for directories with many entries
+    digest = hashlib.md5(json.dumps(entries).encode()).hexdigest()
+    return [os.stat(path).st_ino, digest], newest
+
+
+def _cache_path(path: Path) -> str:
+    return f"{path}{MD5_CACHE_SUFFIX}"
+
+
+def cached_md5(path: Path) -> Optional[str]:
+    """
+    The md5 of a file or directory recorded by ``md5(path, cache=True)``,
+    if it has not changed since. ``None`` if there is no valid cached md5.
+
+    Nothing is hashed and no lock is taken, so this is cheap even for
+    multi-GB resources.
+
+    :param path: The file or directory.
+    """
+    try:
+        with open(_cache_path(path)) as f:
+            entry = json.load(f)
+        fingerprint, _ = _fingerprint(path)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(entry, dict)
+        or entry.get("path") != os.path.realpath(path)
+        or entry.get("fingerprint") != fingerprint
+    ):
+        return None
+    return entry.get("md5")
+
+
+def _write_cache(path: Path, fingerprint: List, newest: int, md5: str) -> None:
+    if time.time_ns() - newest < _RACY_SECONDS * 10**9:
+        return
+    # the file may have changed while it was hashed
+    if _fingerprint(path)[0] != fingerprint:
+        return
+    cache = _cache_path(path)
+    tmp = f"{cache}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "path": os.path.realpath(path),
+                    "fingerprint": fingerprint,
+                    "md5": md5,
+                },
+                f,
+            )
+        os.replace(tmp, cache)
+    except OSError:
+        # e.g., the resource is in a read-only directory
+        pass
+
+
+def md5(path: Path, cache: bool = False) -> str:
     """
     Gets the md5 value of a file or directory. ``md5_file`` is used if the path
     is a file and ``md5_dir`` is used if the path is a directory. An exception
     is returned if the path is not a valid file or directory.
 
     :param path: The path to get the md5 of.
+    :param cache: Reuse the md5 recorded in a ``.md5cache`` file next to
+                  ``path`` if the size, mtime and inode of the file (or of
+                  every file in the directory) have not changed since.
+                  Otherwise compute the md5 and record it.
     """
+    path = Path(path)
+    if cache:
+        cached = cached_md5(path)
+        if cached is not None:
+            return cached
+        if path.exists():
+            fingerprint, newest = _fingerprint(path)
+
     if path.is_file():
-        return md5_file(Path(path))
+        value = md5_file(path)
     elif path.is_dir():
-        return md5_dir(Path(path))
+        value = md5_dir(path)
     else:
         raise Exception(f"Path '{path}' is not a valid file or directory.")
 
+    if cache:
+        _write_cache(path, fingerprint, newest, value)
+    return value
+
 
 def md5_file(filename: Path) -> str:
     """
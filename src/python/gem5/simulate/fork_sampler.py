@@ -0,0 +1,388 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Warm-start sampled simulation with forked simulators.
+
+The ``ForkSampler`` fast-forwards a single simulator once and, at the start
+of every sampled region (SimPoint or LoopPoint), forks it with ``m5.fork()``.
+Each child switches to detailed simulation, warms up, measures its region
+and writes its stats. The parent keeps fast-forwarding to the next region
+meanwhile, running at most ``max_children`` children at a time, and
+collects their stats once they exit. Neither re-instantiating the system
+nor storing a checkpoint per region is needed.
+
+.. code-block:: python
+
+    board = SimpleBoard(processor=SimpleSwitchableProcessor(...), ...)
+    board.set_se_simpoint_workload(binary=..., simpoint=simpoint_resource)
+
+    sampler = ForkSampler.from_simpoint(board, simpoint_resource)
+    results = sampler.run()
+    ipc = weighted_stat(results, "board.processor.switch0.core.ipc")
+
+The regions must come in the order the simulation reaches them. Every child
+has its own output directory, ``<outdir>/region_<name>``, holding the usual
+outputs and ``region_stats.json``, the stats at the end of its region.
+"""
+
+import os
+import sys
+import traceback
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+import m5
+import m5.stats
+from m5.ext.pystats.jsonloader import load
+from m5.ext.pystats.simstat import SimStat
+from m5.ext.pystats.streaming import JsonStreamWriter
+from m5.objects import Root
+from m5.stats.gem5stats import write_simstat
+from m5.util import (
+    inform,
+    warn,
+)
+
+from ..components.boards.abstract_board import AbstractBoard
+from ..components.processors.switchable_processor import SwitchableProcessor
+from ..resources.looppoint import Looppoint
+from ..resources.resource import SimpointResource
+from .exit_event import ExitEvent
+from .simulator import Simulator
+
+REGION_STATS_FILE = "region_stats.json"
+
+
+class Region(NamedTuple):
+    """
+    A region of the workload to simulate in detail.
+
+    For SimPoints, the region starts after ``start`` instructions of the
+    first core and is preceded by ``warmup`` instructions of warmup. For
+    LoopPoint the region boundaries are PC count pairs, only ``name`` (the
+    region id) and ``weight`` are used.
+    """
+
+    name: Union[str, int]
+    start: int = 0
+    length: int = 0
+    warmup: int = 0
+    weight: float = 1.0
+
+
+class RegionResult(NamedTuple):
+    region: Region
+    # the output directory of the child
+    outdir: str
+    # the exit code of the child, negative if it was killed by a signal
+    returncode: int
+    # the stats at the end of the region, None if the child failed
+    stats: Optional[SimStat]
+
+
+def _switch(board: AbstractBoard) -> None:
+    processor = board.get_processor()
+    if isinstance(processor, SwitchableProcessor):
+        processor.switch()
+
+
+class ForkSampler:
+    # states of a child
+    _WARMUP = "warmup"
+    _MEASURE = "measure"
+
+    def __init__(
+        self,
+        board: AbstractBoard,
+        regions: List[Region],
+        max_children: Optional[int] = None,
+        on_fork: Callable[[AbstractBoard], None] = _switch,
+        looppoint: Optional[Looppoint] = None,
+    ):
+        """
+        :param board: The board to simulate. It must not be instantiated yet.
+        :param regions: The regions to sample, in the order they are reached.
+        :param max_children: Maximum number of children running at the same
+                             time. Defaults to the CPU count.
+        :param on_fork: Called with the board in each child as soon as it
+                        is forked, to switch to detailed simulation. By
+                        default a switchable processor is switched.
+        :param looppoint: For LoopPoint regions, the ``Looppoint`` the
+                          processor was set up with. Its PC count pairs then
+                          delimit the regions, instead of instruction counts.
+        """
+        self.board = board
+        self.regions = list(regions)
+        self.max_children = max_children or os.cpu_count()
+        self.on_fork = on_fork
+        self.looppoint = looppoint
+        self.simulator = Simulator(
+            board=board,
+            on_exit_event={
+                ExitEvent.SIMPOINT_BEGIN: self._on_simpoint,
+                ExitEvent.MAX_INSTS: self._on_max_insts,
+                ExitEvent.EXIT: self._on_exit,
+            },
+        )
+
+        self._by_name = {region.name: region for region in self.regions}
+        if len(self._by_name) != len(self.regions):
+            raise ValueError("Region names must be unique.")
+        # SimPoints: the instruction counts at which children are forked,
+        # and the regions starting at each of them
+        self._fork_points: Dict[int, List[Region]] = {}
+        if looppoint is None:
+            for region in sorted(self.regions, key=lambda r: r.start):
+                point = max(0, region.start - region.warmup)
+                self._fork_points.setdefault(point, []).append(region)
+        self._next_point = 0
+        self._forked = 0
+
+        self._children: Dict[int, Region] = {}
+        self._results: Dict[Union[str, int], RegionResult] = {}
+        self._outdirs: Dict[Union[str, int], str] = {}
+        # set in a child only
+        self._region: Optional[Region] = None
+        self._state = None
+
+    @classmethod
+    def from_simpoint(
+        cls, board: AbstractBoard, simpoint: SimpointResource, **kwargs
+    ) -> "ForkSampler":
+        """
+        A sampler of every SimPoint of ``simpoint``, with its warmup and
+        weight. ``kwargs`` are passed to the constructor.
+        """
+        regions = [
+            Region(
+                name=i,
+                start=start,
+                length=simpoint.get_simpoint_interval(),
+                warmup=warmup,
+                weight=weight,
+            )
+            for i, (start, warmup, weight) in enumerate(
+                zip(
+                    simpoint.get_simpoint_start_insts(),
+                    simpoint.get_warmup_list(),
+                    simpoint.get_weight_list(),
+                )
+            )
+        ]
+        return cls(board, regions, **kwargs)
+
+    @classmethod
+    def from_looppoint(
+        cls, board: AbstractBoard, looppoint: Looppoint, **kwargs
+    ) -> "ForkSampler":
+        """
+        A sampler of every region of ``looppoint``, weighted by their
+        multiplier. The processor of ``board`` must have been set up with
+        ``looppoint``. ``kwargs`` are passed to the constructor.
+        """
+        regions = [
+            Region(name=name, weight=region.get_multiplier())
+            for name, region in looppoint.get_regions().items()
+        ]
+        return cls(board, regions, looppoint=looppoint, **kwargs)
+
+    def run(self) -> Dict[Union[str, int], RegionResult]:
+        """
+        Run the workload up to the start of the last region, forking a child
+        at the start of every region, and wait for the children.
+
+        :returns: The result of every region that was reached, by name.
+        """
+        # m5.fork() refuses to fork a simulator with listeners
+        m5.disableAllListeners()
+        if self.looppoint is None:
+            self.simulator.schedule_simpoint(sorted(self._fork_points))
+
+        try:
+            self.simulator.run()
+        except BaseException:
+            if self._region is not None:
+                # a child must never return to the parent's script
+                traceback.print_exc()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(1)
+            raise
+
+        if self._region is not None:
+            sys.exit(0)
+
+        while self._children:
+            self._wait()
+        missing = [r.name for r in self.regions if r.name not in self._results]
+        if missing:
+            warn(f"The simulation ended before reaching regions {missing}.")
+        return self._results
+
+    def _fork(self, region: Region) -> bool:
+        """Fork a child for ``region``. Returns whether in the child."""
+        while len(self._children) >= self.max_children:
+            self._wait()
+        name = str(region.name).replace("%", "%%")
+        # or the children would print the parent's buffered output again
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self._forked += 1
+        pid = m5.fork(os.path.join("%(parent)s", f"region_{name}"))
+        if pid == 0:
+            self._children.clear()
+            self._region = region
+            self.on_fork(self.board)
+            if self.looppoint is None:
+                warmup = region.start - max(0, region.start - region.warmup)
+                if warmup:
+                    self._state = self._WARMUP
+                    self.simulator.schedule_max_insts(warmup)
+                else:
+                    self._measure()
+            else:
+                looppoint_region = self.looppoint.get_regions()[region.name]
+                if looppoint_region.get_warmup() is not None:
+                    self._state = self._WARMUP
+                else:
+                    self._measure()
+            return True
+        self._children[pid] = region
+        self._outdirs[region.name] = os.path.join(
+            m5.options.outdir, f"region_{region.name}"
+        )
+        inform(f"Forked region {region.name} (pid {pid}).")
+        return False
+
+    def _wait(self) -> None:
+        pid, status = os.waitpid(-1, 0)
+        region = self._children.pop(pid, None)
+        if region is None:
+            # not one of our children
+            return
+        returncode = os.waitstatus_to_exitcode(status)
+        outdir = self._outdirs[region.name]
+        stats = None
+        if returncode == 0:
+            try:
+                with open(os.path.join(outdir, REGION_STATS_FILE)) as f:
+                    stats = load(f, lazy=True)
+            except OSError as e:
+                warn(f"Region {region.name} wrote no stats: {e}")
+        else:
+            warn(f"Region {region.name} failed with exit code {returncode}.")
+        self._results[region.name] = RegionResult(
+            region, outdir, returncode, stats
+        )
+
+    def _measure(self) -> None:
+        self._state = self._MEASURE
+        m5.stats.reset()
+        if self.looppoint is None:
+            self.simulator.schedule_max_insts(self._region.length)
+
+    def _finish(self) -> bool:
+        m5.stats.dump()
+        path = os.path.join(m5.options.outdir, REGION_STATS_FILE)
+        with open(path, "w") as f:
+            write_simstat(JsonStreamWriter(f), Root.getInstance())
+        return True
+
+    def _on_simpoint(self) -> bool:
+        if self._region is not None:
+            return self._child_on_simpoint()
+
+        if self.looppoint is not None:
+            name = self.looppoint.get_current_region()
+            if name is None or name not in self._by_name:
+                return False
+            starting = [self._by_name[name]]
+        else:
+            points = sorted(self._fork_points)
+            starting = self._fork_points[points[self._next_point]]
+            self._next_point += 1
+
+        for region in starting:
+            if self._fork(region):
+                return False
+        # the parent has nothing left to do once the last region started
+        return self._forked == len(self.regions)
+
+    def _child_on_simpoint(self) -> bool:
+        if self.looppoint is None:
+            # the other fork points of the parent
+            return False
+        region = self.looppoint.get_regions()[self._region.name]
+        pair = self.looppoint.get_current_pair()
+        if self._state == self._WARMUP:
+            if pair == region.get_simulation().get_start().get_pc_count_pair():
+                self._measure()
+            return False
+        if pair == region.get_simulation().get_end().get_pc_count_pair():
+            return self._finish()
+        return False
+
+    def _on_max_insts(self) -> bool:
+        if self._region is None or self.looppoint is not None:
+            return False
+        if self._state == self._WARMUP:
+            self._measure()
+            return False
+        return self._finish()
+
+    def _on_exit(self) -> bool:
+        if self._region is not None:
+            warn(f"The workload exited within region {self._region.name}.")
+            return self._finish()
+        return True
+
+
+def weighted_stat(
+    results: Dict[Union[str, int], RegionResult], path: str
+) -> float:
+    """
+    The weighted average of a stat over the regions with stats.
+
+    :param results: As returned by ``ForkSampler.run()``.
+    :param path: The stat, e.g. "board.processor.switch0.core.ipc".
+    """
+    total = 0.0
+    weights = 0.0
+    for result in results.values():
+        if result.stats is None:
+            continue
+        total += result.region.weight * result.stats.get(path).value
+        weights += result.region.weight
+    if weights == 0:
+        raise ValueError("No region has stats.")
+    return total / weights
@@ -33,6 +33,8 @@ from typing import (
     Generator,
     List,
     Optional,
+    Pattern,
+    Sequence,
     Tuple,
     Union,
 )
@@ -55,6 +57,7 @@ from .exit_event_generators import (
     switch_generator,
     warn_default_decorator,
 )
+from .stat_sampler import StatSampler
 
 
 class Simulator:
@@ -359,6 +362,9 @@ class Simulator:
 
         self._checkpoint_path = checkpoint_path
 
+        # The stat samplers, by the cause of their exit events.
+        self._stat_samplers: Dict[str, StatSampler] = {}
+
     def schedule_simpoint(self, simpoint_start_insts: List[int]) -> None:
         """
         Schedule ``SIMPOINT_BEGIN`` exit events
@@ -415,6 +421,44 @@ class Simulator:
 
         return m5.stats.gem5stats.get_simstat(self._root)
 
+    def add_stat_sampler(
+        self,
+        stats: Sequence[Union[str, Pattern]],
+        interval: int,
+        capacity: Optional[int] = 4096,
+        path: Optional[str] = None,
+    ) -> StatSampler:
+        """
+        Sample a few statistics every ``interval`` ticks, without dumping
+        the whole stats hierarchy. The stats are resolved once, at the first
+        sample, and only their values are read afterwards. See
+        ``gem5.simulate.stat_sampler.StatSampler``.
+
+        Samples are taken on exit events the ``run()`` loop handles on its
+        own, they do not count as exit events of the simulation.
+
+        :param stats: Stat names, as in stats.txt, or regular expressions
+                      fully matching stat names.
+        :param interval: The sampling interval, in ticks.
+        :param capacity: Number of samples kept in an in-memory ring buffer.
+                         ``None`` keeps none in memory.
+        :param path: If given, every sample is also appended to this binary
+                     file.
+
+        :returns: The sampler, to get the samples from.
+        """
+        sampler = StatSampler(
+            stats,
+            interval,
+            capacity=capacity,
+            path=path,
+            exit_cause=f"stat sampler {len(self._stat_samplers)}",
+        )
+        self._stat_samplers[sampler.exit_cause] = sampler
+        if self._instantiated:
+            sampler.start()
+        return sampler
+
     def add_text_stats_output(self, path: str) -> None:
         """
         This function is used to set an output location for text stats. If
@@ -581,9 +625,26 @@ class Simulator:
         # We instantiate the board if it has not already been instantiated.
         self._instantiate()
 
+        for sampler in self._stat_samplers.values():
+            if sampler.next_tick is None:
+                sampler.start()
+
+        # The ticks left until the `max_ticks` limit. Stat sampling exits do
+        # not reset it.
+        ticks = max_ticks
+
         # This while loop will continue until an a generator yields True.
         while True:
-            self._last_exit_event = m5.simulate(max_ticks)
+            start_tick = self.get_current_tick()
+            self._last_exit_event = m5.simulate(ticks)
+
+            sampler = self._stat_samplers.get(self.get_last_exit_event_cause())
+            if sampler is not None:
+                if sampler.is_due():
+                    sampler.sample()
+                ticks -= self.get_current_tick() - start_tick
+                continue
+            ticks = max_ticks
 
             # Translate the exit event cause to the exit event enum.
             exit_enum = ExitEvent.translate_exit_status(
@@ -632,6 +693,8 @@ class Simulator:
             # If the generator returned True we will return from the Simulator
             # run loop. In the case of a function: if it returned True.
             if exit_on_completion:
+                for sampler in self._stat_samplers.values():
+                    sampler.flush()
                 return
 
     def save_checkpoint(self, checkpoint_dir: Path) -> None:
@@ -0,0 +1,288 @@
+# Copyright (c) 2024 The Regents of the University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+r"""
+Periodic sampling of a few selected statistics.
+
+Unlike periodic stats dumps, a sampler resolves the stats it samples once, to
+their ``_m5.stats.Info`` handles, and at every interval only reads those
+values. The samples are kept in a preallocated numpy ring buffer and/or
+appended to a binary file.
+
+A sampler is normally created through ``Simulator.add_stat_sampler()``:
+
+.. code-block:: python
+
+    simulator = Simulator(board=board)
+    sampler = simulator.add_stat_sampler(
+        ["board.processor.cores0.core.ipc", r".*\.dcache\.overallMisses"],
+        interval=m5.ticks.fromSeconds(0.0001),
+    )
+    simulator.run()
+    ticks, values = sampler.samples()
+
+The binary file holds one record of ``float64`` values per sample, the tick
+followed by one value per column. The column names are written to a json
+file next to it (``<path>.json``). It can be read back with ``load_samples()``.
+"""
+
+import array
+import json
+import re
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import m5
+from m5.objects import Root
+
+from _m5 import stats as _stats
+
+
+def _walk_stats(group, prefix: str = ""):
+    """Yield ``(group, name, Info)`` for every stat under ``group``, named as
+    in stats.txt."""
+    for info in group.getStats():
+        yield group, prefix + info.name, info
+    for name, child in group.getStatGroups().items():
+        yield from _walk_stats(child, f"{prefix}{name}.")
+
+
+class StatSampler:
+    """
+    Samples the value of a set of statistics every ``interval`` ticks.
+    """
+
+    def __init__(
+        self,
+        stats: Sequence[Union[str, Pattern]],
+        interval: int,
+        capacity: Optional[int] = 4096,
+        path: Optional[str] = None,
+        exit_cause: str = "stat sampler",
+    ):
+        """
+        :param stats: Stat names, as in stats.txt, or regular expressions
+                      fully matching stat names. Scalars, vectors and
+                      formulas can be sampled. Each vector entry is a
+                      column of its own, named ``<stat>::<entry>``.
+        :param interval: The sampling interval, in ticks.
+        :param capacity: Number of samples kept in memory. When the ring
+                         buffer is full, the oldest samples are overwritten.
+                         ``None`` keeps no samples in memory, which only
+                         makes sense with a ``path``.
+        :param path: If given, every sample is appended to this binary file.
+        :param exit_cause: The cause of the exit events scheduled to take
+                           the samples. Must be unique to the sampler.
+        """
+        if interval <= 0:
+            raise ValueError("The sampling interval must be positive.")
+        if capacity is None and path is None:
+            raise ValueError("A sampler needs a capacity, a path, or both.")
+
+        self._specs = list(stats)
+        self.interval = interval
+        self.capacity = capacity
+        self.path = path
+        self.exit_cause = exit_cause
+
+        self._resolved = False
+        self._columns: List[str] = []
+        self._infos = []
+        self._groups = []
+        self._buffer = None
+        self._file = None
+        self._count = 0
+        self.next_tick = None
+
+    @property
+    def columns(self) -> List[str]:
+        """The names of the sampled values, resolved at the first sample."""
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        """The number of samples taken so far."""
+        return self._count
+
+    def _resolve(self) -> None:
+        """Resolve the stat names to Info handles. The stat tree is walked
+        only this once."""
+        by_name = {}
+        for group, name, info in _walk_stats(Root.getInstance()):
+            by_name[name] = (group, info)
+
+        selected = {}
+        for spec in self._specs:
+            if isinstance(spec, str) and spec in by_name:
+                matches = [spec]
+            else:
+                pattern = re.compile(spec)
+                matches = [n for n in by_name if pattern.fullmatch(n)]
+            if not matches:
+                raise ValueError(f"No statistic matches '{spec}'.")
+            for name in matches:
+                group, info = by_name[name]
+                if isinstance(info, (_stats.ScalarInfo, _stats.VectorInfo)):
+                    selected[name] = (group, info)
+                elif isinstance(spec, str) and spec == name:
+                    raise ValueError(
+                        f"Statistic '{name}' cannot be sampled, only "
+                        "scalars, vectors and formulas can."
+                    )
+
+        groups = {}
+        for name, (group, info) in selected.items():
+            # vectors (and formulas) are read as a whole, the columns of
+            # their entries are added in the same order
+            info.prepare()
+            if isinstance(info, _stats.VectorInfo) and info.size > 1:
+                subnames = [str(s) for s in info.subnames]
+                for index in range(info.size):
+                    if index < len(subnames) and subnames[index]:
+                        entry = subnames[index]
+                    else:
+                        entry = str(index)
+                    self._columns.append(f"{name}::{entry}")
+            else:
+                self._columns.append(name)
+            self._infos.append(info)
+            groups[id(group)] = group
+        self._groups = list(groups.values())
+
+        width = 1 + len(self._columns)
+        if self.capacity is not None:
+            try:
+                import numpy as np
+            except ImportError as e:
+                raise Exception(
+                    f"ImportError: {e}\n"
+                    "Keeping the samples in memory requires numpy. Install "
+                    "it, or set `capacity=None` and sample to a `path`."
+                )
+            self._buffer = np.empty((self.capacity, width), dtype=np.float64)
+        if self.path is not None:
+            with open(f"{self.path}.json", "w") as f:
+                json.dump(
+                    {"columns": ["tick"] + self._columns, "dtype": "float64"},
+                    f,
+                    indent=4,
+                )
+            self._file = open(self.path, "wb")
+        self._resolved = True
+
+    def start(self) -> None:
+        """Resolve the stats, if not done yet, and schedule the next sample
+        ``interval`` ticks from now. Must be called once the simulation is
+        instantiated."""
+        if not self._resolved:
+            self._resolve()
+        self.next_tick = m5.curTick() + self.interval
+        m5.scheduleTickExitAbsolute(self.next_tick, self.exit_cause)
+
+    def is_due(self) -> bool:
+        """Whether a sample exit event at the current tick is the one this
+        sampler is waiting for. Exit events cannot be descheduled, a stale
+        one is left over when the sampler is restarted."""
+        return self.next_tick == m5.curTick()
+
+    def sample(self) -> None:
+        """Take a sample now and schedule the next one."""
+        for group in self._groups:
+            group.preDumpStats()
+        row = [float(m5.curTick())]
+        for info in self._infos:
+            if isinstance(info, _stats.VectorInfo):
+                row += info.result
+            else:
+                row.append(info.result)
+
+        if self._buffer is not None:
+            self._buffer[self._count % self.capacity] = row
+        if self._file is not None:
+            array.array("d", row).tofile(self._file)
+        self._count += 1
+
+        self.start()
+
+    def samples(self) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+        """
+        The samples kept in memory, oldest first.
+
+        :returns: The sample ticks, and a ``(samples, columns)`` array of
+                  values. The columns are in the order of ``columns``.
+        """
+        import numpy as np
+
+        if self._buffer is None:
+            return np.empty(0), np.empty((0, len(self._columns)))
+        if self._count <= self.capacity:
+            rows = self._buffer[: self._count]
+        else:
+            start = self._count % self.capacity
+            rows = np.concatenate((self._buffer[start:], self._buffer[:start]))
+        return rows[:, 0].astype("int64"), rows[:, 1:]
+
+    def as_dict(self) -> Dict[str, "numpy.ndarray"]:
+        """The samples kept in memory as ``{column: values}``, including a
+        ``tick`` column."""
+        ticks, values = self.samples()
+        columns = {"tick": ticks}
+        for i, name in enumerate(self._columns):
+            columns[name] = values[:, i]
+        return columns
+
+    def flush(self) -> None:
+        """Flush the samples written to the binary file, if any."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the binary file, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_samples(path: str) -> Dict[str, "numpy.ndarray"]:
+    """
+    Read a binary file written by a ``StatSampler``.
+
+    :returns: ``{column: values}``, including a ``tick`` column.
+    """
+    import numpy as np
+
+    with open(f"{path}.json") as f:
+        columns = json.load(f)["columns"]
+    data = np.fromfile(path, dtype=np.float64).reshape(-1, len(columns))
+    samples = {name: data[:, i] for i, name in enumerate(columns)}
+    samples["tick"] = samples["tick"].astype(np.int64)
+    return samples
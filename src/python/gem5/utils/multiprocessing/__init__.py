@@ -28,7 +28,11 @@ from .context import (
     Process,
     gem5Context,
 )
+from .pool import (
+    SimulationPool,
+    SimulationResult,
+)
 
 Pool = gem5Context().Pool
 
-__all__ = ["Process", "Pool"]
+__all__ = ["Process", "Pool", "SimulationPool", "SimulationResult"]
@@ -0,0 +1,385 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+A pool of gem5 simulations, each run in a fresh gem5 process, which hands
+the statistics of every simulation back to the parent process.
+
+.. code-block:: python
+
+    from gem5.utils.multiprocessing import SimulationPool
+    from sim import run_sim
+
+    if __name__ == "__m5_main__":
+        pool = SimulationPool(processes=4, timeout=3600, retries=1)
+        for size in ["32KiB", "64KiB"]:
+            pool.submit(run_sim, args=(size,), name=f"l1d_{size}")
+        for result in pool.run():
+            print(result.name, result.stats.get("system.cpu.ipc"))
+
+Unlike ``Pool``, every job is started in its own gem5 process, its run time
+and memory use are bounded, and failed jobs can be retried. The output
+directory of a job is ``<outdir>/<name>``.
+"""
+
+import json
+import os
+import time
+import traceback
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from m5.ext.pystats.jsonloader import JsonLoader
+from m5.ext.pystats.serializable_stat import to_json_value
+from m5.ext.pystats.simstat import SimStat
+from m5.util import (
+    inform,
+    warn,
+)
+
+from .context import gem5Context
+
+
+class SimulationResult(NamedTuple):
+    """The outcome of a job of a ``SimulationPool``."""
+
+    # The name of the job, also the name of its output directory
+    name: str
+    # The stats of the simulation at the end of the job: a SimStat, or a
+    # dict of the selected stats by path. None if the job failed.
+    stats: Union[SimStat, Dict[str, Any], None]
+    # What the job's target returned, unless it was the SimStat
+    value: Any
+    # The exit code of the last attempt's gem5 process
+    exitcode: Optional[int]
+    # How many times the job was started
+    attempts: int
+    # Why the last attempt failed, None if it succeeded
+    error: Optional[str]
+    # Wall clock time of the last attempt, in seconds
+    elapsed: float
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _stats_payload(value: Any, stats: Optional[Sequence[str]]) -> str:
+    """The stats of the simulation which just ran in this process, as JSON
+    text. The target's return value is used if it is a SimStat."""
+    if isinstance(value, SimStat):
+        simstat = value
+    else:
+        from m5.objects import Root
+        from m5.stats.gem5stats import get_simstat
+
+        if Root.getInstance() is None:
+            return json.dumps(None)
+        simstat = get_simstat(Root.getInstance())
+
+    if stats is None:
+        return simstat.dumps(indent=None)
+    # a list, so that the decoder does not take the paths for a SimStat
+    return json.dumps(
+        [[path, to_json_value(simstat.get(path))] for path in stats]
+    )
+
+
+def _run_job(conn, target, args, kwargs, stats) -> None:
+    """Run in the job's gem5 process: run the target and send the result
+    back to the pool."""
+    try:
+        value = target(*args, **kwargs)
+        payload = _stats_payload(value, stats)
+        if isinstance(value, SimStat):
+            value = None
+        conn.send((None, payload, value))
+    except Exception:
+        conn.send((traceback.format_exc(), None, None))
+    finally:
+        conn.close()
+
+
+def _decode_stats(payload: str) -> Union[SimStat, Dict[str, Any], None]:
+    decoded = json.loads(payload, cls=JsonLoader)
+    if isinstance(decoded, list):
+        return dict(decoded)
+    return decoded
+
+
+def _process_rss(pid: int) -> Optional[int]:
+    """The resident set size of a process in bytes. None where it cannot be
+    read (i.e., not on Linux), 0 if the process is gone."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        return None if not os.path.isdir("/proc/self") else 0
+    return 0
+
+
+class _Job:
+    def __init__(self, name, target, args, kwargs, stats):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.stats = stats
+        self.attempts = 0
+        self.result = None
+
+        self.process = None
+        self.conn = None
+        self.started = 0.0
+        self.message = None
+        self.error = None
+
+    def start(self, context) -> None:
+        self.attempts += 1
+        self.message = self.error = None
+        recv_conn, send_conn = Pipe(duplex=False)
+        self.process = context.Process(
+            target=_run_job,
+            args=(send_conn, self.target, self.args, self.kwargs, self.stats),
+            name=self.name,
+        )
+        self.started = time.monotonic()
+        self.process.start()
+        # the child holds the only writing end, so that the pipe reports
+        # EOF if it dies without sending its result
+        send_conn.close()
+        self.conn = recv_conn
+
+    def receive(self) -> None:
+        try:
+            self.message = self.conn.recv()
+        except EOFError:
+            pass
+        self.conn.close()
+        self.conn = None
+
+    def kill(self, reason: str) -> None:
+        self.error = reason
+        self.process.kill()
+
+    def finish(self) -> SimulationResult:
+        """Reap the process and make the result of this attempt."""
+        self.process.join()
+        if self.conn is not None:
+            self.receive()
+        elapsed = time.monotonic() - self.started
+        exitcode = self.process.exitcode
+        self.process.close()
+        self.process = None
+
+        stats = value = None
+        error = self.error
+        if error is None:
+            if self.message is None:
+                error = f"gem5 exited with code {exitcode} without a result"
+            else:
+                error, payload, value = self.message
+        if error is None:
+            try:
+                stats = _decode_stats(payload)
+            except Exception:
+                error = traceback.format_exc()
+        return SimulationResult(
+            self.name, stats, value, exitcode, self.attempts, error, elapsed
+        )
+
+
+class SimulationPool:
+    """
+    Runs jobs, each in its own fresh gem5 process, with at most
+    ``processes`` of them at a time. A job is a function, importable from a
+    module other than the main script, which sets up and runs a simulation.
+
+    When a job's function returns, the stats of its simulation are sent back
+    to the pool over a pipe: the SimStat the function returned if it
+    returned one, else the stats of the simulation's Root.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        retries: int = 0,
+        poll_interval: float = 1.0,
+    ):
+        """
+        :param processes: The number of jobs run at once. Defaults to the
+                          number of CPUs.
+        :param timeout: Seconds after which a job is killed. No limit by
+                        default.
+        :param memory_limit: Resident memory, in bytes, above which a job
+                             is killed. Only enforced on Linux.
+        :param retries: How many times a failed, timed out or killed job is
+                        started again.
+        :param poll_interval: Seconds between two checks of the time and
+                              memory limits.
+        """
+        self._processes = processes or os.cpu_count() or 1
+        self._timeout = timeout
+        self._memory_limit = memory_limit
+        self._retries = retries
+        self._poll_interval = poll_interval
+        self._context = gem5Context()
+        self._jobs: List[_Job] = []
+
+    def submit(
+        self,
+        target: Callable,
+        args: Sequence = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        stats: Optional[Iterable[str]] = None,
+    ) -> str:
+        """
+        Add a job to the pool. Jobs are started by ``run()``.
+
+        :param target: The function setting up and running the simulation.
+        :param args: The positional arguments of ``target``.
+        :param kwargs: The keyword arguments of ``target``.
+        :param name: The name of the job, unique in the pool. It is also the
+                     name of the job's output directory. Defaults to
+                     ``job<n>``.
+        :param stats: The paths of the stats to send back, e.g.
+                      ``["system.cpu.ipc"]``. Only sending the stats needed
+                      is much cheaper than sending all of them.
+
+        :returns: The name of the job.
+        """
+        if name is None:
+            name = f"job{len(self._jobs)}"
+        if any(job.name == name for job in self._jobs):
+            raise ValueError(f"There is already a job named '{name}'.")
+        self._jobs.append(
+            _Job(
+                name,
+                target,
+                tuple(args),
+                dict(kwargs or {}),
+                None if stats is None else list(stats),
+            )
+        )
+        return name
+
+    def map(
+        self,
+        target: Callable,
+        iterable: Iterable,
+        stats: Optional[Iterable[str]] = None,
+    ) -> List[SimulationResult]:
+        """Run ``target`` once per item of ``iterable`` and return the
+        results in the same order."""
+        names = [
+            self.submit(target, (item,), stats=stats) for item in iterable
+        ]
+        results = {result.name: result for result in self.run()}
+        return [results[name] for name in names]
+
+    def run(self) -> List[SimulationResult]:
+        """
+        Run all the jobs submitted since the last call and return their
+        results, in the order they were submitted.
+
+        A keyboard interrupt kills the running jobs.
+        """
+        jobs, self._jobs = self._jobs, []
+        waiting = list(jobs)
+        running: List[_Job] = []
+        try:
+            while waiting or running:
+                while waiting and len(running) < self._processes:
+                    job = waiting.pop(0)
+                    job.start(self._context)
+                    running.append(job)
+
+                ready = wait(
+                    [job.process.sentinel for job in running]
+                    + [job.conn for job in running if job.conn is not None],
+                    timeout=self._poll_interval,
+                )
+                for job in running:
+                    if job.conn is not None and job.conn in ready:
+                        job.receive()
+                self._check_limits(running)
+
+                for job in [j for j in running if j.process.sentinel in ready]:
+                    running.remove(job)
+                    result = job.finish()
+                    if result.succeeded or job.attempts > self._retries:
+                        job.result = result
+                        continue
+                    warn(
+                        f"Job '{job.name}' failed (attempt {job.attempts}), "
+                        f"retrying: {result.error.strip().splitlines()[-1]}"
+                    )
+                    waiting.append(job)
+        except KeyboardInterrupt:
+            for job in running:
+                job.kill("interrupted")
+            for job in running:
+                job.process.join()
+            raise
+
+        failed = [job.name for job in jobs if not job.result.succeeded]
+        if failed:
+            inform(f"{len(failed)} of {len(jobs)} jobs failed: {failed}")
+        return [job.result for job in jobs]
+
+    def _check_limits(self, running: List[_Job]) -> None:
+        now = time.monotonic()
+        for job in running:
+            if job.error is not None:
+                continue
+            if self._timeout is not None and (
+                now - job.started > self._timeout
+            ):
+                job.kill(f"timed out after {self._timeout} seconds")
+            elif self._memory_limit is not None:
+                rss = _process_rss(job.process.pid)
+                if rss is not None and rss > self._memory_limit:
+                    job.kill(
+                        f"killed for using {rss} bytes of memory, more than "
+                        f"the limit of {self._memory_limit}"
+                    )
@@ -24,10 +24,14 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import atexit
+import hashlib
 import importlib
 import importlib.abc
 import importlib.util
+import marshal
 import os
+import sys
 
 
 class ByteCodeLoader(importlib.abc.Loader):
@@ -44,13 +48,26 @@ class ByteCodeLoader(importlib.abc.Loader):
 
 # Simple importer that allows python to import data from a dict of
 # code objects.  The keys are the module path, and the items are the
-# filename and bytecode of the file.
+# filename and bytecode of the file. The bytecode may also be given as a
+# function returning it, for it to only be loaded (e.g., uncompressed) when
+# the module is imported.
 class CodeImporter:
     def __init__(self):
         self.modules = {}
         override_var = os.environ.get("M5_OVERRIDE_PY_SOURCE", "false")
         self.override = override_var.lower() in ("true", "yes")
 
+        # The bytecode compiled from the overriding sources is cached, like
+        # in pyc files, in M5_OVERRIDE_PY_CACHE ("none" disables it).
+        self.cache_dir = os.environ.get(
+            "M5_OVERRIDE_PY_CACHE",
+            os.path.join(os.path.expanduser("~"), ".cache", "gem5", "pyc"),
+        )
+        if self.cache_dir.lower() == "none":
+            self.cache_dir = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     def add_module(self, abspath, modpath, code):
         if modpath in self.modules:
             raise AttributeError(f"{modpath} already found in importer")
@@ -64,8 +81,9 @@ class CodeImporter:
         abspath, code = self.modules[fullname]
 
         if self.override and os.path.exists(abspath):
-            src = open(abspath).read()
-            code = compile(src, abspath, "exec")
+            code = self.compile_source(abspath)
+        elif callable(code):
+            code = code()
 
         is_package = os.path.basename(abspath) == "__init__.py"
         spec = importlib.util.spec_from_loader(
@@ -76,6 +94,54 @@ class CodeImporter:
 
         return spec
 
+    def _cache_path(self, abspath):
+        name = hashlib.sha256(abspath.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.pyc")
+
+    def compile_source(self, abspath):
+        """Compile the source file ``abspath``, unless the code compiled
+        from it by this interpreter is cached and the file has the same
+        mtime and size since."""
+        st = os.stat(abspath)
+        key = (abspath, st.st_mtime_ns, st.st_size)
+        if self.cache_dir is not None:
+            try:
+                with open(self._cache_path(abspath), "rb") as f:
+                    magic = f.read(len(importlib.util.MAGIC_NUMBER))
+                    if magic == importlib.util.MAGIC_NUMBER:
+                        cached_key, code = marshal.load(f)
+                        if tuple(cached_key) == key:
+                            self.cache_hits += 1
+                            return code
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+        with open(abspath) as f:
+            code = compile(f.read(), abspath, "exec")
+        self.cache_misses += 1
+
+        if self.cache_dir is not None:
+            path = self._cache_path(abspath)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(tmp, "wb") as f:
+                    f.write(importlib.util.MAGIC_NUMBER)
+                    marshal.dump((key, code), f)
+                os.replace(tmp, path)
+            except OSError:
+                # the cache only saves time
+                pass
+        return code
+
+    def report(self):
+        if self.cache_hits or self.cache_misses:
+            print(
+                f"M5_OVERRIDE_PY_SOURCE: {self.cache_hits} modules loaded "
+                f"from the bytecode cache, {self.cache_misses} compiled",
+                file=sys.stderr,
+            )
+
 
 # Create an importer and add it to the meta_path so future imports can
 # use it.  There's currently nothing in the importer, but calls to
@@ -84,9 +150,10 @@ def install():
     importer = CodeImporter()
     global add_module
     add_module = importer.add_module
-    import sys
 
     sys.meta_path.insert(0, importer)
+    if importer.override:
+        atexit.register(importer.report)
 
     # Injected into this module's namespace by the c++ code that loads it.
     _init_all_embedded()
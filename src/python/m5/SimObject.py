@@ -121,6 +121,15 @@ instanceDict = {}
 # Did any of the SimObjects lack a header file?
 noCxxHeader = False
 
+# Incremented whenever a SimObject gains or loses its parent, i.e. whenever
+# the configuration hierarchy changes. Lets m5.simulate reuse its walks of
+# the hierarchy until then.
+_hierarchy_version = 0
+
+
+def hierarchyVersion():
+    return _hierarchy_version
+
 
 def public_value(key, value):
     return key.startswith("_") or isinstance(
@@ -932,13 +941,17 @@ class SimObject(metaclass=MetaSimObject):
 
     # Also implemented by SimObjectVector
     def clear_parent(self, old_parent):
+        global _hierarchy_version
         assert self._parent is old_parent
         self._parent = None
+        _hierarchy_version += 1
 
     # Also implemented by SimObjectVector
     def set_parent(self, parent, name):
+        global _hierarchy_version
         self._parent = parent
         self._name = name
+        _hierarchy_version += 1
 
     # Return parent object of this SimObject, not implemented by
     # SimObjectVector because the elements in a SimObjectVector may not share
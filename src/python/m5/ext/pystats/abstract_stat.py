@@ -25,16 +25,53 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import re
+import sys
+from array import array
 from typing import (
     Callable,
+    Dict,
+    Iterator,
     List,
+    NamedTuple,
     Optional,
     Pattern,
+    Tuple,
     Union,
 )
 
 from .serializable_stat import SerializableStat
 
+# Bumped whenever a child stat is added to, replaced in or removed from any
+# stat. A stat does not know its parents, so a path index records the
+# generation it was built at and is rebuilt once the generation moved on.
+_generation = 0
+
+
+def _tree_changed() -> None:
+    global _generation
+    _generation += 1
+
+
+class _PathIndex(NamedTuple):
+    """
+    The flattened stat tree under a stat, in the depth-first order of
+    ``children()``: the name of every stat and the position of its parent
+    (-1 for the children of the indexed stat), and the positions of the
+    stats by name.
+    """
+
+    names: List[str]
+    parents: "array[int]"
+    by_name: Dict[str, "array[int]"]
+    generation: int
+
+    def path(self, position: int) -> Tuple[str, ...]:
+        path = []
+        while position >= 0:
+            path.append(self.names[position])
+            position = self.parents[position]
+        return tuple(reversed(path))
+
 
 class AbstractStat(SerializableStat):
     """
@@ -43,6 +80,64 @@ class AbstractStat(SerializableStat):
     All PyStats are JsonSerializable.
     """
 
+    __slots__ = ("_cached_index",)
+
+    def __setattr__(self, name: str, value) -> None:
+        # a new or removed child stat makes the path indexes of this stat
+        # and of all its ancestors stale
+        if isinstance(value, AbstractStat) or self._has_stat(name):
+            _tree_changed()
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if self._has_stat(name):
+            _tree_changed()
+        object.__delattr__(self, name)
+
+    def _has_stat(self, name: str) -> bool:
+        """Whether this stat has a child stat called ``name``. Lazy
+        children are not loaded to find out."""
+        return isinstance(
+            getattr(self, "__dict__", {}).get(name), AbstractStat
+        )
+
+    def _stat_items(self) -> Iterator[Tuple[str, "AbstractStat"]]:
+        """The ``(name, stat)`` pairs of the direct children, in order."""
+        for name, value in getattr(self, "__dict__", {}).items():
+            if isinstance(value, AbstractStat):
+                yield name, value
+
+    def _walk_names(self, depth: int = 0) -> Iterator[Tuple[int, str]]:
+        """The ``(depth, name)`` of all the stats under this one, depth
+        first."""
+        for name, child in self._stat_items():
+            yield depth, name
+            yield from child._walk_names(depth + 1)
+
+    def _path_index(self) -> _PathIndex:
+        """
+        The path index of this stat, built on first use. It is rebuilt after
+        a child stat was added or removed anywhere, in this stat's tree or
+        in any other.
+        """
+        index = getattr(self, "_cached_index", None)
+        if index is None or index.generation != _generation:
+            names = []
+            parents = array("l")
+            by_name = {}
+            # position of the last stat seen at each depth
+            stack = []
+            for position, (depth, name) in enumerate(self._walk_names()):
+                del stack[depth:]
+                name = sys.intern(name)
+                names.append(name)
+                parents.append(stack[-1] if stack else -1)
+                by_name.setdefault(name, array("l")).append(position)
+                stack.append(position)
+            index = _PathIndex(names, parents, by_name, _generation)
+            object.__setattr__(self, "_cached_index", index)
+        return index
+
     def children(
         self,
         predicate: Optional[Callable[[str], bool]] = None,
@@ -63,18 +158,29 @@ class AbstractStat(SerializableStat):
         """
 
         to_return = []
-        for attr in self.__dict__:
-            obj = getattr(self, attr)
-            if isinstance(obj, AbstractStat):
-                if (predicate and predicate(attr)) or not predicate:
-                    to_return.append(obj)
-                if recursive:
-                    to_return = to_return + obj.children(
-                        predicate=predicate, recursive=True
-                    )
+        for attr, obj in self._stat_items():
+            if (predicate and predicate(attr)) or not predicate:
+                to_return.append(obj)
+            if recursive:
+                to_return = to_return + obj.children(
+                    predicate=predicate, recursive=True
+                )
 
         return to_return
 
+    def get(self, path: str) -> "AbstractStat":
+        """Get a stat by its path relative to this stat.
+
+        .. code-block::
+
+            >>> simstat.get('system.cpu.ipc')
+            1.5
+
+        :param path: The names of the stats leading to the stat, separated
+                     by dots.
+        """
+        return self._resolve(tuple(path.split(".")))
+
     def find(self, regex: Union[str, Pattern]) -> List["AbstractStat"]:
         """Find all stats that match the name, recursively through all the
         SimStats.
@@ -89,6 +195,10 @@ class AbstractStat(SerializableStat):
 
             The above will not match ``cpu_other``.
 
+        The regex is only matched against the distinct stat names of a
+        cached index of the tree, not against every stat of the tree, and
+        only the stats found are looked up.
+
         :param regex: The regular expression used to search. Can be a
                 precompiled regex or a string in regex format.
         """
@@ -96,6 +206,20 @@ class AbstractStat(SerializableStat):
             pattern = re.compile(regex)
         else:
             pattern = regex
-        return self.children(
-            lambda _name: re.match(pattern, _name), recursive=True
-        )
+        index = self._path_index()
+        positions = []
+        for name, where in index.by_name.items():
+            if re.match(pattern, name):
+                positions += where
+        positions.sort()
+        return [self._resolve(index.path(i)) for i in positions]
+
+    def _child(self, name: str) -> "AbstractStat":
+        """The direct child called ``name``."""
+        return getattr(self, name)
+
+    def _resolve(self, path: Tuple[str, ...]) -> "AbstractStat":
+        stat = self
+        for name in path:
+            stat = stat._child(name)
+        return stat
@@ -0,0 +1,548 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Incrementally harvest the statistics of many gem5 run directories into a
+SQLite database, so they can be queried without parsing the stats files
+again.
+
+A run directory is any directory holding a ``stats.txt`` (or, failing that,
+a ``stats.json``) file. Its parameters are read from a ``params.json`` file
+next to the stats, as written by sweep launchers, if there is one.
+
+Harvesting is incremental: a stats file is only parsed again when its
+modification time or size changed *and* its content hash differs from the
+one stored in the index.
+
+Usage
+-----
+
+.. code-block::
+
+    from m5.ext.pystats.harvester import Harvester
+
+    with Harvester("runs/stats.db") as harvester:
+        harvester.harvest(["runs/"])
+        for row in harvester.query(
+            "system.cpu.ipc", by=["read_issue_latency"], benchmark="mcf_r"
+        ):
+            print(row)
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .abstract_stat import AbstractStat
+from .group import Vector
+from .jsonloader import load
+from .statistic import (
+    BaseScalarVector,
+    Scalar,
+)
+
+STATS_FILES = ("stats.txt", "stats.json")
+PARAMS_FILE = "params.json"
+
+_BEGIN_MARKER = "---------- Begin Simulation Statistics ----------"
+_END_MARKER = "---------- End Simulation Statistics   ----------"
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    directory TEXT UNIQUE NOT NULL,
+    stats_file TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    dumps INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    dump INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, dump, name)
+);
+CREATE INDEX IF NOT EXISTS stats_by_name ON stats (name, run_id);
+CREATE INDEX IF NOT EXISTS params_by_name ON params (name, value);
+"""
+
+
+def _number(text: str) -> Optional[Union[int, float]]:
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    # SQLite cannot store NaN
+    return None if math.isnan(value) else value
+
+
+def parse_stats_txt(fp: IO[str]) -> List[Dict[str, Union[int, float]]]:
+    """
+    Parse a gem5 ``stats.txt`` file.
+
+    :param fp: The open stats file.
+
+    :returns: One ``{stat name: value}`` dictionary per stats dump in the
+              file, in order. Only the first value of a line is kept, the
+              percentages that follow distribution buckets are dropped.
+    """
+    dumps = []
+    current = None
+    for line in fp:
+        if line.startswith("----------"):
+            if line.startswith(_BEGIN_MARKER):
+                current = {}
+            elif line.startswith(_END_MARKER) and current is not None:
+                dumps.append(current)
+                current = None
+            continue
+        if current is None:
+            continue
+        fields = line.split(None, 2)
+        if len(fields) < 2:
+            continue
+        value = _number(fields[1])
+        if value is not None or fields[1] in ("nan", "-nan"):
+            current[fields[0]] = value
+    return dumps
+
+
+def flatten(
+    stat: AbstractStat, prefix: str = ""
+) -> Dict[str, Union[int, float, None]]:
+    """
+    Flatten a ``SimStat`` (or ``Group``) into ``{stat name: value}`` using the
+    stats.txt naming: groups are joined with ``.`` and vector entries with
+    ``::``. Distributions and accumulators only contribute their total.
+
+    :param stat: The stat to flatten.
+    :param prefix: The name of ``stat`` itself.
+    """
+    flat = {}
+    separator = "::" if isinstance(stat, Vector) else "."
+    for name, child in stat._stat_items():
+        full_name = f"{prefix}{separator}{name}" if prefix else name
+        if isinstance(child, Scalar):
+            flat[full_name] = child.value
+        elif isinstance(child, BaseScalarVector):
+            flat[f"{full_name}::total"] = child.count()
+        else:
+            flat.update(flatten(child, full_name))
+    return flat
+
+
+def read_stats(path: str) -> List[Dict[str, Union[int, float, None]]]:
+    """
+    Read a ``stats.txt`` or ``stats.json`` file.
+
+    :returns: One ``{stat name: value}`` dictionary per stats dump.
+    """
+    with open(path) as fp:
+        if path.endswith(".json"):
+            return [flatten(load(fp))]
+        return parse_stats_txt(fp)
+
+
+def file_digest(path: str) -> str:
+    """The sha1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_runs(roots: Iterable[str]) -> Dict[str, str]:
+    """
+    Find the run directories under ``roots``.
+
+    :returns: ``{run directory: stats file}``
+    """
+    runs = {}
+    for root in roots:
+        for directory, _, files in os.walk(root):
+            for name in STATS_FILES:
+                if name in files:
+                    runs[os.path.abspath(directory)] = os.path.join(
+                        os.path.abspath(directory), name
+                    )
+                    break
+    return runs
+
+
+def read_params(directory: str) -> Dict[str, Any]:
+    """
+    The parameters of a run: the content of its ``params.json`` if it has
+    one. ``benchmark`` defaults to the directory name without a trailing
+    ``_<number>``, the naming used by the ``run_*_spec.py`` launchers.
+    """
+    params = {}
+    try:
+        with open(os.path.join(directory, PARAMS_FILE)) as f:
+            params = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if "benchmark" not in params:
+        params["benchmark"] = re.sub(
+            r"_[0-9]+$", "", os.path.basename(directory)
+        )
+    return params
+
+
+def _sql_value(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def _harvest_one(
+    stats_file: str, known_sha1: Optional[str]
+) -> Tuple[str, Optional[List[Dict]]]:
+    """Hash a stats file, and parse it unless its hash is ``known_sha1``."""
+    sha1 = file_digest(stats_file)
+    if sha1 == known_sha1:
+        return sha1, None
+    return sha1, read_stats(stats_file)
+
+
+class HarvestSummary(NamedTuple):
+    added: int
+    updated: int
+    unchanged: int
+    removed: int
+
+
+class Harvester:
+    """
+    Keeps an on-disk index of harvested run directories and their stats.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        stats: Optional[Sequence[Union[str, Pattern]]] = None,
+        workers: Optional[int] = None,
+    ):
+        """
+        :param database: The SQLite database file. Created if needed.
+        :param stats: Regular expressions of the stat names to keep. A name
+                      is kept if any of them fully matches it. If not given,
+                      the selection the database was created with is used,
+                      all stats for a new database. Changing the selection
+                      of an existing database empties it, every run is then
+                      harvested again.
+        :param workers: Processes used to hash and parse stats files.
+                        Defaults to the CPU count.
+        """
+        self.workers = workers
+        self._db = sqlite3.connect(database)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'stats'"
+        ).fetchone()
+        stored = json.loads(row[0]) if row is not None else []
+        selection = (
+            stored
+            if stats is None
+            else [p if isinstance(p, str) else p.pattern for p in stats]
+        )
+        if row is None or selection != stored:
+            with self._db:
+                self._db.execute("DELETE FROM runs")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('stats', ?)",
+                    (json.dumps(selection),),
+                )
+        self._patterns = [re.compile(p) for p in selection]
+
+    def __enter__(self) -> "Harvester":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _selected(self, name: str) -> bool:
+        return not self._patterns or any(
+            p.fullmatch(name) for p in self._patterns
+        )
+
+    def harvest(
+        self, roots: Iterable[str], prune: bool = False
+    ) -> HarvestSummary:
+        """
+        Index every run directory under ``roots``.
+
+        :param roots: Directories searched recursively for run directories.
+        :param prune: Also forget the runs of the index whose stats file no
+                      longer exists.
+        """
+        runs = find_runs(roots)
+        known = {
+            directory: (run_id, stats_file, mtime_ns, size, sha1)
+            for run_id, directory, stats_file, mtime_ns, size, sha1 in (
+                self._db.execute(
+                    "SELECT id, directory, stats_file, mtime_ns, size, sha1 "
+                    "FROM runs"
+                )
+            )
+        }
+
+        # cheap check first: runs whose stats file kept its mtime and size
+        # are not even hashed
+        candidates = []
+        unchanged = 0
+        for directory, stats_file in runs.items():
+            st = os.stat(stats_file)
+            entry = known.get(directory)
+            if (
+                entry is not None
+                and entry[1] == stats_file
+                and entry[2] == st.st_mtime_ns
+                and entry[3] == st.st_size
+            ):
+                unchanged += 1
+                continue
+            candidates.append((directory, stats_file, st))
+
+        added = updated = 0
+        with ProcessPoolExecutor(self.workers) as executor:
+            results = executor.map(
+                _harvest_one,
+                [c[1] for c in candidates],
+                [
+                    known[c[0]][4] if c[0] in known else None
+                    for c in candidates
+                ],
+                chunksize=16,
+            )
+            for (directory, stats_file, st), (sha1, dumps) in zip(
+                candidates, results
+            ):
+                with self._db:
+                    if dumps is None:
+                        # touched but identical
+                        self._db.execute(
+                            "UPDATE runs SET mtime_ns = ?, size = ? "
+                            "WHERE directory = ?",
+                            (st.st_mtime_ns, st.st_size, directory),
+                        )
+                        unchanged += 1
+                        continue
+                    if directory in known:
+                        updated += 1
+                    else:
+                        added += 1
+                    self._store(directory, stats_file, st, sha1, dumps)
+
+        removed = 0
+        if prune:
+            gone = [
+                (entry[0],)
+                for directory, entry in known.items()
+                if directory not in runs
+            ]
+            with self._db:
+                self._db.executemany("DELETE FROM runs WHERE id = ?", gone)
+            removed = len(gone)
+
+        return HarvestSummary(added, updated, unchanged, removed)
+
+    def _store(
+        self,
+        directory: str,
+        stats_file: str,
+        st: os.stat_result,
+        sha1: str,
+        dumps: List[Dict],
+    ) -> None:
+        self._db.execute("DELETE FROM runs WHERE directory = ?", (directory,))
+        run_id = self._db.execute(
+            "INSERT INTO runs "
+            "(directory, stats_file, mtime_ns, size, sha1, dumps) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                directory,
+                stats_file,
+                st.st_mtime_ns,
+                st.st_size,
+                sha1,
+                len(dumps),
+            ),
+        ).lastrowid
+        self._db.executemany(
+            "INSERT INTO params VALUES (?, ?, ?)",
+            (
+                (run_id, name, _sql_value(value))
+                for name, value in read_params(directory).items()
+            ),
+        )
+        self._db.executemany(
+            "INSERT INTO stats VALUES (?, ?, ?, ?)",
+            (
+                (run_id, dump, name, value)
+                for dump, stats in enumerate(dumps)
+                for name, value in stats.items()
+                if self._selected(name)
+            ),
+        )
+
+    def runs(self, **where: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        The harvested runs and their parameters.
+
+        :param where: Only the runs with these parameter values.
+
+        :returns: ``(run directory, {parameter: value})`` tuples.
+        """
+        sql, args = self._select_runs(where)
+        return [
+            (
+                directory,
+                dict(
+                    self._db.execute(
+                        "SELECT name, value FROM params WHERE run_id = ?",
+                        (run_id,),
+                    )
+                ),
+            )
+            for run_id, directory in self._db.execute(
+                f"SELECT runs.id, runs.directory {sql} "
+                "ORDER BY runs.directory",
+                args,
+            )
+        ]
+
+    def stat_names(self, regex: Union[str, Pattern] = ".*") -> List[str]:
+        """The names of the harvested stats that fully match ``regex``."""
+        pattern = re.compile(regex)
+        return [
+            name
+            for (name,) in self._db.execute(
+                "SELECT DISTINCT name FROM stats ORDER BY name"
+            )
+            if pattern.fullmatch(name)
+        ]
+
+    def query(
+        self,
+        stat: str,
+        by: Sequence[str] = (),
+        dump: int = -1,
+        **where: Any,
+    ) -> List[Tuple]:
+        """
+        The value of a stat across the harvested runs.
+
+        .. code-block::
+
+            >>> harvester.query(
+            ...     "system.cpu.ipc", by=["read_issue_latency"],
+            ...     benchmark="mcf_r"
+            ... )
+            [('/runs/.../0a1b', 0, 0.71), ('/runs/.../3c4d', 59, 0.64)]
+
+        :param stat: The stat name, as in stats.txt.
+        :param by: Parameters to return (and sort by) with each value.
+        :param dump: Which stats dump of each run to use. Negative values
+                     count from the last dump, like list indices.
+        :param where: Only the runs with these parameter values.
+
+        :returns: ``(run directory, *parameters in by, value)`` tuples.
+        """
+        sql, args = self._select_runs(where)
+        columns = ["runs.directory"]
+        joins = []
+        for i, name in enumerate(by):
+            columns.append(f"b{i}.value")
+            joins.append(
+                f"LEFT JOIN params AS b{i} "
+                f"ON b{i}.run_id = runs.id AND b{i}.name = ?"
+            )
+        if dump < 0:
+            dump_sql = "stats.dump = runs.dumps + ?"
+        else:
+            dump_sql = "stats.dump = ?"
+        # placeholders, in the order they appear in the query
+        return self._db.execute(
+            f"SELECT {', '.join(columns)}, stats.value {sql} "
+            f"JOIN stats ON stats.run_id = runs.id "
+            f"AND stats.name = ? AND {dump_sql} "
+            f"{' '.join(joins)} "
+            f"ORDER BY {', '.join(columns[1:] + ['runs.directory'])}",
+            [*args, stat, dump, *by],
+        ).fetchall()
+
+    def _select_runs(self, where: Dict[str, Any]) -> Tuple[str, List]:
+        """The ``FROM`` clause selecting the runs matching ``where``."""
+        sql = "FROM runs"
+        args = []
+        for i, (name, value) in enumerate(where.items()):
+            sql += (
+                f" JOIN params AS w{i} ON w{i}.run_id = runs.id "
+                f"AND w{i}.name = ? AND w{i}.value = ?"
+            )
+            args += [name, _sql_value(value)]
+        return sql, args
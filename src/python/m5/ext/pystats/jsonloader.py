@@ -24,13 +24,20 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import io
 import json
 from json.decoder import JSONDecodeError
 from typing import (
     IO,
+    Any,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
     Union,
 )
 
+from .abstract_stat import AbstractStat
 from .group import (
     Group,
     Vector,
@@ -42,6 +49,52 @@ from .statistic import (
     Scalar,
     Statistic,
 )
+from .streaming import open_stats_file
+
+
+def _to_stat(d: dict) -> Union[SimStat, Statistic, Group]:
+    """
+    Converts a JSON object, whose own JSON objects have already been
+    converted, into a SimStat object.
+    """
+    if "type" in d:
+        if d["type"] == "Scalar":
+            d.pop("type", None)
+            return Scalar(**d)
+
+        elif d["type"] == "Distribution":
+            d.pop("type", None)
+            return Distribution(**d)
+
+        elif d["type"] == "Accumulator":
+            d.pop("type", None)
+            return Accumulator(**d)
+
+        elif d["type"] == "Group":
+            return Group(**d)
+
+        elif d["type"] == "Vector":
+            d.pop("type", None)
+            d.pop("time_conversion", None)
+            return Vector(d)
+
+        else:
+            raise ValueError(f"SimStat object has invalid type {d['type']}")
+    else:
+        return SimStat(**d)
+
+
+def _to_stat_tree(d: dict) -> Union[SimStat, Statistic, Group]:
+    """
+    Converts a JSON object and, bottom-up, all the JSON objects it holds,
+    like ``JsonLoader`` does.
+    """
+    return _to_stat(
+        {
+            key: _to_stat_tree(value) if isinstance(value, dict) else value
+            for key, value in d.items()
+        }
+    )
 
 
 class JsonLoader(json.JSONDecoder):
@@ -62,43 +115,168 @@ class JsonLoader(json.JSONDecoder):
     """
 
     def __init__(self):
-        super().__init__(self, object_hook=self.__json_to_simstat)
+        super().__init__(object_hook=_to_stat)
 
-    def __json_to_simstat(self, d: dict) -> Union[SimStat, Statistic, Group]:
-        if "type" in d:
-            if d["type"] == "Scalar":
-                d.pop("type", None)
-                return Scalar(**d)
 
-            elif d["type"] == "Distribution":
-                d.pop("type", None)
-                return Distribution(**d)
+# attributes holding JSON objects which are not stats
+_NOT_STATS = ("time_conversion",)
+
+
+def _split_raw(d: dict) -> Tuple[Dict[str, str], Dict]:
+    """
+    Split a JSON object into its stat children, serialized back to compact
+    JSON text, and its other attributes, converted. A string holding the
+    JSON text of a subtree takes much less memory than the objects it
+    decodes to.
+    """
+    stats = {}
+    attributes = {}
+    for key, value in d.items():
+        if isinstance(value, dict) and key not in _NOT_STATS:
+            stats[key] = json.dumps(value, separators=(",", ":"))
+        elif isinstance(value, dict):
+            attributes[key] = _to_stat_tree(value)
+        else:
+            attributes[key] = value
+    return stats, attributes
+
+
+def _materialize(text: str) -> Union[Statistic, Group]:
+    """Convert the JSON text of a stat into the stat."""
+    d = json.loads(text)
+    if d.get("type") == "Group":
+        return LazyGroup(d)
+    # statistics and vectors are small, they are converted in one go
+    return _to_stat_tree(d)
+
+
+class _LazyStats:
+    """
+    Mixin for the stats whose children are converted from JSON on first
+    access. The children not accessed yet are kept as JSON text.
+    """
+
+    def _init_lazy(self, stats: Dict) -> None:
+        object.__setattr__(self, "_raw", stats)
+        # the order of the children, as in the JSON
+        object.__setattr__(self, "_order", dict.fromkeys(stats))
+
+    def __setattr__(self, name: str, value) -> None:
+        self._unload(name, keep=isinstance(value, AbstractStat))
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        self._unload(name, keep=False)
+        super().__delattr__(name)
 
-            elif d["type"] == "Accumulator":
-                d.pop("type", None)
-                return Accumulator(**d)
+    def _unload(self, name: str, keep: bool) -> None:
+        """Prepare the replacement or removal of the child ``name``: convert
+        it if it is still JSON, so the change is one of a child stat, and
+        forget its position unless another stat takes it."""
+        if name in self.__dict__.get("_raw", ()):
+            self._child(name)
+        if not keep:
+            self.__dict__.get("_order", {}).pop(name, None)
 
-            elif d["type"] == "Group":
-                return Group(**d)
+    def __getattr__(self, name: str):
+        # only called when the attribute is not found the normal way
+        raw = self.__dict__.get("_raw")
+        if raw is None or name not in raw:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        return self._child(name)
 
-            elif d["type"] == "Vector":
-                d.pop("type", None)
-                d.pop("time_conversion", None)
-                return Vector(d)
+    def _child(self, name: str) -> AbstractStat:
+        raw = self.__dict__["_raw"]
+        if name not in raw:
+            return super()._child(name)
+        child = _materialize(raw.pop(name))
+        # the path index already knows about this child
+        object.__setattr__(self, name, child)
+        return child
 
+    def _stat_items(self) -> Iterator[Tuple[str, AbstractStat]]:
+        order = self.__dict__["_order"]
+        for name in order:
+            yield name, self._child(name)
+        for name, value in super()._stat_items():
+            if name not in order:
+                yield name, value
+
+    def _walk_names(self, depth: int = 0) -> Iterator[Tuple[int, str]]:
+        raw = self.__dict__["_raw"]
+        order = self.__dict__["_order"]
+        for name in order:
+            yield depth, name
+            if name in raw:
+                yield from _walk_raw_names(json.loads(raw[name]), depth + 1)
             else:
-                raise ValueError(
-                    f"SimStat object has invalid type {d['type']}"
-                )
-        else:
-            return SimStat(**d)
+                yield from self.__dict__[name]._walk_names(depth + 1)
+        for name, value in super()._stat_items():
+            if name not in order:
+                yield depth, name
+                yield from value._walk_names(depth + 1)
+
+    def _attributes(self) -> Iterator[Tuple[str, Any]]:
+        for name, value in super()._attributes():
+            if name not in ("_raw", "_order"):
+                yield name, value
+
+    def to_json(self) -> Dict:
+        raw = self.__dict__["_raw"]
+        model_dct = super().to_json()
+        for name in self.__dict__["_order"]:
+            if name in raw:
+                # converted for the output only, it stays unaccessed
+                model_dct[name] = _materialize(raw[name]).to_json()
+            else:
+                model_dct[name] = model_dct.pop(name)
+        return model_dct
+
+
+def _walk_raw_names(d: dict, depth: int) -> Iterator[Tuple[int, str]]:
+    for key, value in d.items():
+        if isinstance(value, dict) and key not in _NOT_STATS:
+            yield depth, key
+            yield from _walk_raw_names(value, depth + 1)
+
+
+class LazyGroup(_LazyStats, Group):
+    """
+    A ``Group`` loaded from JSON whose children are only converted to
+    pystats objects when they are first accessed.
+    """
+
+    def __init__(self, d: dict):
+        stats, attributes = _split_raw(d)
+        Group.__init__(self, **attributes)
+        self._init_lazy(stats)
+
+
+class LazySimStat(_LazyStats, SimStat):
+    """
+    A ``SimStat`` loaded from JSON whose children are only converted to
+    pystats objects when they are first accessed.
+    """
 
+    def __init__(self, d: dict):
+        stats, attributes = _split_raw(d)
+        SimStat.__init__(self, **attributes)
+        self._init_lazy(stats)
 
-def load(json_file: IO) -> SimStat:
+
+def load(json_file: IO, lazy: bool = False) -> SimStat:
     """
     Wrapper function that provides a cleaner interface for using the
     JsonLoader class.
 
+    :param json_file: The stats JSON file.
+    :param lazy: Only convert the groups and statistics to pystats objects
+                 when they are first accessed. Loading many large stats
+                 files to look at a few of their stats then takes a fraction
+                 of the memory and time.
+
     Usage
     -----
 
@@ -111,5 +289,37 @@ def load(json_file: IO) -> SimStat:
 
     """
 
+    if lazy:
+        d = json.load(json_file)
+        if "type" in d:
+            return LazyGroup(d) if d["type"] == "Group" else _to_stat_tree(d)
+        return LazySimStat(d)
+
     simstat_object = json.load(json_file, cls=JsonLoader)
     return simstat_object
+
+
+def _loads(line: str, lazy: bool) -> SimStat:
+    if lazy:
+        return load(io.StringIO(line), lazy=True)
+    return json.loads(line, cls=JsonLoader)
+
+
+def load_lines(
+    path: str, compression: Optional[str] = None, lazy: bool = False
+) -> Iterator[SimStat]:
+    """
+    Iterate over the stats dumps of a JSON Lines stats file, as written by
+    the ``json://stats.jsonl?lines=True`` stats output, one ``SimStat`` per
+    dump. Only one dump is held in memory at a time.
+
+    :param path: The stats file. It may be gzip or zstd compressed.
+    :param compression: "gzip", "zstd", "none", or ``None`` to infer it
+                        from the extension of ``path``.
+    :param lazy: As for ``load()``.
+    """
+
+    with open_stats_file(path, "r", compression) as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line, lazy)
@@ -26,17 +26,39 @@
 
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import (
     IO,
     Any,
     Dict,
+    Iterator,
     List,
+    Tuple,
     Union,
 )
 
 from .storagetype import StorageType
 
 
+@lru_cache(maxsize=None)
+def _serialized_slots(cls: type) -> Tuple[str, ...]:
+    """
+    The slot attributes of ``cls`` to serialize, base classes first. Slots
+    named ``_cached*`` hold internal caches and are skipped.
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name in ("__dict__", "__weakref__"):
+                continue
+            if not name.startswith("_cached"):
+                names.append(name)
+    return tuple(names)
+
+
 class SerializableStat:
     """
     Classes which inherit from SerializableStat can be serialized as JSON
@@ -54,6 +76,21 @@ class SerializableStat:
 
     """
 
+    __slots__ = ()
+
+    def _attributes(self) -> Iterator[Tuple[str, Any]]:
+        """
+        The ``(name, value)`` pairs of the attributes to serialize: those
+        declared in the ``__slots__`` of the class hierarchy (base classes
+        first), then the instance ``__dict__``, if any.
+        """
+        for name in _serialized_slots(type(self)):
+            try:
+                yield name, getattr(self, name)
+            except AttributeError:
+                pass
+        yield from getattr(self, "__dict__", {}).items()
+
     def to_json(self) -> Dict:
         """
         Translates the current object into a JSON dictionary.
@@ -62,36 +99,10 @@ class SerializableStat:
         """
 
         model_dct = {}
-        for key, value in self.__dict__.items():
-            new_value = self.__process_json_value(value)
-            model_dct[key] = new_value
+        for key, value in self._attributes():
+            model_dct[key] = to_json_value(value)
         return model_dct
 
-    def __process_json_value(
-        self, value: Any
-    ) -> Union[str, int, float, Dict, List, None]:
-        """
-        Translate values into a value which can be handled by the Python stdlib
-        JSON package.
-
-        :param value: The value to be translated.
-
-        :returns: A value which can be handled by the Python stdlib JSON package.
-        """
-
-        if isinstance(value, SerializableStat):
-            return value.to_json()
-        elif isinstance(value, (str, int, float)):
-            return value
-        elif isinstance(value, datetime):
-            return value.replace(microsecond=0).isoformat()
-        elif isinstance(value, list):
-            return [self.__process_json_value(v) for v in value]
-        elif isinstance(value, StorageType):
-            return str(value.name)
-
-        return None
-
     def dumps(self, **kwargs) -> str:
         """
         This function mirrors the Python stdlib JSON module method
@@ -157,3 +168,27 @@ class SerializableStat:
             kwargs["indent"] = 4
 
         json.dump(obj=self.to_json(), fp=fp, **kwargs)
+
+
+def to_json_value(value: Any) -> Union[str, int, float, Dict, List, None]:
+    """
+    Translate values into a value which can be handled by the Python stdlib
+    JSON package.
+
+    :param value: The value to be translated.
+
+    :returns: A value which can be handled by the Python stdlib JSON package.
+    """
+
+    if isinstance(value, SerializableStat):
+        return value.to_json()
+    elif isinstance(value, (str, int, float)):
+        return value
+    elif isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat()
+    elif isinstance(value, list):
+        return [to_json_value(v) for v in value]
+    elif isinstance(value, StorageType):
+        return str(value.name)
+
+    return None
@@ -24,6 +24,7 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import sys
 from abc import ABC
 from typing import (
     Any,
@@ -37,11 +38,20 @@ from .abstract_stat import AbstractStat
 from .storagetype import StorageType
 
 
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class Statistic(ABC, AbstractStat):
     """
     The abstract base class for all Python statistics.
     """
 
+    __slots__ = ("value", "type", "unit", "description", "datatype")
+
+    # statistics have no children, so no path index to keep up to date
+    __setattr__ = object.__setattr__
+
     value: Any
     type: Optional[str]
     unit: Optional[str]
@@ -57,10 +67,12 @@ class Statistic(ABC, AbstractStat):
         datatype: Optional[StorageType] = None,
     ):
         self.value = value
-        self.type = type
-        self.unit = unit
-        self.description = description
-        self.datatype = datatype
+        # the same few types, units and descriptions are repeated across the
+        # stats of every core and component, interning shares them
+        self.type = _intern(type)
+        self.unit = _intern(unit)
+        self.description = _intern(description)
+        self.datatype = _intern(datatype)
 
     def __repr__(self):
         return str(self.value)
@@ -71,6 +83,8 @@ class Scalar(Statistic):
     A scalar Python statistic type.
     """
 
+    __slots__ = ()
+
     value: Union[float, int]
 
     def __init__(
@@ -94,6 +108,8 @@ class BaseScalarVector(Statistic):
     An abstract base class for classes containing a vector of Scalar values.
     """
 
+    __slots__ = ()
+
     value: List[Union[int, float]]
 
     def __init__(
@@ -145,6 +161,19 @@ class Distribution(BaseScalarVector):
     It is assumed each bucket is of equal size.
     """
 
+    # in the order they are set, which is the order of the JSON output
+    __slots__ = (
+        "min",
+        "max",
+        "num_bins",
+        "bin_size",
+        "sum",
+        "underflow",
+        "overflow",
+        "logs",
+        "sum_squared",
+    )
+
     min: Union[float, int]
     max: Union[float, int]
     num_bins: int
@@ -199,6 +228,8 @@ class Accumulator(BaseScalarVector):
     A statistical type representing an accumulator.
     """
 
+    __slots__ = ("_count", "min", "max", "sum_squared")
+
     _count: int
     min: Union[int, float]
     max: Union[int, float]
@@ -0,0 +1,458 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Columnar tables of gem5 statistics, and their comparison across runs.
+
+A ``StatsTable`` holds the stats dumps of one run as a numpy array with one
+row per dump and one column per stat, named as in ``stats.txt`` (vector
+entries and distribution buckets are columns of their own, e.g.
+``system.cpu.op_class::IntAlu`` or ``system.mem_ctrl.rdQLenPdf::3``).
+Stats missing from a dump, or whose value is not a number, are NaN.
+
+A ``RunTable`` joins many runs into one table with a row per run, keyed by
+the parameters of the run (see ``harvester.read_params``):
+
+.. code-block::
+
+    from m5.ext.pystats.stats_table import read_runs
+
+    runs = read_runs(["runs/sweep"], stats=[r".*\\.ipc", r".*bwTotal::total"])
+    benchmarks, latencies, ipc = runs.pivot(
+        "system.switch_cpus.ipc", index="benchmark", columns="latency"
+    )
+    speedup = runs.relative("system.switch_cpus.ipc", latency=0)
+
+numpy is required, pandas is only needed for ``RunTable.to_pandas()``.
+"""
+
+import copy
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .harvester import (
+    find_runs,
+    flatten,
+    parse_stats_txt,
+    read_params,
+)
+from .jsonloader import (
+    load,
+    load_lines,
+)
+from .streaming import open_stats_file
+
+Patterns = Optional[Union[str, Pattern, Sequence[Union[str, Pattern]]]]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise Exception(
+            f"ImportError: {e}\n"
+            "Stats tables require numpy. Install it with `pip install numpy`."
+        )
+    return numpy
+
+
+def _compile(patterns: Patterns) -> Optional[Pattern]:
+    """One regular expression matching any of ``patterns``."""
+    if patterns is None:
+        return None
+    if isinstance(patterns, (str, Pattern)):
+        patterns = [patterns]
+    return re.compile(
+        "|".join(
+            f"(?:{p.pattern if isinstance(p, Pattern) else p})"
+            for p in patterns
+        )
+    )
+
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True)
+
+
+class StatsTable:
+    """
+    Stats dumps as a ``(dumps, stats)`` numpy array of float64, with the
+    stat names as column labels.
+    """
+
+    def __init__(self, names: List[str], values: "numpy.ndarray"):
+        """
+        :param names: The stat name of each column.
+        :param values: The values, one row per dump.
+        """
+        if values.shape[1] != len(names):
+            raise ValueError(
+                f"{len(names)} names given for {values.shape[1]} columns."
+            )
+        self.names = names
+        self.values = values
+        self._columns = {name: i for i, name in enumerate(names)}
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, name: str) -> "numpy.ndarray":
+        return self.column(name)
+
+    def column(self, name: str) -> "numpy.ndarray":
+        """The values of the stat ``name``, one per row."""
+        try:
+            return self.values[:, self._columns[name]]
+        except KeyError:
+            raise KeyError(f"No stat named '{name}' in the table.")
+
+    def matching(self, patterns: Patterns) -> List[str]:
+        """The stat names fully matching any of the regular expressions."""
+        regex = _compile(patterns)
+        return [name for name in self.names if regex.fullmatch(name)]
+
+    def _with_columns(self, names: List[str]) -> "StatsTable":
+        table = copy.copy(self)
+        StatsTable.__init__(
+            table,
+            names,
+            self.values[:, [self._columns[name] for name in names]],
+        )
+        return table
+
+    def select(self, patterns: Patterns) -> "StatsTable":
+        """A table of only the stats fully matching ``patterns``."""
+        return self._with_columns(self.matching(patterns))
+
+    def sum(self, patterns: Patterns) -> "numpy.ndarray":
+        """
+        The sum of the stats matching ``patterns``, per row, ignoring NaNs.
+        For instance ``sum(r".*\\.dram\\.bwTotal::total")`` is the bandwidth
+        of all the memory controllers.
+        """
+        np = _numpy()
+        names = self.matching(patterns)
+        if not names:
+            raise KeyError(f"No stat matches {patterns}.")
+        return np.nansum(self._with_columns(names).values, axis=1)
+
+    def vector(self, name: str) -> Dict[str, "numpy.ndarray"]:
+        """
+        The entries of a vector or distribution stat, without its name:
+        ``{"IntAlu": ..., "FloatAdd": ...}`` for ``system.cpu.op_class``.
+        """
+        prefix = f"{name}::"
+        return {
+            column[len(prefix) :]: self.values[:, i]
+            for column, i in self._columns.items()
+            if column.startswith(prefix)
+        }
+
+
+def _read_txt(fp: IO[str], regex: Optional[Pattern]) -> StatsTable:
+    # the stats.txt parser of the harvester, so that both read the same
+    # values
+    return _from_dicts(parse_stats_txt(fp), regex)
+
+
+def _from_dicts(
+    dumps: Iterable[Dict[str, Any]], regex: Optional[Pattern]
+) -> StatsTable:
+    np = _numpy()
+    columns: Dict[str, int] = {}
+    # whether to keep each stat name, matched against the regex only once
+    keep: Dict[str, bool] = {}
+    rows = []
+    for dump in dumps:
+        row = {}
+        for name, value in dump.items():
+            kept = keep.get(name)
+            if kept is None:
+                kept = keep[name] = (
+                    regex is None or regex.fullmatch(name) is not None
+                )
+            if not kept:
+                continue
+            row[columns.setdefault(name, len(columns))] = (
+                np.nan if value is None else value
+            )
+        rows.append(row)
+    values = np.full((len(rows), len(columns)), np.nan)
+    for i, row in enumerate(rows):
+        values[i, list(row)] = list(row.values())
+    return StatsTable(list(columns), values)
+
+
+def read_stats_table(
+    source: Union[str, IO[str]], stats: Patterns = None
+) -> StatsTable:
+    """
+    Read the stats dumps of a stats file into a table, one row per dump.
+
+    :param source: A ``stats.txt`` file, path or open file. Paths may also be
+                   gzip or zstd compressed, or JSON (``.json``) and JSON
+                   Lines (``.jsonl``) stats files.
+    :param stats: Regular expressions of the stat names to keep. A name is
+                  kept if any of them fully matches it. All by default.
+    """
+    regex = _compile(stats)
+    if not isinstance(source, str):
+        return _read_txt(source, regex)
+    name = re.sub(r"\.(gz|gzip|zst|zstd)$", "", source)
+    if name.endswith(".jsonl"):
+        return _from_dicts(map(flatten, load_lines(source)), regex)
+    with open_stats_file(source) as fp:
+        if name.endswith(".json"):
+            return _from_dicts([flatten(load(fp))], regex)
+        return _read_txt(fp, regex)
+
+
+def _read_rows(
+    path: str, stats: Patterns, dump: Optional[int]
+) -> Tuple[List[str], "numpy.ndarray"]:
+    table = read_stats_table(path, stats)
+    if dump is None:
+        return table.names, table.values
+    if -len(table) <= dump < len(table):
+        return table.names, table.values[[dump]]
+    return table.names, table.values[:0]
+
+
+class RunTable(StatsTable):
+    """
+    A ``StatsTable`` with one row per run (or per run and dump), and the
+    parameters of the run of every row.
+    """
+
+    def __init__(
+        self,
+        runs: List[str],
+        params: List[Dict[str, Any]],
+        names: List[str],
+        values: "numpy.ndarray",
+    ):
+        """
+        :param runs: The run directory of each row.
+        :param params: The parameters of each row.
+        :param names: The stat name of each column.
+        :param values: The values, one row per run.
+        """
+        if not len(runs) == len(params) == values.shape[0]:
+            raise ValueError("There must be one run and params per row.")
+        super().__init__(names, values)
+        self.runs = runs
+        self.params = params
+
+    def param(self, name: str) -> List[Any]:
+        """The value of parameter ``name`` of every row, None if unset."""
+        return [params.get(name) for params in self.params]
+
+    def _with_rows(self, rows: List[int]) -> "RunTable":
+        return RunTable(
+            [self.runs[i] for i in rows],
+            [self.params[i] for i in rows],
+            self.names,
+            self.values[rows],
+        )
+
+    def where(self, **params: Any) -> "RunTable":
+        """The rows whose parameters have the given values."""
+        return self._with_rows(
+            [
+                i
+                for i, row in enumerate(self.params)
+                if all(row.get(k) == v for k, v in params.items())
+            ]
+        )
+
+    def _stat(self, stat: Union[str, "numpy.ndarray"]) -> "numpy.ndarray":
+        if isinstance(stat, str):
+            return self.column(stat)
+        if len(stat) != len(self):
+            raise ValueError(f"{len(stat)} values given for {len(self)} rows.")
+        return stat
+
+    def pivot(
+        self, stat: Union[str, "numpy.ndarray"], index: str, columns: str
+    ) -> Tuple[List[Any], List[Any], "numpy.ndarray"]:
+        """
+        Lay out a stat by two parameters.
+
+        :param stat: The stat name, or one value per row, e.g. from
+                     ``sum()``.
+        :param index: The parameter whose values are the rows.
+        :param columns: The parameter whose values are the columns.
+
+        :returns: The row labels, the column labels, in order of appearance,
+                  and the ``(rows, columns)`` array of values. Missing
+                  combinations are NaN. Use ``where()`` first if other
+                  parameters vary, a combination given twice is an error.
+        """
+        np = _numpy()
+        values = self._stat(stat)
+        row_keys = [_hashable(v) for v in self.param(index)]
+        col_keys = [_hashable(v) for v in self.param(columns)]
+        rows = {k: i for i, k in enumerate(dict.fromkeys(row_keys))}
+        cols = {k: i for i, k in enumerate(dict.fromkeys(col_keys))}
+        out = np.full((len(rows), len(cols)), np.nan)
+        seen = set()
+        for r, c, value in zip(row_keys, col_keys, values):
+            if (r, c) in seen:
+                raise ValueError(
+                    f"Several runs have {index}={r} and {columns}={c}, "
+                    "select one with where()."
+                )
+            seen.add((r, c))
+            out[rows[r], cols[c]] = value
+        return list(rows), list(cols), out
+
+    def relative(
+        self, stat: Union[str, "numpy.ndarray"], **baseline: Any
+    ) -> "numpy.ndarray":
+        """
+        A stat of every row divided by that of its baseline run: the run
+        with the ``baseline`` parameter values and the same value for every
+        other parameter. NaN for rows without a baseline run.
+
+        ``relative("system.cpu.ipc", read_latency=0)`` is the speedup of every
+        run over the run of the same benchmark with no read latency. As for
+        ``pivot()``, ``stat`` may also be one value per row.
+        """
+        np = _numpy()
+        values = self._stat(stat)
+
+        def key(params):
+            return tuple(
+                sorted(
+                    (k, _hashable(v))
+                    for k, v in params.items()
+                    if k not in baseline
+                )
+            )
+
+        bases = {}
+        for params, value in zip(self.params, values):
+            if all(params.get(k) == v for k, v in baseline.items()):
+                bases[key(params)] = value
+        base = np.array(
+            [bases.get(key(params), np.nan) for params in self.params]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return values / base
+
+    def to_pandas(self) -> "pandas.DataFrame":
+        """A DataFrame with a column per parameter, then per stat."""
+        try:
+            import pandas
+        except ImportError as e:
+            raise Exception(
+                f"ImportError: {e}\n"
+                "to_pandas() requires pandas. Install it with "
+                "`pip install pandas`."
+            )
+        names = list(dict.fromkeys(k for p in self.params for k in p))
+        frame = pandas.DataFrame(
+            {name: self.param(name) for name in names}, index=self.runs
+        )
+        stats = pandas.DataFrame(self.values, columns=self.names)
+        stats.index = frame.index
+        return pandas.concat([frame, stats], axis=1)
+
+
+def read_runs(
+    roots: Iterable[str],
+    stats: Patterns = None,
+    dump: Optional[int] = -1,
+    workers: Optional[int] = None,
+) -> RunTable:
+    """
+    Read the stats of every run directory under ``roots`` (see
+    ``harvester.find_runs``) into one table, one row per run.
+
+    :param roots: Directories to search for runs.
+    :param stats: Regular expressions of the stat names to keep. Keeping
+                  only the stats to compare makes the table much smaller.
+    :param dump: The stats dump of each run to keep, the last by default.
+                 ``None`` keeps all of them, one row per run and dump, with
+                 the dump index as the ``dump`` parameter. Runs without that
+                 dump have no row.
+    :param workers: Processes parsing stats files. Defaults to the CPU
+                    count.
+    """
+    np = _numpy()
+    runs = find_runs(roots)
+    directories = sorted(runs)
+    with ProcessPoolExecutor(workers) as pool:
+        tables = list(
+            pool.map(
+                _read_rows,
+                [runs[d] for d in directories],
+                repeat(stats),
+                repeat(dump),
+                chunksize=max(1, len(directories) // 64),
+            )
+        )
+
+    columns: Dict[str, int] = {}
+    for names, _ in tables:
+        for name in names:
+            columns.setdefault(name, len(columns))
+    row_runs = []
+    row_params = []
+    values = np.full((sum(len(v) for _, v in tables), len(columns)), np.nan)
+    row = 0
+    for directory, (names, rows) in zip(directories, tables):
+        params = read_params(directory)
+        indices = [columns[name] for name in names]
+        for i, dump_values in enumerate(rows):
+            values[row, indices] = dump_values
+            row_runs.append(directory)
+            row_params.append(
+                params if dump is not None else dict(params, dump=i)
+            )
+            row += 1
+    return RunTable(row_runs, row_params, list(columns), values)
@@ -0,0 +1,237 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Incremental writing of statistics as JSON.
+
+``JsonStreamWriter`` writes a ``SimStat`` shaped JSON document to a file
+while the statistics are visited, one statistic at a time, without building
+the object tree or the nested dictionary of the whole simulation first. With
+the same ``indent`` the output is byte identical to ``SimStat.dump()``.
+
+``open_stats_file()`` opens plain, gzip and zstd compressed stats files.
+Appending to a compressed file adds a new gzip member, or zstd frame, which
+readers decompress as if the file had been written in one go. This is how
+JSON Lines stats files (one stats dump per line) are extended at every dump.
+"""
+
+import gzip
+import io
+import json
+from typing import (
+    IO,
+    Any,
+    List,
+    Optional,
+    Union,
+)
+
+from .serializable_stat import to_json_value
+
+COMPRESSIONS = ("gzip", "zstd")
+
+_SUFFIXES = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+
+def compression_from_name(path: str) -> Optional[str]:
+    """
+    The compression implied by the extension of ``path``: "gzip" for
+    ``.gz``, "zstd" for ``.zst``, ``None`` otherwise.
+    """
+    for suffix, compression in _SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+def _open_zstd(path: str, mode: str) -> IO[bytes]:
+    try:
+        # Python 3.14 and later
+        from compression import zstd
+
+        return zstd.open(path, mode + "b")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError as e:
+        raise Exception(
+            f"ImportError: {e}\n"
+            "zstd compressed stats files require the zstandard package. "
+            "Install it with `pip install zstandard`, or use gzip."
+        )
+    fh = open(path, mode + "b")
+    if mode == "r":
+        # without read_across_frames only the first dump would be read back
+        return zstandard.ZstdDecompressor().stream_reader(
+            fh, read_across_frames=True, closefd=True
+        )
+    return zstandard.ZstdCompressor().stream_writer(fh, closefd=True)
+
+
+def open_stats_file(
+    path: str, mode: str = "r", compression: Optional[str] = None
+) -> IO[str]:
+    """
+    Open a stats file as text, compressed or not.
+
+    :param path: The file to open.
+    :param mode: "r", "w" or "a".
+    :param compression: "gzip", "zstd", or ``None`` to infer it from the
+                        extension of ``path``. Pass "none" to force an
+                        uncompressed file.
+    """
+    if mode not in ("r", "w", "a"):
+        raise ValueError(f"Unsupported mode '{mode}', use 'r', 'w' or 'a'.")
+    if compression is None:
+        compression = compression_from_name(path)
+    elif compression == "none":
+        compression = None
+    elif compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unknown compression '{compression}', choose from "
+            f"{COMPRESSIONS} or 'none'."
+        )
+
+    if compression is None:
+        return open(path, mode)
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return io.TextIOWrapper(_open_zstd(path, mode), encoding="utf-8")
+
+
+class JsonStreamWriter:
+    """
+    Writes a JSON object of nested groups and statistics as it is visited.
+
+    .. code-block:: python
+
+        writer = JsonStreamWriter(fp, indent=4)
+        writer.begin(creation_time=datetime.now(), time_conversion=None)
+        writer.begin_group("system")
+        writer.value("numCycles", Scalar(100))
+        writer.end_group()
+        writer.end()
+
+    Only one statistic is ever held in memory. Groups must be closed in the
+    reverse order they were opened, and a name must not be repeated within a
+    group, as the writer cannot take back what it has written.
+    """
+
+    def __init__(
+        self,
+        fp: IO[str],
+        indent: Optional[Union[int, str]] = None,
+        separators: Optional[tuple] = None,
+        **kwargs: Any,
+    ):
+        """
+        :param fp: The text stream to write to.
+        :param indent: As for ``json.dump``.
+        :param separators: As for ``json.dump``.
+        :param kwargs: Additional parameters passed to ``json.dumps`` for
+                       every value.
+        """
+        if isinstance(indent, int):
+            indent = " " * indent
+        if separators is None:
+            separators = (", ", ": ") if indent is None else (",", ": ")
+        self._fp = fp
+        self._indent = indent
+        self._item_separator, self._key_separator = separators
+        self._json_args = dict(kwargs, indent=indent, separators=separators)
+        # one entry per open object: whether it has no members yet
+        self._empty: List[bool] = []
+
+    @property
+    def depth(self) -> int:
+        """The number of objects currently open."""
+        return len(self._empty)
+
+    def _newline(self, depth: int) -> str:
+        if self._indent is None:
+            return ""
+        return "\n" + self._indent * depth
+
+    def _key(self, name: str) -> None:
+        if not self._empty:
+            raise RuntimeError("No JSON object is open.")
+        if self._empty[-1]:
+            self._empty[-1] = False
+        else:
+            self._fp.write(self._item_separator)
+        self._fp.write(self._newline(self.depth))
+        self._fp.write(json.dumps(name) + self._key_separator)
+
+    def _open(self) -> None:
+        self._fp.write("{")
+        self._empty.append(True)
+
+    def _close(self) -> None:
+        if not self._empty:
+            raise RuntimeError("No JSON object is open.")
+        if not self._empty.pop():
+            self._fp.write(self._newline(self.depth))
+        self._fp.write("}")
+
+    def value(self, name: str, value: Any) -> None:
+        """
+        Write a member of the current object. ``value`` may be a pystats
+        object or anything ``SerializableStat.to_json()`` accepts.
+        """
+        self._key(name)
+        text = json.dumps(to_json_value(value), **self._json_args)
+        if self._indent is not None:
+            text = text.replace("\n", self._newline(self.depth))
+        self._fp.write(text)
+
+    def begin(self, **attributes: Any) -> None:
+        """Start the top level object, with the given leading members."""
+        if self._empty:
+            raise RuntimeError("The top level JSON object is already open.")
+        self._open()
+        for name, value in attributes.items():
+            self.value(name, value)
+
+    def begin_group(
+        self, name: str, type: str = "Group", time_conversion: Any = None
+    ) -> None:
+        """Start a nested group, closed by ``end_group()``."""
+        self._key(name)
+        self._open()
+        self.value("type", type)
+        self.value("time_conversion", time_conversion)
+
+    def end_group(self) -> None:
+        if self.depth < 2:
+            raise RuntimeError("No group is open.")
+        self._close()
+
+    def end(self) -> None:
+        """Close the top level object."""
+        if self.depth != 1:
+            raise RuntimeError("Groups are still open.")
+        self._close()
@@ -331,6 +331,25 @@ def parse_options():
         help="List all built-in SimObjects, their params and default values",
     )
 
+    # Profiling options
+    group("Profiling Options")
+    option(
+        "--profile-startup",
+        action="store_true",
+        default=False,
+        help="Record the wall time of each startup phase (config script, "
+        "instantiation passes, startup) and SimObject type, and write "
+        "startup_profile.txt and a Chrome trace, startup_profile.json, to "
+        "the output directory",
+    )
+    option(
+        "--profile-startup-memory",
+        action="store_true",
+        default=False,
+        help="Like --profile-startup, also recording the memory allocated by "
+        "Python in each phase. Slows startup down.",
+    )
+
     arguments = options.parse_args()
     return options, arguments
 
@@ -468,8 +487,13 @@ def main():
         debug.help()
 
     if options.list_sim_objects:
-        from . import SimObject
+        from . import (
+            SimObject,
+            objects,
+        )
 
+        # SimObjects are only registered once their module is imported
+        objects._import_all()
         done = True
         print("SimObjects:")
         objects = list(SimObject.allClasses.keys())
@@ -622,6 +646,16 @@ def main():
 
     sys.argv = arguments
 
+    if options.profile_startup or options.profile_startup_memory:
+        from .util.startup_profiler import CONFIG_SCRIPT
+
+        profiler = m5.enableStartupProfiler(
+            options.outdir, memory=options.profile_startup_memory
+        )
+        # ended by m5.instantiate(). The m5.objects modules the script
+        # uses are imported on demand, each as a nested phase.
+        profiler.begin(CONFIG_SCRIPT)
+
     if options.m:
         sys.argv = [options.m[0]] + options.m[1]
         runpy.run_module(options.m[0], run_name="__m5_main__")
@@ -24,6 +24,124 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-for module in __spec__.loader_state:
-    if module.startswith("m5.objects."):
-        exec(f"from {module} import *")
+"""
+Everything defined by the modules of the m5.objects package, i.e., the
+SimObjects.
+
+The modules are not all imported when this package is. A module is imported
+the first time one of its names is used, found in an index of the names of
+every module generated at build time. ``from m5.objects import *`` still
+imports every module.
+"""
+
+import importlib as _importlib
+import sys as _sys
+import types as _types
+
+_modules = [
+    module
+    for module in __spec__.loader_state or ()
+    if module.startswith("m5.objects.") and module != "m5.objects._index"
+]
+
+try:
+    from ._index import index as _built_index
+except ImportError:
+    _built_index = {}
+
+# Only the modules embedded in this build can be imported.
+_embedded = set(_modules)
+_index = {
+    name: module
+    for name, module in _built_index.items()
+    if module in _embedded
+}
+_all_imported = False
+
+# Set by m5.enableStartupProfiler(): creates the startup profiler phase in
+# which a module is imported on demand.
+_import_phase = None
+
+
+def _import(module: str) -> _types.ModuleType:
+    """Import ``module``, as a startup profiler phase of its own when the
+    startup is profiled."""
+    if _import_phase is None or module in _sys.modules:
+        return _importlib.import_module(module)
+    with _import_phase(f"import {module}"):
+        return _importlib.import_module(module)
+
+
+def _export(module: _types.ModuleType) -> None:
+    """Do ``from module import *`` into this package."""
+    names = getattr(module, "__all__", None)
+    if names is None:
+        names = [name for name in vars(module) if not name.startswith("_")]
+    namespace = globals()
+    for name in names:
+        namespace[name] = getattr(module, name)
+
+
+def _import_all() -> None:
+    """Import every module, as this package used to when it was imported."""
+    global _all_imported
+    if _all_imported:
+        return
+    _all_imported = True
+    for module in _modules:
+        _export(_import(module))
+
+
+def _import_defining(name: str) -> bool:
+    """
+    Import the module defining ``name``, unless it is already imported or
+    being imported. Used to resolve parameter types given by name.
+
+    :returns: Whether a module was imported.
+    """
+    module = _index.get(name)
+    if module is None or module in _sys.modules:
+        return False
+    _import(module)
+    return True
+
+
+def __getattr__(name: str):
+    if name == "__all__":
+        _import_all()
+        return [name for name in globals() if not name.startswith("_")]
+
+    module = _index.get(name)
+    if module is not None:
+        value = getattr(_import(module), name)
+        globals()[name] = value
+        return value
+
+    # The name is not defined by any module but may still be exported by
+    # one, e.g., through a star import.
+    if not _all_imported:
+        _import_all()
+        if name in globals():
+            return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_index))
+
+
+class _ObjectsModule(_types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it to its name in this package. Most
+        # modules are named after a SimObject they define, which must not be
+        # hidden by the module.
+        if (
+            isinstance(value, _types.ModuleType)
+            and value.__name__ == f"{__name__}.{name}"
+            and (name in _index or hasattr(value, name))
+        ):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _ObjectsModule
@@ -185,8 +185,15 @@ class ParamDesc:
 
     def __getattr__(self, attr):
         if attr == "ptype":
-            from . import SimObject
+            from . import (
+                SimObject,
+                objects,
+            )
 
+            # m5.objects imports modules on demand, the one defining the
+            # type may not be imported yet
+            if self.ptype_str not in SimObject.allClasses:
+                objects._import_defining(self.ptype_str)
             ptype = SimObject.allClasses[self.ptype_str]
             assert isSimObjectClass(ptype)
             self.ptype = ptype
@@ -429,6 +436,12 @@ class ParamFactory:
     # E.g., Param.Int(5, "number of widgets")
     def __call__(self, *args, **kwargs):
         ptype = None
+        if self.ptype_str not in allParams:
+            # m5.objects imports modules on demand, the one defining the
+            # type (e.g., an Enum) may not be imported yet
+            from . import objects
+
+            objects._import_defining(self.ptype_str)
         try:
             ptype = allParams[self.ptype_str]
         except KeyError:
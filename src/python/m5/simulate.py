@@ -40,6 +40,12 @@
 import atexit
 import os
 import sys
+import time
+from contextlib import (
+    contextmanager,
+    nullcontext,
+)
+from operator import methodcaller
 
 from m5.util.dot_writer import (
     do_dot,
@@ -66,6 +72,10 @@ from .util import (
     fatal,
     warn,
 )
+from .util.startup_profiler import (
+    CONFIG_SCRIPT,
+    StartupProfiler,
+)
 
 # define a MaxTick parameter, unsigned 64 bit
 MaxTick = 2**64 - 1
@@ -74,18 +84,116 @@ _drain_manager = _m5.drain.DrainManager.instance()
 
 _instantiated = False  # Has m5.instantiate() been called?
 
+# Cached walks of the configuration hierarchy: id(root) -> (root, hierarchy
+# version, list of root.descendants()). See _descendants().
+_descendants_cache = {}
+
+# Wall clock seconds spent in each phase of m5.instantiate(), in order.
+_phase_times = {}
+
+# See enableStartupProfiler()
+_startup_profiler = None
+
+
+def _descendants(root):
+    """Return the objects of ``root.descendants()`` as a list, in the same
+    order. The list is reused until the configuration hierarchy changes
+    (see SimObject.hierarchyVersion()), instead of walking the hierarchy
+    again for every pass over it."""
+    version = SimObject.hierarchyVersion()
+    entry = _descendants_cache.get(id(root))
+    if entry is not None and entry[0] is root and entry[1] == version:
+        return entry[2]
+    objs = list(root.descendants())
+    _descendants_cache[id(root)] = (root, version, objs)
+    return objs
+
+
+def _profile(name):
+    if _startup_profiler is None:
+        return nullcontext()
+    return _startup_profiler.phase(name)
+
+
+@contextmanager
+def _phase(name):
+    start = time.perf_counter()
+    try:
+        with _profile(name):
+            yield
+    finally:
+        _phase_times[name] = (
+            _phase_times.get(name, 0.0) + time.perf_counter() - start
+        )
+
+
+def _visit(objs, method, *args):
+    """Call ``method`` on every object of ``objs``, as the phase of that
+    name."""
+    visit = methodcaller(method, *args)
+    with _phase(method):
+        if _startup_profiler is None:
+            for obj in objs:
+                visit(obj)
+        else:
+            _startup_profiler.visit(method, objs, visit)
+
+
+def enableStartupProfiler(outdir=None, memory=False):
+    """Profile the startup of the simulation: the wall time (and, if
+    ``memory``, the Python memory allocated) of the phases of instantiate()
+    and of the first simulate(), in total and per SimObject type.
+
+    Must be called before instantiate(). The report and Chrome trace are
+    written to ``outdir``, the output directory by default, when the first
+    simulate() starts simulating (or at exit). gem5's --profile-startup
+    option calls this before running the config script.
+
+    :returns: The m5.util.startup_profiler.StartupProfiler.
+    """
+    global _startup_profiler
+    from m5 import options
+
+    if _instantiated:
+        fatal("enableStartupProfiler() must be called before instantiate().")
+    if _startup_profiler is None:
+        if outdir is None:
+            outdir = options.outdir
+        _startup_profiler = StartupProfiler(outdir, memory=memory)
+        atexit.register(_startup_profiler.finish)
+        objects._import_phase = _startup_profiler.phase
+    return _startup_profiler
+
+
+def instantiatePhaseTimes():
+    """Returns the wall clock seconds spent in each phase of
+    m5.instantiate(), and in the ``startup`` phase of the first
+    m5.simulate() once it ran, as an ordered ``{phase: seconds}``
+    dictionary."""
+    return dict(_phase_times)
+
 
 # The final call to instantiate the SimObject graph and initialize the
 # system.
 def instantiate(ckpt_dir=None):
     global _instantiated
-    from m5 import options
 
     if _instantiated:
         fatal("m5.instantiate() called twice.")
 
     _instantiated = True
 
+    if _startup_profiler is not None and _startup_profiler.is_open(
+        CONFIG_SCRIPT
+    ):
+        _startup_profiler.end(CONFIG_SCRIPT)
+    with _profile("instantiate"):
+        _instantiate(ckpt_dir)
+
+
+def _instantiate(ckpt_dir):
+    from m5 import options
+
     root = objects.Root.getInstance()
 
     if not root:
@@ -95,87 +203,93 @@ def instantiate(ckpt_dir=None):
     ticks.fixGlobalFrequency()
 
     # Make sure SimObject-valued params are in the configuration
-    # hierarchy so we catch them with future descendants() walks
-    for obj in root.descendants():
-        obj.adoptOrphanParams()
+    # hierarchy so we catch them with future descendants() walks. This walk
+    # must not be cached: it visits the children adopted on the way.
+    _visit(root.descendants(), "adoptOrphanParams")
+
+    # Every other pass reuses a single walk of the hierarchy, which is only
+    # walked again if the hierarchy changes.
+    with _phase("descendants"):
+        _descendants(root)
 
     # Unproxy in sorted order for determinism
-    for obj in root.descendants():
-        obj.unproxyParams()
+    _visit(_descendants(root), "unproxyParams")
 
     if options.dump_config:
-        ini_file = open(os.path.join(options.outdir, options.dump_config), "w")
-        # Print ini sections in sorted order for easier diffing
-        for obj in sorted(root.descendants(), key=lambda o: o.path()):
-            obj.print_ini(ini_file)
-        ini_file.close()
+        with _phase("dump_config"):
+            ini_file = open(
+                os.path.join(options.outdir, options.dump_config), "w"
+            )
+            # Print ini sections in sorted order for easier diffing
+            for obj in sorted(_descendants(root), key=lambda o: o.path()):
+                obj.print_ini(ini_file)
+            ini_file.close()
 
     if options.json_config:
-        try:
-            import json
-
-            json_file = open(
-                os.path.join(options.outdir, options.json_config), "w"
-            )
-            d = root.get_config_as_dict()
-            json.dump(d, json_file, indent=4)
-            json_file.close()
-        except ImportError:
-            pass
+        with _phase("json_config"):
+            try:
+                import json
+
+                json_file = open(
+                    os.path.join(options.outdir, options.json_config), "w"
+                )
+                d = root.get_config_as_dict()
+                json.dump(d, json_file, indent=4)
+                json_file.close()
+            except ImportError:
+                pass
 
     if options.dot_config:
-        do_dot(root, options.outdir, options.dot_config)
-        do_ruby_dot(root, options.outdir, options.dot_config)
+        with _phase("dot_config"):
+            do_dot(root, options.outdir, options.dot_config)
+            do_ruby_dot(root, options.outdir, options.dot_config)
 
     # Initialize the global statistics
     stats.initSimStats()
 
     # Create the C++ sim objects and connect ports
-    for obj in root.descendants():
-        obj.createCCObject()
-    for obj in root.descendants():
-        obj.connectPorts()
+    _visit(_descendants(root), "createCCObject")
+    _visit(_descendants(root), "connectPorts")
 
     # Do a second pass to finish initializing the sim objects
-    for obj in root.descendants():
-        obj.init()
+    _visit(_descendants(root), "init")
 
     # Do a third pass to initialize statistics
-    stats._bindStatHierarchy(root)
-    root.regStats()
+    with _phase("regStats"):
+        stats._bindStatHierarchy(root)
+        root.regStats()
 
     # Do a fourth pass to initialize probe points
-    for obj in root.descendants():
-        obj.regProbePoints()
+    _visit(_descendants(root), "regProbePoints")
 
     # Do a fifth pass to connect probe listeners
-    for obj in root.descendants():
-        obj.regProbeListeners()
+    _visit(_descendants(root), "regProbeListeners")
 
     # We want to generate the DVFS diagram for the system. This can only be
     # done once all of the CPP objects have been created and initialised so
     # that we are able to figure out which object belongs to which domain.
     if options.dot_dvfs_config:
-        do_dvfs_dot(root, options.outdir, options.dot_dvfs_config)
+        with _phase("dot_dvfs_config"):
+            do_dvfs_dot(root, options.outdir, options.dot_dvfs_config)
 
     # We're done registering statistics.  Enable the stats package now.
     stats.enable()
 
     # Restore checkpoint (if any)
     if ckpt_dir:
-        _drain_manager.preCheckpointRestore()
-        ckpt = _m5.core.getCheckpoint(ckpt_dir)
-        for obj in root.descendants():
-            obj.loadState(ckpt)
+        with _phase("getCheckpoint"):
+            _drain_manager.preCheckpointRestore()
+            ckpt = _m5.core.getCheckpoint(ckpt_dir)
+        _visit(_descendants(root), "loadState", ckpt)
     else:
-        for obj in root.descendants():
-            obj.initState()
+        _visit(_descendants(root), "initState")
 
     # Check to see if any of the stat events are in the past after resuming from
     # a checkpoint, If so, this call will shift them to be at a valid time.
     updateStatEvents()
 
-    gather_citations(root)
+    with _phase("gather_citations"):
+        gather_citations(root)
 
 
 need_startup = True
@@ -190,8 +304,8 @@ def simulate(*args, **kwargs):
 
     if need_startup:
         root = objects.Root.getInstance()
-        for obj in root.descendants():
-            obj.startup()
+        with _profile("simulate"):
+            _visit(_descendants(root), "startup")
         need_startup = False
 
         # Python exit handlers happen in reverse order.
@@ -204,6 +318,11 @@ def simulate(*args, **kwargs):
         # Reset to put the stats in a consistent state.
         stats.reset()
 
+        # Startup is over, the profile is complete
+        if _startup_profiler is not None:
+            _startup_profiler.finish()
+            objects._import_phase = None
+
     if _drain_manager.isDrained():
         _drain_manager.resume()
 
@@ -312,12 +431,12 @@ def drain():
 
 
 def memWriteback(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.memWriteback()
 
 
 def memInvalidate(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.memInvalidate()
 
 
@@ -430,7 +549,7 @@ def switchCpus(system, cpuList, verbose=True):
 
 
 def notifyFork(root):
-    for obj in root.descendants():
+    for obj in _descendants(root):
         obj.notifyFork()
 
 
@@ -191,15 +191,26 @@ def _hdf5Factory(fn, chunking=10, desc=True, formulas=True):
 
 
 @_url_factory(["json"])
-def _jsonFactory(fn):
+def _jsonFactory(fn, lines=False, compression=None):
     """Output stats in JSON format.
 
+    The statistics are written as they are visited, without building the
+    whole stats tree in memory first. By default each dump overwrites the
+    file. JSON Lines output instead appends one line per dump, which suits
+    runs with many dumps.
+
+    Parameters:
+      * lines (bool): One JSON object per line and dump (default: False)
+      * compression (str): 'gzip', 'zstd' or 'none'. Inferred from the
+        file extension (.gz, .zst) by default.
+
     Example:
       json://stats.json
+      json://stats.jsonl.gz?lines=True
 
     """
 
-    return JsonOutputVistor(fn)
+    return JsonOutputVistor(fn, lines=lines, compression=compression)
 
 
 def addStatVisitor(url):
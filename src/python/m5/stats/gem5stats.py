@@ -33,6 +33,7 @@ from datetime import datetime
 from typing import (
     IO,
     List,
+    Optional,
     Union,
 )
 
@@ -40,7 +41,14 @@ from m5.ext.pystats.group import *
 from m5.ext.pystats.simstat import *
 from m5.ext.pystats.statistic import *
 from m5.ext.pystats.storagetype import *
-from m5.objects import *
+from m5.ext.pystats.streaming import (
+    JsonStreamWriter,
+    open_stats_file,
+)
+from m5.objects import (
+    Root,
+    SimObject,
+)
 
 import _m5.stats
 
@@ -49,20 +57,49 @@ class JsonOutputVistor:
     """
     This is a helper vistor class used to include a JSON output via the stats
     API (``src/python/m5/stats/__init__.py``).
+
+    The statistics are written to the file as the gem5 stats hierarchy is
+    visited, without first building the ``SimStat`` of the whole simulation.
+    By default every dump rewrites the file. With ``lines=True`` every dump
+    instead appends one line holding a JSON object (JSON Lines), which
+    ``m5.ext.pystats.jsonloader.load_lines()`` reads back.
     """
 
     file: str
     json_args: Dict
 
-    def __init__(self, file: str, **kwargs):
+    def __init__(
+        self,
+        file: str,
+        lines: bool = False,
+        compression: Optional[str] = None,
+        **kwargs,
+    ):
         """
         :param file: The output file location in which the JSON will be dumped.
 
+        :param lines: Append one line per dump rather than overwriting the
+                      file. The file is truncated by the first dump.
+
+        :param compression: "gzip", "zstd", "none", or ``None`` to infer it
+                            from the extension of ``file`` (``.gz``,
+                            ``.zst``).
+
         :param kwargs: Additional parameters to be passed to the ``json.dumps`` method.
         """
 
         self.file = file
+        self.lines = lines
+        self.compression = compression
         self.json_args = kwargs
+        if lines:
+            if kwargs.get("indent") is not None:
+                raise ValueError("JSON Lines stats cannot be indented.")
+            self.json_args["indent"] = None
+        elif "indent" not in kwargs:
+            # the indentation of `SerializableStat.dump`
+            self.json_args["indent"] = 4
+        self._dumps = 0
 
     def dump(self, roots: Union[List[SimObject], Root]) -> None:
         """
@@ -78,9 +115,76 @@ class JsonOutputVistor:
         :param roots: The Root, or List of roots, whose stats are are to be dumped JSON.
         """
 
-        with open(self.file, "w") as fp:
-            simstat = get_simstat(root=roots, prepare_stats=False)
-            simstat.dump(fp=fp, **self.json_args)
+        mode = "a" if self.lines and self._dumps else "w"
+        with open_stats_file(self.file, mode, self.compression) as fp:
+            writer = JsonStreamWriter(fp, **self.json_args)
+            write_simstat(writer, roots)
+            if self.lines:
+                fp.write("\n")
+        self._dumps += 1
+
+
+def _write_stats_group(
+    writer: JsonStreamWriter, name: str, group: _m5.stats.Group
+) -> None:
+    """
+    Writes a gem5 Group object, and the groups below it, as it would be
+    translated by ``get_stats_group``.
+    """
+
+    writer.begin_group(name)
+    for stat in group.getStats():
+        statistic = __get_statistic(stat)
+        if statistic is not None:
+            writer.value(stat.name, statistic)
+    for key, child in group.getStatGroups().items():
+        _write_stats_group(writer, key, child)
+    writer.end_group()
+
+
+def write_simstat(
+    writer: JsonStreamWriter, root: Union[SimObject, List[SimObject]]
+) -> None:
+    """
+    Writes the statistics of a SimObject (typically the Root), or list of
+    SimObjects, through a ``JsonStreamWriter``. The output is that of the
+    SimStat object returned by ``get_simstat(root, prepare_stats=False)``,
+    but only one statistic is translated at a time.
+
+    :param writer: The writer to write the statistics to.
+
+    :param root: A SimObject, or list of SimObjects, whose stats are written.
+    """
+
+    if not isinstance(root, list):
+        root = [root]
+
+    final_tick = Root.getInstance().resolveStat("finalTick").value
+    sim_ticks = Root.getInstance().resolveStat("simTicks").value
+    # TODO time_conversion https://gem5.atlassian.net/browse/GEM5-846
+    writer.begin(
+        creation_time=datetime.now(),
+        time_conversion=None,
+        simulated_begin_time=int(final_tick - sim_ticks),
+        simulated_end_time=int(final_tick),
+    )
+
+    for r in root:
+        if isinstance(r, Root):
+            # The Root is a special case, we jump directly into writing its
+            # constituent Groups.
+            for key, group in r.getStatGroups().items():
+                _write_stats_group(writer, key, group)
+        elif isinstance(r, SimObject):
+            _write_stats_group(writer, r.get_name(), r)
+        else:
+            raise TypeError(
+                "Object (" + str(r) + ") passed is not a "
+                "SimObject. " + __name__ + " only processes "
+                "SimObjects, or a list of  SimObjects."
+            )
+
+    writer.end()
 
 
 def get_stats_group(group: _m5.stats.Group) -> Group:
@@ -0,0 +1,261 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Where does the time go before the first simulated tick?
+
+The startup profiler records the wall time, and optionally the Python
+memory allocated, of each phase of gem5's startup: running the config
+script, with the import of each ``m5.objects`` module it uses, the passes of
+``m5.instantiate()`` and the ``startup()`` of the first ``m5.simulate()``.
+For the passes over every SimObject, the time is also accumulated per
+SimObject type.
+
+It is enabled with ``--profile-startup`` (and ``--profile-startup-memory``)
+on the gem5 command line, or with ``m5.enableStartupProfiler()`` from a
+config script. Once startup is over two files are written to the output
+directory: ``startup_profile.txt``, a report sorted by time, and
+``startup_profile.json``, a Chrome trace (open it in ``chrome://tracing``
+or https://ui.perfetto.dev) of the nested phases.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+REPORT_FILE = "startup_profile.txt"
+TRACE_FILE = "startup_profile.json"
+
+# Begun by m5.main before running the config script, ended when the script
+# calls m5.instantiate().
+CONFIG_SCRIPT = "config script"
+
+
+class PhaseRecord(NamedTuple):
+    name: str
+    # seconds since the profiler was created
+    start: float
+    duration: float
+    # number of enclosing phases
+    depth: int
+    # net bytes allocated by Python during the phase, None if not tracked
+    allocated: Optional[int]
+
+
+class _TypeRecord:
+    __slots__ = ("count", "seconds", "allocated")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.allocated = 0
+
+
+class StartupProfiler:
+    def __init__(self, outdir: Optional[str] = None, memory: bool = False):
+        """
+        :param outdir: Where ``finish()`` writes the report and trace. The
+                       files are not written if it is not set.
+        :param memory: Also track the memory allocated by Python, with
+                       ``tracemalloc``. This slows startup down noticeably,
+                       the times recorded are then less representative.
+        """
+        self.outdir = outdir
+        self.memory = memory
+        self.phases: List[PhaseRecord] = []
+        # (phase, SimObject type) -> record
+        self.types: Dict[tuple, _TypeRecord] = {}
+        self._origin = time.perf_counter()
+        # (name, start, allocated) of the phases begun but not ended yet
+        self._open = []
+        self._finished = False
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def _allocated(self) -> int:
+        if not self.memory or not tracemalloc.is_tracing():
+            return 0
+        return tracemalloc.get_traced_memory()[0]
+
+    def begin(self, name: str) -> None:
+        """Start recording a phase, ended by ``end(name)``. Phases nest."""
+        self._open.append((name, time.perf_counter(), self._allocated()))
+
+    def end(self, name: str) -> None:
+        """End the innermost phase, which must be ``name``."""
+        if not self._open or self._open[-1][0] != name:
+            raise RuntimeError(f"Phase '{name}' is not the innermost one.")
+        _, start, allocated = self._open.pop()
+        self.phases.append(
+            PhaseRecord(
+                name,
+                start - self._origin,
+                time.perf_counter() - start,
+                len(self._open),
+                self._allocated() - allocated if self.memory else None,
+            )
+        )
+
+    def is_open(self, name: str) -> bool:
+        return any(phase[0] == name for phase in self._open)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the wall time (and memory) of the enclosed code."""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def visit(
+        self, phase: str, objs: Iterable, visit: Callable[[object], None]
+    ) -> None:
+        """
+        Call ``visit`` on every SimObject of ``objs``, accumulating its time
+        (and memory) per SimObject type under ``phase``.
+        """
+        clock = time.perf_counter
+        for obj in objs:
+            allocated = self._allocated()
+            start = clock()
+            visit(obj)
+            seconds = clock() - start
+            key = (phase, type(obj).__name__)
+            record = self.types.get(key)
+            if record is None:
+                record = self.types[key] = _TypeRecord()
+            record.count += 1
+            record.seconds += seconds
+            if self.memory:
+                record.allocated += self._allocated() - allocated
+
+    def report(self, top: int = 30) -> str:
+        """
+        The phases sorted by decreasing time, then the ``top`` most
+        expensive (phase, SimObject type) pairs.
+        """
+        lines = []
+        memory = "" if not self.memory else f" {'Allocated':>12}"
+        lines.append(f"{'Seconds':>10}{memory}  Phase")
+        for phase in sorted(self.phases, key=lambda p: -p.duration):
+            allocated = ""
+            if phase.allocated is not None:
+                allocated = f" {_size(phase.allocated):>12}"
+            lines.append(
+                f"{phase.duration:>10.4f}{allocated}  "
+                f"{'  ' * phase.depth}{phase.name}"
+            )
+
+        if self.types:
+            lines.append("")
+            lines.append(
+                f"{'Seconds':>10}{memory} {'Objects':>8}  "
+                "Phase: SimObject type"
+            )
+            ranked = sorted(self.types.items(), key=lambda i: -i[1].seconds)
+            for (phase, name), record in ranked[:top]:
+                allocated = ""
+                if self.memory:
+                    allocated = f" {_size(record.allocated):>12}"
+                lines.append(
+                    f"{record.seconds:>10.4f}{allocated} {record.count:>8}  "
+                    f"{phase}: {name}"
+                )
+            if len(ranked) > top:
+                lines.append(f"... {len(ranked) - top} more")
+        return "\n".join(lines) + "\n"
+
+    def chrome_trace(self) -> Dict:
+        """The phases in the Chrome trace event format."""
+        pid = os.getpid()
+        events = []
+        for phase in sorted(self.phases, key=lambda p: (p.start, p.depth)):
+            event = {
+                "name": phase.name,
+                "cat": "startup",
+                "ph": "X",
+                "ts": phase.start * 1e6,
+                "dur": phase.duration * 1e6,
+                "pid": pid,
+                "tid": 0,
+            }
+            if phase.allocated is not None:
+                event["args"] = {"allocated": phase.allocated}
+            events.append(event)
+        types = [
+            {
+                "phase": phase,
+                "type": name,
+                "count": record.count,
+                "seconds": record.seconds,
+                "allocated": record.allocated if self.memory else None,
+            }
+            for (phase, name), record in self.types.items()
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"simObjectTypes": types},
+        }
+
+    def write(self, outdir: str) -> None:
+        with open(os.path.join(outdir, REPORT_FILE), "w") as f:
+            f.write(self.report())
+        with open(os.path.join(outdir, TRACE_FILE), "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def finish(self) -> None:
+        """End the open phases and write the report and trace to
+        ``outdir``, once."""
+        if self._finished:
+            return
+        self._finished = True
+        while self._open:
+            self.end(self._open[-1][0])
+        if self._tracing:
+            tracemalloc.stop()
+        if self.outdir is not None:
+            self.write(self.outdir)
+
+
+def _size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
@@ -40,3 +40,35 @@ class RhSecureModule(ClockedObject):
     request_queue_size = Param.Unsigned(32, "Size of the request queue")
 
     response_queue_size = Param.Unsigned(32, "Size of the response queue")
+
+    # per refresh window statistics
+    refresh_window = Param.Latency(
+        "64ms",
+        "Refresh window. Row activation counts and the counter cache are "
+        "reset at the end of every window",
+    )
+    row_size = Param.MemorySize("8KiB", "Size of a DRAM row")
+    rh_threshold = Param.Unsigned(
+        4800,
+        "Activations of a row within a refresh window that trigger an extra "
+        "refresh of its neighbours",
+    )
+    activation_histogram_buckets = Param.Unsigned(
+        32, "Buckets of the activations per row histogram"
+    )
+    dump_stats_per_window = Param.Bool(
+        False, "Dump and reset the statistics at the end of every window"
+    )
+
+    # row counter cache
+    counter_cache_size = Param.MemorySize(
+        "32KiB", "Size of the row counter cache"
+    )
+    counter_cache_assoc = Param.Unsigned(
+        8, "Associativity of the row counter cache"
+    )
+    counter_cache_line_size = Param.Unsigned(
+        8,
+        "Line size of the row counter cache in bytes, i.e. the number of "
+        "(one byte) row counters per line",
+    )
@@ -1,10 +1,12 @@
 #include "rowhammer/counter_cache/rh_secure_module.hh"
 #include <iostream>
 
+#include "base/intmath.hh"
 #include "base/trace.hh"
 #include "debug/RhSecureModule.hh"
 #include "debug/RhSecureModuleCpp.hh"
 #include "debug/RhSecureModuleCycles.hh"
+#include "sim/stat_control.hh"
 
 namespace gem5
 {
@@ -20,7 +22,21 @@ namespace gem5
         // dram_avg_access_latency(params.dram_avg_access_latency),
         responseQueue(params.response_queue_size),
         requestQueue(params.request_queue_size),
-        stats(this)
+        refreshWindow(params.refresh_window),
+        rowBits(floorLog2(params.row_size)),
+        rhThreshold(params.rh_threshold),
+        activationHistogramBuckets(params.activation_histogram_buckets),
+        dumpStatsPerWindow(params.dump_stats_per_window),
+        windowEvent([this]
+                    { endWindow(); },
+                    name() + ".windowEvent"),
+        counterCacheAssoc(params.counter_cache_assoc),
+        countersPerLine(params.counter_cache_line_size),
+        counterCacheSets(params.counter_cache_size /
+                         (params.counter_cache_line_size *
+                          params.counter_cache_assoc)),
+        counterCache(counterCacheSets * counterCacheAssoc),
+        stats(*this)
   // requestQueue(params.queue_size),
   {
     cpuWaiting = false;
@@ -30,6 +46,16 @@ namespace gem5
     cpuBlocked = false;
     memBlocked = false;
     std::srand(0);
+
+    fatal_if(!isPowerOf2(params.row_size), "%s: row_size must be a power of 2",
+             name());
+    fatal_if(params.rh_threshold == 0, "%s: rh_threshold must be non-zero",
+             name());
+    fatal_if(counterCacheSets == 0 || !isPowerOf2(counterCacheSets) ||
+                 !isPowerOf2(countersPerLine),
+             "%s: the counter cache needs a power of 2 number of sets and "
+             "line size",
+             name());
   }
 
   // unimplemented, nothing needs to be done here
@@ -40,6 +66,7 @@ namespace gem5
                                       { cycle(); },
                                       name() + ".startupEvent", true),
              clockEdge(Cycles(1)));
+    schedule(windowEvent, curTick() + refreshWindow);
   }
 
   // on every cycle, we check if we have any packets to send to the cpu or memory
@@ -204,6 +231,12 @@ namespace gem5
     else
     { // succesful send
       owner->requestQueue.pop();
+      // account the activation once, when the request reaches memory;
+      // denied sends are retried and must not count again
+      if (pkt->isRead() || pkt->isWrite())
+      {
+        owner->recordActivation(pkt->getAddr());
+      }
       DPRINTF(RhSecureModuleCpp, "✅ Memory accepted packet %s\n", pkt->print());
     }
     return succ;
@@ -330,6 +363,83 @@ namespace gem5
     *b = true;
   }
 
+  void RhSecureModule::recordActivation(Addr addr)
+  {
+    Addr row = addr >> rowBits;
+    if (accessCounterCache(row))
+    {
+      stats.counterCacheHits++;
+    }
+    else
+    {
+      stats.counterCacheMisses++;
+    }
+
+    // the row's neighbours are refreshed every rhThreshold activations
+    if (++rowActivations[row] % rhThreshold == 0)
+    {
+      stats.extraRefreshes++;
+    }
+  }
+
+  bool RhSecureModule::accessCounterCache(Addr row)
+  {
+    Addr line = row / countersPerLine;
+    auto set = counterCache.begin() + (line % counterCacheSets) * counterCacheAssoc;
+    Addr tag = line / counterCacheSets;
+
+    auto victim = set;
+    for (auto way = set; way != set + counterCacheAssoc; way++)
+    {
+      if (way->valid && way->tag == tag)
+      {
+        way->lastAccess = curTick();
+        return true;
+      }
+      // prefer an invalid way, then the least recently used one
+      if (victim->valid &&
+          (!way->valid || way->lastAccess < victim->lastAccess))
+      {
+        victim = way;
+      }
+    }
+
+    if (victim->valid)
+    {
+      stats.counterCacheEvictions++;
+    }
+    victim->tag = tag;
+    victim->valid = true;
+    victim->lastAccess = curTick();
+    return false;
+  }
+
+  void RhSecureModule::endWindow()
+  {
+    DPRINTF(RhSecureModule, "end of refresh window, %d rows activated\n",
+            rowActivations.size());
+
+    stats.windows++;
+    stats.rowsPerWindow.sample(rowActivations.size());
+    for (const auto &[row, count] : rowActivations)
+    {
+      stats.activationsPerRow.sample(count);
+    }
+
+    // row counters are reset by the refresh, the counter cache starts cold
+    rowActivations.clear();
+    for (auto &line : counterCache)
+    {
+      line.valid = false;
+    }
+
+    if (dumpStatsPerWindow)
+    {
+      statistics::schedStatEvent(true, true);
+    }
+    schedule(windowEvent, curTick() + refreshWindow);
+  }
+
   void RhSecureModule::cleanReady()
   {
     DPRINTF(RhSecureModuleCpp, "cleanReady\n");
@@ -369,12 +479,32 @@ namespace gem5
     return tick;
   }
 
-  RhSecureModule::RhSecureModuleStats::RhSecureModuleStats(statistics::Group *parent)
-      : statistics::Group(parent),
+  RhSecureModule::RhSecureModuleStats::RhSecureModuleStats(RhSecureModule &_module)
+      : statistics::Group(&_module), module(_module),
         ADD_STAT(readReqs, statistics::units::Count::get(), "Number of read requests"),
-        ADD_STAT(writeReqs, statistics::units::Count::get(), "Number of write requests")
+        ADD_STAT(writeReqs, statistics::units::Count::get(), "Number of write requests"),
+        ADD_STAT(windows, statistics::units::Count::get(), "Number of refresh windows that ended"),
+        ADD_STAT(activationsPerRow, statistics::units::Count::get(),
+                 "Activations of each row activated in a refresh window"),
+        ADD_STAT(rowsPerWindow, statistics::units::Count::get(),
+                 "Rows activated per refresh window"),
+        ADD_STAT(extraRefreshes, statistics::units::Count::get(),
+                 "Extra refreshes caused by rows reaching the rowhammer threshold"),
+        ADD_STAT(counterCacheHits, statistics::units::Count::get(), "Row counter cache hits"),
+        ADD_STAT(counterCacheMisses, statistics::units::Count::get(), "Row counter cache misses"),
+        ADD_STAT(counterCacheEvictions, statistics::units::Count::get(),
+                 "Row counter cache evictions"),
+        ADD_STAT(counterCacheHitRate, statistics::units::Ratio::get(), "Row counter cache hit rate",
+                 counterCacheHits / (counterCacheHits + counterCacheMisses))
   {
-    // do nothing:
+  }
+
+  void RhSecureModule::RhSecureModuleStats::regStats()
+  {
+    statistics::Group::regStats();
+
+    activationsPerRow.init(module.activationHistogramBuckets);
+    rowsPerWindow.init(module.activationHistogramBuckets);
   }
 
 } // namespace gem5
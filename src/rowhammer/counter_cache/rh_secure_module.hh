@@ -1,6 +1,10 @@
 #ifndef __RH_SECURE_MODULE_HH__
 #define __RH_SECURE_MODULE_HH__
 
+#include <unordered_map>
+#include <vector>
+
+#include "base/statistics.hh"
 #include "mem/port.hh"
 #include "params/RhSecureModule.hh"
 #include "sim/clocked_object.hh"
@@ -249,16 +253,74 @@ namespace gem5
     PacketPtr cpuWaitingPacket;
     // Other RhSecureModule stuff
 
+    /**
+     * Account one activation of the row holding addr: look its counter up in
+     * the counter cache and count the activation for the current window.
+     *
+     * @param addr address of the request
+     */
+    void recordActivation(Addr addr);
+
+    /**
+     * Close the current refresh window: sample the activations of every row
+     * touched during the window, then reset the counts and the counter
+     * cache for the next one.
+     */
+    void endWindow();
+
+    // refresh window
+    const Tick refreshWindow;
+    const unsigned rowBits;
+    const unsigned rhThreshold;
+    const unsigned activationHistogramBuckets;
+    const bool dumpStatsPerWindow;
+    EventFunctionWrapper windowEvent;
+
+    // activations of every row touched in the current window
+    std::unordered_map<Addr, uint64_t> rowActivations;
+
+    // row counter cache, set-associative with LRU replacement. It only
+    // models tags, the counters themselves live in rowActivations.
+    struct CounterCacheLine
+    {
+      Addr tag = 0;
+      bool valid = false;
+      Tick lastAccess = 0;
+    };
+    const unsigned counterCacheAssoc;
+    const unsigned countersPerLine;
+    const unsigned counterCacheSets;
+    std::vector<CounterCacheLine> counterCache;
+
+    /**
+     * Access the counter cache for a row, allocating its line on a miss.
+     *
+     * @param row the row index
+     * @return true on a hit
+     */
+    bool accessCounterCache(Addr row);
+
   protected:
     struct RhSecureModuleStats : public statistics::Group
     {
-      RhSecureModuleStats(statistics::Group *parent);
+      RhSecureModuleStats(RhSecureModule &module);
+
+      const RhSecureModule &module;
+
       statistics::Scalar readReqs;
       statistics::Scalar writeReqs;
-      // statistics::Scalar hits;
-      // statistics::Scalar misses;
-      // statistics::Histogram missLatency;
-      // statistics::Formula hitRatio;
+
+      statistics::Scalar windows;
+      statistics::Histogram activationsPerRow;
+      statistics::Histogram rowsPerWindow;
+      statistics::Scalar extraRefreshes;
+
+      statistics::Scalar counterCacheHits;
+      statistics::Scalar counterCacheMisses;
+      statistics::Scalar counterCacheEvictions;
+      statistics::Formula counterCacheHitRate;
+
+      void regStats() override;
     } stats;
 
   public:
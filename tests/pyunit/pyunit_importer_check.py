@@ -0,0 +1,99 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from importer import CodeImporter
+
+
+class OverrideBytecodeCacheTestSuite(unittest.TestCase):
+    """Test cases for the bytecode cache of importer.CodeImporter when
+    M5_OVERRIDE_PY_SOURCE is set."""
+
+    def setUp(self) -> None:
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, "module.py")
+        with open(self.source, "w") as f:
+            f.write("value = 1\n")
+        self.cache_dir = os.path.join(self.dir, "cache")
+        self.env = patch.dict(
+            os.environ,
+            {
+                "M5_OVERRIDE_PY_SOURCE": "true",
+                "M5_OVERRIDE_PY_CACHE": self.cache_dir,
+            },
+        )
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        shutil.rmtree(self.dir)
+
+    def _value(self, importer: CodeImporter) -> int:
+        namespace = {}
+        exec(importer.compile_source(self.source), namespace)
+        return namespace["value"]
+
+    def test_unchangedSourceIsLoadedFromCache(self) -> None:
+        first = CodeImporter()
+        self.assertEqual(1, self._value(first))
+        self.assertEqual((0, 1), (first.cache_hits, first.cache_misses))
+
+        second = CodeImporter()
+        self.assertEqual(1, self._value(second))
+        self.assertEqual((1, 0), (second.cache_hits, second.cache_misses))
+
+    def test_changedSourceIsCompiled(self) -> None:
+        self._value(CodeImporter())
+        with open(self.source, "w") as f:
+            f.write("value = 22\n")
+
+        importer = CodeImporter()
+        self.assertEqual(22, self._value(importer))
+        self.assertEqual((0, 1), (importer.cache_hits, importer.cache_misses))
+
+    def test_findSpecUsesCache(self) -> None:
+        for hits in (0, 1):
+            importer = CodeImporter()
+            importer.add_module(self.source, "cached_module", None)
+            spec = importer.find_spec("cached_module", None)
+            namespace = {}
+            exec(spec.loader.get_code("cached_module"), namespace)
+            self.assertEqual(1, namespace["value"])
+            self.assertEqual(hits, importer.cache_hits)
+
+    def test_cacheCanBeDisabled(self) -> None:
+        with patch.dict(os.environ, {"M5_OVERRIDE_PY_CACHE": "none"}):
+            for _ in range(2):
+                importer = CodeImporter()
+                self._value(importer)
+                self.assertEqual(1, importer.cache_misses)
+        self.assertFalse(os.path.exists(self.cache_dir))
@@ -0,0 +1,171 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import importlib.util
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import m5
+
+OBJECTS_INIT = Path(m5.__file__).resolve().parent / "objects" / "__init__.py"
+
+MODULES = {
+    "Root": """
+        class Root:
+            pass
+        """,
+    "SimObject": """
+        class SimObject:
+            pass
+        """,
+    "Cache": """
+        class Cache:
+            pass
+        """,
+    "Memory": """
+        from m5.objects.Cache import *
+
+        class Memory:
+            pass
+        """,
+    "Extra": """
+        # not in the index, as if only bound by a star import
+        Hidden = 1
+        """,
+    "_index": """
+        index = {
+            "Root": "m5.objects.Root",
+            "SimObject": "m5.objects.SimObject",
+            "Cache": "m5.objects.Cache",
+            "Memory": "m5.objects.Memory",
+            "Ghost": "m5.objects.Missing",
+        }
+        """,
+}
+
+
+class LazyObjectsTestSuite(unittest.TestCase):
+    """Loads the m5.objects package over a few fake SimObject modules, in
+    place of the modules embedded in gem5."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, source in MODULES.items():
+            with open(os.path.join(directory.name, f"{name}.py"), "w") as f:
+                f.write(textwrap.dedent(source))
+
+        saved = patch.dict(sys.modules)
+        saved.start()
+        self.addCleanup(saved.stop)
+        for name in list(sys.modules):
+            if name.startswith("m5.objects"):
+                del sys.modules[name]
+
+        spec = importlib.util.spec_from_file_location(
+            "m5.objects",
+            OBJECTS_INIT,
+            submodule_search_locations=[directory.name],
+        )
+        spec.loader_state = [
+            "m5.objects.Root",
+            "m5.objects.SimObject",
+            "m5.objects.Cache",
+            "m5.objects.Memory",
+            "m5.objects.Extra",
+            "m5.objects._index",
+        ]
+        self.objects = importlib.util.module_from_spec(spec)
+        sys.modules["m5.objects"] = self.objects
+        spec.loader.exec_module(self.objects)
+
+    def test_import_on_demand(self):
+        cache = self.objects.Cache
+        self.assertIsInstance(cache, type)
+        self.assertEqual("m5.objects.Cache", cache.__module__)
+        self.assertIn("m5.objects.Cache", sys.modules)
+        self.assertNotIn("m5.objects.Memory", sys.modules)
+        # importing the module does not hide the SimObject named after it
+        self.assertIs(cache, self.objects.Cache)
+
+    def test_import_defining(self):
+        self.assertTrue(self.objects._import_defining("Memory"))
+        self.assertIn("m5.objects.Memory", sys.modules)
+        self.assertFalse(self.objects._import_defining("Memory"))
+        # indexed, but the module is not embedded
+        self.assertFalse(self.objects._import_defining("Ghost"))
+        self.assertNotIn("Ghost", dir(self.objects))
+        self.assertIn("Memory", dir(self.objects))
+
+    def test_star_import_fallback(self):
+        self.assertEqual(1, self.objects.Hidden)
+        self.assertTrue(self.objects._all_imported)
+        self.assertIn("m5.objects.Memory", sys.modules)
+        self.assertRaises(AttributeError, getattr, self.objects, "Missing")
+
+    def test_import_all(self):
+        namespace = {}
+        exec("from m5.objects import *", namespace)
+        self.assertTrue(
+            {"Cache", "Memory", "Hidden"}.issubset(namespace), namespace
+        )
+        self.assertEqual(
+            ["__builtins__"], [n for n in namespace if n.startswith("_")]
+        )
+
+    def test_import_phase(self):
+        phases = []
+
+        @contextmanager
+        def phase(name):
+            yield
+            phases.append(name)
+
+        self.objects._import_phase = phase
+        self.objects.Memory
+        self.objects.Cache
+        self.assertEqual(["import m5.objects.Memory"], phases)
+
+    @unittest.skipIf(importlib.util.find_spec("_m5") is None, "needs gem5")
+    def test_stats_import(self):
+        # m5.stats is imported by every `import m5`, it must only import the
+        # modules of the names it uses
+        import m5.stats
+
+        self.addCleanup(setattr, m5.stats, "gem5stats", m5.stats.gem5stats)
+        del sys.modules["m5.stats.gem5stats"]
+        importlib.import_module("m5.stats.gem5stats")
+        self.assertIn("m5.objects.Root", sys.modules)
+        unused = ["m5.objects.Cache", "m5.objects.Memory", "m5.objects.Extra"]
+        self.assertEqual([], [m for m in unused if m in sys.modules])
+        self.assertFalse(self.objects._all_imported)
@@ -0,0 +1,157 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+import unittest
+
+from m5.ext.pystats.group import Group
+from m5.ext.pystats.jsonloader import load
+from m5.ext.pystats.statistic import Scalar
+
+
+def _scalar(value):
+    return {
+        "type": "Scalar",
+        "value": value,
+        "unit": "Count",
+        "description": "A scalar",
+        "datatype": "f64",
+    }
+
+
+STATS = {
+    "creation_time": "2024-01-01T00:00:00",
+    "time_conversion": None,
+    "simulated_begin_time": 0,
+    "simulated_end_time": 100,
+    "system": {
+        "type": "Group",
+        "time_conversion": None,
+        "cpu0": {
+            "type": "Group",
+            "time_conversion": None,
+            "ipc": _scalar(1.5),
+            "numCycles": _scalar(100),
+        },
+        "cpu1": {
+            "type": "Group",
+            "time_conversion": None,
+            "ipc": _scalar(0.5),
+            "numCycles": _scalar(300),
+            "dist": {
+                "type": "Distribution",
+                "value": [1, 2],
+                "min": 0,
+                "max": 1,
+                "num_bins": 2,
+                "bin_size": 1,
+            },
+        },
+        "ipc": _scalar(1.0),
+    },
+}
+
+
+def _load(lazy):
+    return load(io.StringIO(json.dumps(STATS)), lazy=lazy)
+
+
+class PyStatsLazyTestSuite(unittest.TestCase):
+    def test_statistics_have_no_dict(self):
+        self.assertFalse(hasattr(Scalar(1), "__dict__"))
+        self.assertEqual(
+            {
+                "value": 1,
+                "type": "Scalar",
+                "unit": None,
+                "description": None,
+                "datatype": None,
+            },
+            Scalar(1).to_json(),
+        )
+
+    def test_find(self):
+        for lazy in (False, True):
+            simstat = _load(lazy)
+            self.assertEqual(
+                [1.5, 0.5, 1.0], [s.value for s in simstat.find("ipc")]
+            )
+            self.assertEqual(
+                ["Group", "Group"],
+                [s.type for s in simstat.find("cpu[0-9]")],
+            )
+            self.assertEqual([], simstat.find("missing"))
+
+    def test_get(self):
+        for lazy in (False, True):
+            simstat = _load(lazy)
+            self.assertEqual(300, simstat.get("system.cpu1.numCycles").value)
+            self.assertEqual(0.5, simstat.system.cpu1.ipc.value)
+
+    def test_lazy_to_json(self):
+        expected = json.dumps(_load(False).to_json())
+        self.assertEqual(expected, json.dumps(_load(True).to_json()))
+        simstat = _load(True)
+        simstat.find("numCycles")
+        self.assertEqual(expected, json.dumps(simstat.to_json()))
+
+    def test_lazy_children(self):
+        eager = [
+            json.dumps(s.to_json())
+            for s in _load(False).children(recursive=True)
+        ]
+        lazy = [
+            json.dumps(s.to_json())
+            for s in _load(True).children(recursive=True)
+        ]
+        self.assertEqual(eager, lazy)
+
+    def test_index_invalidation(self):
+        for lazy in (False, True):
+            simstat = _load(lazy)
+            self.assertEqual(3, len(simstat.find("ipc")))
+            simstat.extra = Group(ipc=Scalar(2.0))
+            self.assertEqual(4, len(simstat.find("ipc")))
+
+    def test_deep_index_invalidation(self):
+        for lazy in (False, True):
+            simstat = _load(lazy)
+            cpu = Group()
+            simstat.system.cpu2 = cpu
+            self.assertEqual([], simstat.find("x"))
+            cpu.x = Scalar(1.0)
+            self.assertEqual([1.0], [s.value for s in simstat.find("x")])
+            del cpu.x
+            self.assertEqual([], simstat.find("x"))
+            simstat.system.cpu0.ipc = Scalar(2.0)
+            self.assertEqual(
+                [2.0, 0.5, 1.0], [s.value for s in simstat.find("ipc")]
+            )
+            del simstat.system.cpu1
+            self.assertEqual(
+                [100], [s.value for s in simstat.find("numCycles")]
+            )
@@ -0,0 +1,152 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from m5.ext.pystats.harvester import parse_stats_txt
+from m5.ext.pystats.stats_table import (
+    read_runs,
+    read_stats_table,
+)
+
+BEGIN = "---------- Begin Simulation Statistics ----------\n"
+END = "---------- End Simulation Statistics   ----------\n"
+
+
+def _dump(ipc, extra=""):
+    return (
+        BEGIN
+        + f"system.cpu.ipc {ipc} # IPC (Ratio)\n"
+        + "system.cpu.op_class::IntAlu 30 75.00% 75.00% # Op class (Count)\n"
+        + "system.cpu.op_class::FloatAdd 10 25.00% 100.00% # Op class\n"
+        + "system.cpu.lat::samples 4 # Latency (Tick)\n"
+        + "system.cpu.lat::0-3 1 25.00% 25.00% # Latency (Tick)\n"
+        + "system.cpu.lat::4-7 3 75.00% 100.00% # Latency (Tick)\n"
+        + "system.cpu.cpi nan # CPI, a formula (Ratio)\n"
+        + extra
+        + "\n"
+        + END
+    )
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class StatsTableTestSuite(unittest.TestCase):
+    def test_read_stats_table(self):
+        table = read_stats_table(
+            io.StringIO(_dump(1.5) + _dump(2.5, "system.new 7 # New\n"))
+        )
+        self.assertEqual(2, len(table))
+        self.assertEqual([1.5, 2.5], table["system.cpu.ipc"].tolist())
+        self.assertEqual(
+            {"IntAlu": 30, "FloatAdd": 10},
+            {k: v[0] for k, v in table.vector("system.cpu.op_class").items()},
+        )
+        self.assertEqual(
+            ["samples", "0-3", "4-7"], list(table.vector("system.cpu.lat"))
+        )
+        self.assertTrue(math.isnan(table["system.cpu.cpi"][0]))
+        # missing from the first dump
+        self.assertTrue(math.isnan(table["system.new"][0]))
+        self.assertEqual(7, table["system.new"][1])
+        self.assertEqual([40, 40], table.sum(r".*op_class::.*").tolist())
+        self.assertRaises(KeyError, table.column, "system.missing")
+
+    def test_same_values_as_harvester(self):
+        text = _dump(1.5, "system.inf inf # Infinite\nsystem.text abc #\n")
+        (dump,) = parse_stats_txt(io.StringIO(text))
+        table = read_stats_table(io.StringIO(text))
+        self.assertEqual(list(dump), table.names)
+        for name, value in dump.items():
+            if value is None:
+                self.assertTrue(math.isnan(table[name][0]), name)
+            else:
+                self.assertEqual(value, table[name][0], name)
+        self.assertEqual(math.inf, table["system.inf"][0])
+        self.assertNotIn("system.text", table)
+
+    def test_stats_selection(self):
+        table = read_stats_table(
+            io.StringIO(_dump(1.5)), stats=[r".*\.ipc", r".*::samples"]
+        )
+        self.assertEqual(
+            ["system.cpu.ipc", "system.cpu.lat::samples"], table.names
+        )
+        self.assertEqual(["system.cpu.ipc"], table.select(r".*ipc").names)
+
+    def test_read_runs(self):
+        with tempfile.TemporaryDirectory() as root:
+            for benchmark, base_ipc in (("mcf", 1.0), ("lbm", 2.0)):
+                for latency in (0, 10, 20):
+                    directory = os.path.join(root, f"{benchmark}_{latency}")
+                    os.makedirs(directory)
+                    with open(os.path.join(directory, "stats.txt"), "w") as f:
+                        f.write(_dump(99) + _dump(base_ipc / (1 + latency)))
+                    with open(
+                        os.path.join(directory, "params.json"), "w"
+                    ) as f:
+                        json.dump(
+                            {"benchmark": benchmark, "latency": latency}, f
+                        )
+
+            runs = read_runs([root], stats=r".*\.ipc", workers=2)
+            self.assertEqual(6, len(runs))
+            self.assertEqual(["system.cpu.ipc"], runs.names)
+
+            benchmarks, latencies, ipc = runs.pivot(
+                "system.cpu.ipc", index="benchmark", columns="latency"
+            )
+            self.assertEqual(["lbm", "mcf"], benchmarks)
+            self.assertEqual([0, 10, 20], latencies)
+            self.assertEqual([1.0, 1 / 11, 1 / 21], ipc[1].tolist())
+
+            speedup = runs.where(benchmark="lbm").relative(
+                "system.cpu.ipc", latency=0
+            )
+            self.assertEqual([1.0, 1 / 11, 1 / 21], speedup.tolist())
+
+            all_dumps = read_runs([root], stats=r".*\.ipc", dump=None)
+            self.assertEqual(12, len(all_dumps))
+            self.assertEqual(
+                [99.0] * 6,
+                all_dumps.where(dump=0).column("system.cpu.ipc").tolist(),
+            )
+            self.assertRaises(
+                ValueError,
+                all_dumps.pivot,
+                "system.cpu.ipc",
+                "benchmark",
+                "latency",
+            )
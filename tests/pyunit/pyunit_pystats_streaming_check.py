@@ -0,0 +1,128 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from m5.ext.pystats.group import Group
+from m5.ext.pystats.jsonloader import load_lines
+from m5.ext.pystats.simstat import SimStat
+from m5.ext.pystats.statistic import (
+    Distribution,
+    Scalar,
+)
+from m5.ext.pystats.streaming import (
+    JsonStreamWriter,
+    compression_from_name,
+    open_stats_file,
+)
+
+
+def _simstat(cycles=100):
+    return SimStat(
+        creation_time=datetime(2024, 1, 1),
+        time_conversion=None,
+        simulated_begin_time=0,
+        simulated_end_time=cycles,
+        system=Group(
+            cpu=Group(
+                numCycles=Scalar(cycles, unit="Count", description="Cycles"),
+                dist=Distribution(
+                    value=[1, 2], min=0, max=1, num_bins=2, bin_size=1
+                ),
+            ),
+            empty=Group(),
+            ipc=Scalar(1.5),
+        ),
+    )
+
+
+def _write_group(writer, name, group):
+    writer.begin_group(name)
+    for key, child in group._stat_items():
+        if isinstance(child, Group):
+            _write_group(writer, key, child)
+        else:
+            writer.value(key, child)
+    writer.end_group()
+
+
+def _stream(simstat, fp, **kwargs):
+    """Writes a SimStat as the JSON stats output visits the gem5 stats."""
+    writer = JsonStreamWriter(fp, **kwargs)
+    writer.begin(
+        creation_time=simstat.creation_time,
+        time_conversion=simstat.time_conversion,
+        simulated_begin_time=simstat.simulated_begin_time,
+        simulated_end_time=simstat.simulated_end_time,
+    )
+    for name, group in simstat._stat_items():
+        _write_group(writer, name, group)
+    writer.end()
+
+
+class JsonStreamWriterTestSuite(unittest.TestCase):
+    def test_same_output_as_dump(self):
+        for kwargs in ({"indent": 4}, {"indent": 2}, {"indent": None}):
+            expected = io.StringIO()
+            _simstat().dump(expected, **kwargs)
+            streamed = io.StringIO()
+            _stream(_simstat(), streamed, **kwargs)
+            self.assertEqual(expected.getvalue(), streamed.getvalue())
+
+    def test_unbalanced_groups(self):
+        writer = JsonStreamWriter(io.StringIO())
+        writer.begin()
+        self.assertRaises(RuntimeError, writer.end_group)
+        writer.begin_group("system")
+        self.assertRaises(RuntimeError, writer.end)
+
+    def test_compression_from_name(self):
+        self.assertEqual("gzip", compression_from_name("stats.jsonl.gz"))
+        self.assertEqual("zstd", compression_from_name("stats.json.zst"))
+        self.assertIsNone(compression_from_name("stats.json"))
+
+    def test_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("stats.jsonl", "stats.jsonl.gz"):
+                path = os.path.join(directory, name)
+                for dump, cycles in enumerate((100, 200, 300)):
+                    mode = "a" if dump else "w"
+                    with open_stats_file(path, mode) as fp:
+                        _stream(_simstat(cycles), fp, indent=None)
+                        fp.write("\n")
+                for lazy in (False, True):
+                    dumps = list(load_lines(path, lazy=lazy))
+                    self.assertEqual(
+                        [100, 200, 300],
+                        [d.system.cpu.numCycles.value for d in dumps],
+                    )
+                    self.assertEqual(
+                        _simstat(300).to_json(), dumps[-1].to_json()
+                    )
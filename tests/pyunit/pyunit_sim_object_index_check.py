@@ -0,0 +1,113 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import runpy
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+BUILD_TOOLS = Path(__file__).resolve().parents[2] / "build_tools"
+SCRIPT = str(BUILD_TOOLS / "sim_object_index.py")
+
+MODULES = {
+    "a": """
+        __all__ = ["A"]
+
+        class A:
+            pass
+
+        class NotExported:
+            pass
+        """,
+    "b": """
+        import os
+        from m5.objects.a import A
+
+        class B:
+            pass
+
+        if os.name:
+            C = 1
+        else:
+            D = 2
+
+        try:
+            from os import path as E
+        except ImportError:
+            E = None
+
+        for F in range(1):
+            pass
+
+        _private = 1
+        """,
+    "c": """
+        from m5.objects.b import *
+
+        class B:
+            pass
+        """,
+}
+
+
+class SimObjectIndexTestSuite(unittest.TestCase):
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            modules = []
+            for name, source in MODULES.items():
+                path = os.path.join(directory, f"{name}.py")
+                with open(path, "w") as f:
+                    f.write(textwrap.dedent(source))
+                modules.append(f"m5.objects.{name}={path}")
+            index_py = os.path.join(directory, "_index.py")
+
+            with patch.object(
+                sys, "argv", [SCRIPT, index_py] + modules
+            ), patch.object(sys, "path", [str(BUILD_TOOLS)] + sys.path):
+                script = runpy.run_path(SCRIPT, run_name="__main__")
+            generated = runpy.run_path(index_py)["index"]
+
+        self.assertEqual(
+            {
+                # defined by a, only imported by b
+                "A": "m5.objects.a",
+                # the last module defining a name wins
+                "B": "m5.objects.c",
+                "C": "m5.objects.b",
+                "D": "m5.objects.b",
+                "E": "m5.objects.b",
+                "F": "m5.objects.b",
+                # imported, but not by any module defining it
+                "os": "m5.objects.b",
+            },
+            generated,
+        )
+        self.assertEqual(script["index"], generated)
@@ -0,0 +1,166 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from m5.ext.pystats.harvester import (
+    Harvester,
+    flatten,
+    parse_stats_txt,
+)
+from m5.ext.pystats.jsonloader import load
+
+STATS_TXT = """
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.010000                       # Number of seconds simulated (Second)
+system.cpu.ipc                               {ipc}                       # IPC: instructions per cycle ((Count/Cycle))
+system.cpu.numCycles                         1000                       # Number of cpu cycles simulated (Cycle)
+system.cpu.fetch.rate                        nan                       # Fetch rate (Ratio)
+---------- End Simulation Statistics   ----------
+
+---------- Begin Simulation Statistics ----------
+simSeconds                                   0.020000                       # Number of seconds simulated (Second)
+system.cpu.ipc                               {ipc2}                       # IPC: instructions per cycle ((Count/Cycle))
+---------- End Simulation Statistics   ----------
+"""
+
+
+class StatsHarvesterTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "runs")
+        self.database = os.path.join(self.tmp.name, "stats.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_run(self, name, ipc, params=None):
+        directory = os.path.join(self.root, name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "stats.txt"), "w") as f:
+            f.write(STATS_TXT.format(ipc=ipc, ipc2=ipc * 2))
+        if params is not None:
+            with open(os.path.join(directory, "params.json"), "w") as f:
+                json.dump(params, f)
+        return directory
+
+    def test_parse_stats_txt(self):
+        stats = STATS_TXT.format(ipc=1.5, ipc2=3)
+        dumps = parse_stats_txt(io.StringIO(stats))
+        self.assertEqual(2, len(dumps))
+        self.assertEqual(1.5, dumps[0]["system.cpu.ipc"])
+        self.assertEqual(1000, dumps[0]["system.cpu.numCycles"])
+        self.assertIsNone(dumps[0]["system.cpu.fetch.rate"])
+        self.assertEqual(3, dumps[1]["system.cpu.ipc"])
+
+    def test_flatten_json(self):
+        simstat = load(
+            io.StringIO(
+                json.dumps(
+                    {
+                        "system": {
+                            "type": "Group",
+                            "cpu": {
+                                "type": "Group",
+                                "ipc": {"type": "Scalar", "value": 1.5},
+                            },
+                        }
+                    }
+                )
+            )
+        )
+        self.assertEqual({"system.cpu.ipc": 1.5}, flatten(simstat))
+
+    def test_query(self):
+        self.make_run("a", 0.5, {"benchmark": "mcf_r", "latency": 0})
+        self.make_run("b", 0.25, {"benchmark": "mcf_r", "latency": 59})
+        self.make_run("lbm_r_0", 2.0)
+        with Harvester(self.database, workers=1) as harvester:
+            summary = harvester.harvest([self.root])
+            self.assertEqual(3, summary.added)
+
+            rows = harvester.query(
+                "system.cpu.ipc", by=["latency"], benchmark="mcf_r"
+            )
+            self.assertEqual([(0, 1.0), (59, 0.5)], [r[1:] for r in rows])
+
+            rows = harvester.query(
+                "system.cpu.ipc", dump=0, benchmark="mcf_r", latency=59
+            )
+            self.assertEqual([0.25], [r[1] for r in rows])
+
+            # the benchmark is guessed from the directory name
+            rows = harvester.query("system.cpu.ipc", benchmark="lbm_r")
+            self.assertEqual([4.0], [r[1] for r in rows])
+
+    def test_incremental(self):
+        self.make_run("a", 0.5, {"benchmark": "mcf_r"})
+        b = self.make_run("b", 0.25, {"benchmark": "mcf_r"})
+        with Harvester(self.database, workers=1) as harvester:
+            harvester.harvest([self.root])
+
+            summary = harvester.harvest([self.root])
+            self.assertEqual((0, 0, 2, 0), tuple(summary))
+
+            # same content, new mtime: hashed but not parsed again
+            os.utime(os.path.join(b, "stats.txt"), ns=(0, 0))
+            summary = harvester.harvest([self.root])
+            self.assertEqual((0, 0, 2, 0), tuple(summary))
+
+            self.make_run("b", 0.125)
+            os.utime(os.path.join(b, "stats.txt"), ns=(1, 1))
+            summary = harvester.harvest([self.root])
+            self.assertEqual((0, 1, 1, 0), tuple(summary))
+            rows = harvester.query("system.cpu.ipc", dump=0)
+            self.assertEqual([0.5, 0.125], [r[1] for r in rows])
+
+            os.remove(os.path.join(b, "stats.txt"))
+            summary = harvester.harvest([self.root], prune=True)
+            self.assertEqual(1, summary.removed)
+            self.assertEqual(1, len(harvester.runs()))
+
+    def test_stat_selection(self):
+        self.make_run("a", 0.5)
+        with Harvester(
+            self.database, stats=[r"system\.cpu\..*"], workers=1
+        ) as harvester:
+            harvester.harvest([self.root])
+            self.assertEqual(
+                [
+                    "system.cpu.fetch.rate",
+                    "system.cpu.ipc",
+                    "system.cpu.numCycles",
+                ],
+                harvester.stat_names(),
+            )
+        # reopening without a selection keeps the stored one
+        with Harvester(self.database, workers=1) as harvester:
+            summary = harvester.harvest([self.root])
+            self.assertEqual((0, 0, 1, 0), tuple(summary))
@@ -0,0 +1,170 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from m5.ext.pystats.group import Group
+from m5.ext.pystats.simstat import SimStat
+from m5.ext.pystats.statistic import Scalar
+
+from gem5.utils.multiprocessing.pool import (
+    SimulationPool,
+    _decode_stats,
+    _process_rss,
+    _stats_payload,
+)
+
+
+def _simstat(ipc=1.5):
+    return SimStat(
+        system=Group(cpu=Group(ipc=Scalar(ipc), numCycles=Scalar(100)))
+    )
+
+
+def _succeed(ipc):
+    return _simstat(ipc)
+
+
+def _fail():
+    raise RuntimeError("no simulation today")
+
+
+def _fail_once(marker):
+    """Fail the first time, succeed once ``marker`` exists."""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise RuntimeError("first attempt")
+    return _simstat()
+
+
+def _exit():
+    os._exit(3)
+
+
+def _sleep():
+    time.sleep(30)
+    return _simstat()
+
+
+class StatsPayloadTestSuite(unittest.TestCase):
+    def test_simstat(self):
+        simstat = _simstat()
+        stats = _decode_stats(_stats_payload(simstat, None))
+        self.assertIsInstance(stats, SimStat)
+        self.assertEqual(simstat.to_json(), stats.to_json())
+
+    def test_selected_stats(self):
+        stats = _decode_stats(
+            _stats_payload(
+                _simstat(), ["system.cpu.ipc", "system.cpu.numCycles"]
+            )
+        )
+        self.assertEqual(
+            {"system.cpu.ipc": 1.5, "system.cpu.numCycles": 100},
+            {path: stat.value for path, stat in stats.items()},
+        )
+
+
+class ProcessRssTestSuite(unittest.TestCase):
+    @unittest.skipUnless(os.path.isdir("/proc/self"), "needs /proc")
+    def test_linux(self):
+        self.assertGreater(_process_rss(os.getpid()), 0)
+        process = multiprocessing.get_context("fork").Process(target=_exit)
+        process.start()
+        process.join()
+        # the process is gone
+        self.assertEqual(0, _process_rss(process.pid))
+
+    def test_no_proc(self):
+        with patch("builtins.open", side_effect=FileNotFoundError), patch(
+            "os.path.isdir", return_value=False
+        ):
+            self.assertIsNone(_process_rss(os.getpid()))
+
+
+class SimulationPoolTestSuite(unittest.TestCase):
+    def _pool(self, **kwargs):
+        """A pool forking the jobs from this process, instead of starting
+        them in new gem5 processes."""
+        pool = SimulationPool(processes=2, poll_interval=0.05, **kwargs)
+        pool._context = multiprocessing.get_context("fork")
+        return pool
+
+    def test_results(self):
+        pool = self._pool()
+        pool.submit(_succeed, args=(2.0,), name="good")
+        pool.submit(_fail, name="bad")
+        pool.submit(_exit, name="exit")
+        good, bad, exit = pool.run()
+
+        self.assertTrue(good.succeeded)
+        self.assertEqual(0, good.exitcode)
+        self.assertEqual(2.0, good.stats.system.cpu.ipc.value)
+        self.assertIsNone(good.value)
+
+        self.assertFalse(bad.succeeded)
+        self.assertIsNone(bad.stats)
+        self.assertIn("no simulation today", bad.error)
+
+        self.assertEqual(3, exit.exitcode)
+        self.assertEqual(
+            "gem5 exited with code 3 without a result", exit.error
+        )
+
+    def test_retries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pool = self._pool(retries=2)
+            pool.submit(_fail_once, args=(os.path.join(directory, "m"),))
+            pool.submit(_fail)
+            retried, failed = pool.run()
+        self.assertTrue(retried.succeeded)
+        self.assertEqual(2, retried.attempts)
+        self.assertFalse(failed.succeeded)
+        self.assertEqual(3, failed.attempts)
+
+    def test_timeout(self):
+        pool = self._pool(timeout=0.2, retries=1)
+        pool.submit(_sleep)
+        (result,) = pool.run()
+        self.assertEqual("timed out after 0.2 seconds", result.error)
+        self.assertEqual(2, result.attempts)
+        self.assertEqual(-9, result.exitcode)
+        self.assertLess(result.elapsed, 10)
+
+    @unittest.skipUnless(os.path.isdir("/proc/self"), "needs /proc")
+    def test_memory_limit(self):
+        pool = self._pool(memory_limit=1)
+        pool.submit(_sleep)
+        (result,) = pool.run()
+        self.assertIn("killed for using", result.error)
+        self.assertEqual(1, result.attempts)
+        self.assertEqual(-9, result.exitcode)
@@ -0,0 +1,230 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from gem5.simulate.stat_sampler import (
+    StatSampler,
+    load_samples,
+)
+
+
+class _Info:
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+
+    def prepare(self):
+        pass
+
+
+class _ScalarInfo(_Info):
+    pass
+
+
+class _VectorInfo(_Info):
+    def __init__(self, name, result, subnames=()):
+        super().__init__(name, result)
+        self.size = len(result)
+        self.subnames = list(subnames)
+
+
+class _DistInfo(_Info):
+    pass
+
+
+class _Group:
+    def __init__(self, stats, groups=None):
+        self.stats = stats
+        self.groups = groups or {}
+        self.dumps = 0
+
+    def getStats(self):
+        return self.stats
+
+    def getStatGroups(self):
+        return self.groups
+
+    def preDumpStats(self):
+        self.dumps += 1
+
+
+class _EventQueue:
+    """Stands in for the m5 tick and exit event functions."""
+
+    def __init__(self):
+        self.tick = 0
+        self.scheduled = []
+
+    def curTick(self):
+        return self.tick
+
+    def scheduleTickExitAbsolute(self, tick, cause):
+        self.scheduled.append((tick, cause))
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class StatSamplerTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.ipc = _ScalarInfo("ipc", 1.0)
+        self.op_class = _VectorInfo("op_class", [3.0, 4.0], ["IntAlu", ""])
+        self.latency = _DistInfo("latency", None)
+        self.cpu = _Group([self.ipc, self.op_class, self.latency])
+        self.root = _Group([], {"system": _Group([], {"cpu": self.cpu})})
+        self.queue = _EventQueue()
+
+        patcher = patch.multiple(
+            "gem5.simulate.stat_sampler",
+            m5=self.queue,
+            Root=SimpleNamespace(getInstance=lambda: self.root),
+            _stats=SimpleNamespace(
+                ScalarInfo=_ScalarInfo, VectorInfo=_VectorInfo
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, sampler, samples):
+        """Start the sampler and take ``samples`` samples, the ipc being
+        the sample's number."""
+        sampler.start()
+        for i in range(samples):
+            self.queue.tick = sampler.next_tick
+            self.ipc.result = float(i)
+            self.assertTrue(sampler.is_due())
+            sampler.sample()
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, StatSampler, ["system.cpu.ipc"], 0)
+        self.assertRaises(
+            ValueError, StatSampler, ["system.cpu.ipc"], 10, capacity=None
+        )
+
+    def test_resolve(self):
+        sampler = StatSampler(
+            ["system.cpu.ipc", r".*\.op_class", r"system\.cpu\..*"], 100
+        )
+        sampler.start()
+        # the distribution is skipped when only a pattern matches it
+        self.assertEqual(
+            [
+                "system.cpu.ipc",
+                "system.cpu.op_class::IntAlu",
+                "system.cpu.op_class::1",
+            ],
+            sampler.columns,
+        )
+
+        self.assertRaises(
+            ValueError, StatSampler(["system.cpu.latency"], 100).start
+        )
+        self.assertRaises(ValueError, StatSampler([r".*\.missing"], 100).start)
+
+    def test_scheduling(self):
+        sampler = StatSampler(["system.cpu.ipc"], 100, exit_cause="sample")
+        self.queue.tick = 50
+        sampler.start()
+        self.assertEqual([(150, "sample")], self.queue.scheduled)
+
+        self.queue.tick = 120
+        self.assertFalse(sampler.is_due())
+        self.queue.tick = 150
+        self.assertTrue(sampler.is_due())
+        sampler.sample()
+        self.assertEqual((250, "sample"), self.queue.scheduled[-1])
+        self.assertEqual(1, len(sampler))
+        self.assertEqual(1, self.cpu.dumps)
+
+        # a restart leaves the exit event scheduled before it stale
+        self.queue.tick = 200
+        sampler.start()
+        self.queue.tick = 250
+        self.assertFalse(sampler.is_due())
+        self.queue.tick = 300
+        self.assertTrue(sampler.is_due())
+
+    def test_samples(self):
+        sampler = StatSampler(["system.cpu.ipc", r".*op_class"], 100)
+        self._run(sampler, 2)
+        ticks, values = sampler.samples()
+        self.assertEqual([100, 200], ticks.tolist())
+        self.assertEqual([[0.0, 3.0, 4.0], [1.0, 3.0, 4.0]], values.tolist())
+        self.assertEqual(
+            [0.0, 1.0], sampler.as_dict()["system.cpu.ipc"].tolist()
+        )
+
+    def test_ring_buffer(self):
+        sampler = StatSampler(["system.cpu.ipc"], 100, capacity=3)
+        self._run(sampler, 5)
+        self.assertEqual(5, len(sampler))
+        # the two oldest samples are overwritten, the rest is oldest first
+        ticks, values = sampler.samples()
+        self.assertEqual([300, 400, 500], ticks.tolist())
+        self.assertEqual([[2.0], [3.0], [4.0]], values.tolist())
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "samples.bin")
+            sampler = StatSampler(
+                ["system.cpu.ipc", r".*op_class"],
+                100,
+                capacity=None,
+                path=path,
+            )
+            self._run(sampler, 3)
+            sampler.close()
+
+            ticks, values = sampler.samples()
+            self.assertEqual(0, len(ticks))
+            self.assertEqual((0, 3), values.shape)
+
+            samples = load_samples(path)
+            self.assertEqual(
+                [
+                    "tick",
+                    "system.cpu.ipc",
+                    "system.cpu.op_class::IntAlu",
+                    "system.cpu.op_class::1",
+                ],
+                list(samples),
+            )
+            self.assertEqual([100, 200, 300], samples["tick"].tolist())
+            self.assertEqual(
+                [0.0, 1.0, 2.0], samples["system.cpu.ipc"].tolist()
+            )
+            self.assertEqual(
+                [4.0, 4.0, 4.0], samples["system.cpu.op_class::1"].tolist()
+            )
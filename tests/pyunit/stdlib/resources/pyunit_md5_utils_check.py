@@ -24,13 +24,18 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import json
 import os
 import shutil
 import tempfile
+import time
 import unittest
 from pathlib import Path
 
 from gem5.resources.md5_utils import (
+    MD5_CACHE_SUFFIX,
+    cached_md5,
+    md5,
     md5_dir,
     md5_file,
 )
@@ -116,3 +121,67 @@ class MD5DirTestSuite(unittest.TestCase):
         shutil.rmtree(dir2)
 
         self.assertEqual(first_md5, second_md5)
+
+
+class MD5CacheTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.md5_utils.md5(path, cache=True)"""
+
+    def setUp(self) -> None:
+        self.dir = Path(tempfile.mkdtemp())
+        self.file = self.dir / "resource"
+        self.file.write_text("This is a test string, to be put in a temp file")
+        self._age(self.file)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir)
+
+    def _age(self, path: Path) -> None:
+        # files modified in the last seconds are never cached
+        then = time.time() - 60
+        os.utime(path, (then, then))
+
+    def test_md5IsCached(self) -> None:
+        self.assertIsNone(cached_md5(self.file))
+        self.assertEqual(
+            "b113b29fce251f2023066c3fda2ec9dd", md5(self.file, cache=True)
+        )
+        self.assertEqual(
+            "b113b29fce251f2023066c3fda2ec9dd", cached_md5(self.file)
+        )
+
+    def test_cachedMd5IsReused(self) -> None:
+        md5(self.file, cache=True)
+        cache = Path(f"{self.file}{MD5_CACHE_SUFFIX}")
+        entry = json.loads(cache.read_text())
+        entry["md5"] = "not-hashed-again"
+        cache.write_text(json.dumps(entry))
+
+        self.assertEqual("not-hashed-again", md5(self.file, cache=True))
+
+    def test_modifiedFileIsHashedAgain(self) -> None:
+        md5(self.file, cache=True)
+        self.file.write_text("Some other contents")
+        self._age(self.file)
+
+        self.assertIsNone(cached_md5(self.file))
+        self.assertEqual(md5_file(self.file), md5(self.file, cache=True))
+
+    def test_recentlyModifiedFileIsNotCached(self) -> None:
+        self.file.write_text("Some other contents")
+        md5(self.file, cache=True)
+
+        self.assertIsNone(cached_md5(self.file))
+
+    def test_directoryIsCached(self) -> None:
+        resource = self.dir / "sub"
+        resource.mkdir()
+        (resource / "file").write_text("Some test data here")
+        self._age(resource / "file")
+        self._age(resource)
+
+        value = md5(resource, cache=True)
+        self.assertEqual(md5_dir(resource), value)
+        self.assertEqual(value, cached_md5(resource))
+
+        (resource / "file").write_text("Some more test data")
+        self.assertIsNone(cached_md5(resource))
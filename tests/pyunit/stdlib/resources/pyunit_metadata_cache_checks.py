@@ -0,0 +1,180 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import (
+    BaseHTTPRequestHandler,
+    HTTPServer,
+)
+
+from gem5.resources.client_api.jsonclient import JSONClient
+from gem5.resources.client_api.metadata_cache import MetadataCache
+
+resources = [
+    {
+        "category": "binary",
+        "id": "test-binary",
+        "resource_version": "1.0.0",
+        "gem5_versions": ["develop"],
+    }
+]
+
+
+class _MetadataHandler(BaseHTTPRequestHandler):
+    """Serves ``resources`` with an ETag and counts the requests."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        etag = f'"{server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            server.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(server.resources).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetadataCacheTestSuite(unittest.TestCase):
+    """Test cases for gem5.resources.client_api.metadata_cache, with a
+    JSONClient served by a local JSON server."""
+
+    def setUp(self) -> None:
+        self.server = HTTPServer(("127.0.0.1", 0), _MetadataHandler)
+        self.server.resources = resources
+        self.server.version = 1
+        self.server.requests = 0
+        self.server.not_modified = 0
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/resources"
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def _client(self, **kwargs) -> JSONClient:
+        return JSONClient(self.url, MetadataCache(self.directory, **kwargs))
+
+    def _expire(self) -> None:
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            with open(path) as f:
+                entry = json.load(f)
+            entry["fetched"] = time.time() - 7200
+            with open(path, "w") as f:
+                json.dump(entry, f)
+
+    def test_freshEntryIsUsed(self) -> None:
+        for _ in range(3):
+            client = self._client()
+            self.assertEqual(
+                "1.0.0",
+                client.get_resources_by_id("test-binary")[0][
+                    "resource_version"
+                ],
+            )
+        self.assertEqual(1, self.server.requests)
+
+    def test_expiredEntryIsRevalidated(self) -> None:
+        self._client()
+        self._expire()
+        client = self._client()
+
+        self.assertEqual(2, self.server.requests)
+        self.assertEqual(1, self.server.not_modified)
+        self.assertEqual(resources, client.get_resources_json())
+
+        # the revalidated entry is fresh again
+        self._client()
+        self.assertEqual(2, self.server.requests)
+
+    def test_changedResourcesAreFetched(self) -> None:
+        self._client()
+        self._expire()
+        self.server.version = 2
+        self.server.resources = resources + [
+            dict(resources[0], resource_version="2.0.0")
+        ]
+        client = self._client()
+
+        self.assertEqual(0, self.server.not_modified)
+        self.assertEqual(2, len(client.get_resources_by_id("test-binary")))
+
+    def test_zeroTtlAlwaysRevalidates(self) -> None:
+        self._client(ttl=0)
+        self._client(ttl=0)
+        self.assertEqual(2, self.server.requests)
+        self.assertEqual(1, self.server.not_modified)
+
+    def test_offlineUsesCacheOnly(self) -> None:
+        self._client()
+        self._expire()
+        client = self._client(offline=True)
+
+        self.assertEqual(1, self.server.requests)
+        self.assertEqual(resources, client.get_resources_json())
+
+    def test_offlineWithoutCacheFails(self) -> None:
+        with self.assertRaises(Exception):
+            self._client(offline=True)
+        self.assertEqual(0, self.server.requests)
+
+    def test_unreachableSourceUsesExpiredEntry(self) -> None:
+        self._client()
+        self._expire()
+        self.url = "http://127.0.0.1:1/resources"
+        with open(self._cache_file()) as f:
+            entry = json.load(f)
+        # the entry of the unreachable URL is the one of the original URL
+        cache = MetadataCache(self.directory)
+        cache.store(f"json:{self.url}", entry["data"], entry["etag"])
+        self._expire()
+
+        client = self._client()
+        self.assertEqual(resources, client.get_resources_json())
+
+    def _cache_file(self) -> str:
+        (name,) = os.listdir(self.directory)
+        return os.path.join(self.directory, name)
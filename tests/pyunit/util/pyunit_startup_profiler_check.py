@@ -0,0 +1,104 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import tempfile
+import unittest
+
+from m5.util.startup_profiler import (
+    REPORT_FILE,
+    TRACE_FILE,
+    StartupProfiler,
+)
+
+
+class Cache:
+    def init(self):
+        self.lines = [0] * 1000
+
+
+class Core:
+    def init(self):
+        pass
+
+
+class StartupProfilerTestSuite(unittest.TestCase):
+    def test_nested_phases(self):
+        profiler = StartupProfiler()
+        with profiler.phase("instantiate"):
+            with profiler.phase("init"):
+                pass
+        self.assertEqual(
+            [("init", 1), ("instantiate", 0)],
+            [(p.name, p.depth) for p in profiler.phases],
+        )
+        self.assertIsNone(profiler.phases[0].allocated)
+        inner, outer = profiler.phases
+        self.assertLessEqual(outer.start, inner.start)
+        self.assertLessEqual(inner.duration, outer.duration)
+
+    def test_unbalanced_phases(self):
+        profiler = StartupProfiler()
+        profiler.begin("config script")
+        profiler.begin("import")
+        self.assertTrue(profiler.is_open("config script"))
+        self.assertRaises(RuntimeError, profiler.end, "config script")
+        profiler.finish()
+        self.assertFalse(profiler.is_open("config script"))
+        self.assertEqual(2, len(profiler.phases))
+
+    def test_visit(self):
+        profiler = StartupProfiler(memory=True)
+        objs = [Cache(), Core(), Cache()]
+        with profiler.phase("init"):
+            profiler.visit("init", objs, lambda obj: obj.init())
+        profiler.finish()
+        self.assertEqual(1000, len(objs[0].lines))
+        self.assertEqual(2, profiler.types[("init", "Cache")].count)
+        self.assertEqual(1, profiler.types[("init", "Core")].count)
+        self.assertGreater(profiler.types[("init", "Cache")].allocated, 0)
+        report = profiler.report()
+        self.assertIn("init: Cache", report)
+        self.assertIn("Allocated", report)
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as outdir:
+            profiler = StartupProfiler(outdir)
+            with profiler.phase("instantiate"):
+                profiler.visit("init", [Core()], lambda obj: obj.init())
+            profiler.finish()
+            with open(os.path.join(outdir, REPORT_FILE)) as f:
+                self.assertIn("instantiate", f.read())
+            with open(os.path.join(outdir, TRACE_FILE)) as f:
+                trace = json.load(f)
+            self.assertEqual(
+                ["instantiate"], [e["name"] for e in trace["traceEvents"]]
+            )
+            self.assertEqual("X", trace["traceEvents"][0]["ph"])
+            self.assertEqual(
+                "Core", trace["otherData"]["simObjectTypes"][0]["type"]
+            )
@@ -1,14 +1,69 @@
 import math
 from types import SimpleNamespace
+from typing import (
+    NamedTuple,
+    Optional,
+)
+
 import numpy as np
-import pdb
+
+# op codes understood by Cache.access
+READ = 0
+WRITE = 1
+
+# an eviction caused by Cache.access. `index` is the position, in the batch,
+# of the access that caused it.
+EVICTION_DTYPE = np.dtype(
+    [
+        ("index", np.int64),
+        ("address", np.int64),
+        ("data", np.int64),
+        ("last_access", np.int64),
+    ]
+)
+
+
+class AccessResult(NamedTuple):
+    hits: np.ndarray  # bool, one entry per access
+    evictions: np.ndarray  # EVICTION_DTYPE records, in access order
+
+    @property
+    def misses(self) -> np.ndarray:
+        return ~self.hits
+
+
+class ReplacementPolicy:
+    """Picks the way to evict in sets where every way is valid."""
+
+    def victim(self, cache: "Cache", sets: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class LRUPolicy(ReplacementPolicy):
+    def victim(self, cache, sets):
+        return cache.last_access[sets].argmin(axis=1)
+
+
+class FIFOPolicy(ReplacementPolicy):
+    def victim(self, cache, sets):
+        return cache.fill_time[sets].argmin(axis=1)
+
+
+class RandomPolicy(ReplacementPolicy):
+    def __init__(self, seed=0):
+        self._rng = np.random.default_rng(seed)
+
+    def victim(self, cache, sets):
+        return self._rng.integers(0, cache.set_assoc, size=len(sets))
+
+
+POLICIES = {"lru": LRUPolicy, "fifo": FIFOPolicy, "random": RandomPolicy}
 
 
 class Cache:
-    def __init__(self, size=2**15, set_assoc=8, line_size=8):
-        # cache lines are just tuples, where first elemetnt is tag, second is valid bit, and third is the data
-        # it's a list and indexed by the set index
-        # each set then contains a list of ways
+    def __init__(self, size=2**15, set_assoc=8, line_size=8, policy="lru"):
+        # the cache state is kept in (num_sets x set_assoc) numpy arrays, so
+        # a lookup compares a whole set (or many sets at once) in one go.
 
         # sanity checks
         if size % line_size != 0:
@@ -34,108 +89,258 @@ class Cache:
 
         self.tag_shift_size = self.set_index_size + self.bo_size
         # no need for a tag bit mask
-        # print(self.bo_size, self.set_index_size, self.tag_size)
 
-        self.sets = [
-            [
-                {"way": x, "tag": 0, "valid": 0, "data": [0 for ], "last_access": 0}
-                for x in range(self.set_assoc)
-            ]
-            for _ in range(self.num_sets)
-        ]
+        if isinstance(policy, str):
+            if policy not in POLICIES:
+                raise ValueError(
+                    f"Unknown replacement policy '{policy}'. "
+                    f"Choose from {list(POLICIES)}"
+                )
+            policy = POLICIES[policy]()
+        self.policy = policy
 
-        self.init_stats()
+        self.flush()
 
     def flush(self):
-        self.sets = [
-            [
-                {"way": x, "tag": 0, "valid": 0, "data": 0, "last_access": 0}
-                for x in range(self.set_assoc)
-            ]
-            for _ in range(self.num_sets)
-        ]
+        shape = (self.num_sets, self.set_assoc)
+        self.tags = np.zeros(shape, dtype=np.int64)
+        self.valid = np.zeros(shape, dtype=bool)
+        self.data = np.zeros(shape, dtype=np.int64)
+        self.last_access = np.zeros(shape, dtype=np.int64)
+        # when the line was filled, used by FIFO replacement
+        self.fill_time = np.zeros(shape, dtype=np.int64)
         self.init_stats()
 
-    def read(self, address, timestamp):
-        """Access the cache at the given address. Returns data if hit, False if miss."""
-
-        block_bits = address & self.bo_bit_mask
+    def _split(self, address):
         set_index = (address >> self.bo_size) & self.set_index_bit_mask
         tag_bits = address >> self.tag_shift_size
+        return set_index, tag_bits
 
-        for i in self.sets[set_index]:
-            if i["tag"] == tag_bits and i["valid"] == 1:
-                # sanity check
-                if i["last_access"] > timestamp:
-                    raise ValueError(
-                        "Timestamps are not monotonically increasing"
-                    )
-                i["last_access"] = timestamp
-                self.read_hits += 1
-                return i["data"]  # return the data
+    def _line(self, set_index, way):
+        return {
+            "way": int(way),
+            "tag": int(self.tags[set_index, way]),
+            "valid": int(self.valid[set_index, way]),
+            "data": int(self.data[set_index, way]),
+            "last_access": int(self.last_access[set_index, way]),
+        }
 
-        self.read_misses += 1
-        return False
+    def _find(self, set_index, tag_bits):
+        match = (self.tags[set_index] == tag_bits) & self.valid[set_index]
+        if match.any():
+            return int(match.argmax())
+        return None
+
+    def read(self, address, timestamp):
+        """Access the cache at the given address. Returns data if hit, False if miss."""
+
+        set_index, tag_bits = self._split(address)
+        way = self._find(set_index, tag_bits)
+        if way is None:
+            self.read_misses += 1
+            return False
+
+        # sanity check
+        if self.last_access[set_index, way] > timestamp:
+            raise ValueError("Timestamps are not monotonically increasing")
+        self.last_access[set_index, way] = timestamp
+        self.read_hits += 1
+        return int(self.data[set_index, way])  # return the data
 
     def write(self, address, data, timestamp):
         """Write to the cache at the given address. Returns None if the write was successful (write hit) returns the address and data of the evicted line."""
 
-        block_bits = address & self.bo_bit_mask
-        set_index = (address >> self.bo_size) & self.set_index_bit_mask
-        tag_bits = address >> self.tag_shift_size
-
-        # the write policy should write to the first way that is invalid
-        s = self.sets[set_index]
+        set_index, tag_bits = self._split(address)
 
         # first check the tags, the line is already in the cache, just write to it
-        for i in self.sets[set_index]:
-            if i["tag"] == tag_bits and i["valid"] == 1:
-                i["data"] = data
-                i["last_access"] = timestamp
-                self.write_hits += 1
-                return None
-        for i in self.sets[set_index]:
-            if i["valid"] == 0:
-                # print("found invalid line")
-                c = i.copy()
-                i["valid"] = 1
-                i["tag"] = tag_bits
-                i["data"] = data
-                i["last_access"] = timestamp
-                self.write_misses += 1
-                return c
-
-        # if we reach this point, every line is valid, and we need to evict one
+        way = self._find(set_index, tag_bits)
+        if way is not None:
+            self.data[set_index, way] = data
+            self.last_access[set_index, way] = timestamp
+            self.write_hits += 1
+            return None
+
         self.write_misses += 1
-        self.write_evictions += 1
-        # find LRU
-        lru = math.inf
-        evicted = None
-        for i in self.sets[set_index]:
-            if i["last_access"] < lru:
-                lru = i["last_access"]
-                evicted = i.copy()
-        for i in self.sets[set_index]:
-            if i["last_access"] == lru:
-                i["tag"] = tag_bits
-                i["data"] = data
-                i["last_access"] = timestamp
+        invalid = ~self.valid[set_index]
+        if invalid.any():
+            # write to the first way that is invalid
+            way = int(invalid.argmax())
+        else:
+            # every line is valid, and we need to evict one
+            self.write_evictions += 1
+            way = int(self.policy.victim(self, np.array([set_index]))[0])
+        evicted = self._line(set_index, way)
 
+        self.tags[set_index, way] = tag_bits
+        self.valid[set_index, way] = True
+        self.data[set_index, way] = data
+        self.last_access[set_index, way] = timestamp
+        self.fill_time[set_index, way] = timestamp
         return evicted
 
+    def access(
+        self,
+        addresses,
+        ops,
+        timestamps,
+        data: Optional[np.ndarray] = None,
+        allocate_on_read_miss=True,
+    ) -> AccessResult:
+        """Replay a batch of accesses, in order, and return per-access hits
+        and the lines evicted along the way.
+
+        Accesses to different sets are independent, so the batch is replayed
+        in rounds where each round handles the next access of every set at
+        once. Repeated accesses to the same line of a set cannot miss and are
+        folded together first, so the number of rounds is bounded by the
+        number of line changes in the busiest set, not the batch length.
+
+        :param addresses: Line addresses (e.g. row numbers).
+        :param ops: ``READ`` or ``WRITE`` per access (a boolean "is write"
+            array also works).
+        :param timestamps: Non-decreasing access times.
+        :param data: Value written by each write. Defaults to 1.
+        :param allocate_on_read_miss: Fill the line on a read miss, like the
+            counter cache which fetches the counter it missed on.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        ops = np.asarray(ops)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        n = len(addresses)
+        if len(ops) != n or len(timestamps) != n:
+            raise ValueError("addresses, ops and timestamps differ in length")
+        if data is None:
+            data = np.ones(n, dtype=np.int64)
+        else:
+            data = np.asarray(data, dtype=np.int64)
+
+        is_write = ops.astype(bool)
+        set_index, tag_bits = self._split(addresses)
+        hits = np.zeros(n, dtype=bool)
+        evictions = []
+        if n == 0:
+            return AccessResult(hits, np.empty(0, dtype=EVICTION_DTYPE))
+
+        # view the batch set by set, keeping the access order within a set
+        by_set = np.argsort(set_index, kind="stable")
+        sorted_sets = set_index[by_set]
+        same_set = np.r_[False, sorted_sets[1:] == sorted_sets[:-1]]
+
+        # An access to the line that the previous access to the same set
+        # touched is always a hit, since that access left the line resident.
+        # Such runs (e.g. consecutive accesses to one DRAM row) are folded
+        # into their first access, which then carries the time of the last
+        # access of the run and the data of its last write.
+        repeat = same_set & np.r_[False, np.diff(tag_bits[by_set]) == 0]
+        if not allocate_on_read_miss:
+            repeat[:] = False
+        hits[by_set[repeat]] = True
+        run_start = np.flatnonzero(~repeat)
+        run_end = np.r_[run_start[1:], n] - 1
+        heads = by_set[run_start]
+        head_ts = timestamps[by_set[run_end]]
+        write_pos = np.where(is_write[by_set], np.arange(n), -1)
+        last_write = np.maximum.reduceat(write_pos, run_start)
+        head_has_write = last_write >= 0
+        head_data = np.where(
+            head_has_write, data[by_set[np.maximum(last_write, 0)]], 0
+        )
+
+        # rank of every run head among the heads of the same set
+        head_sets = sorted_sets[run_start]
+        group_start = np.flatnonzero(
+            np.r_[True, head_sets[1:] != head_sets[:-1]]
+        )
+        group_sizes = np.diff(np.r_[group_start, len(heads)])
+        rank = np.arange(len(heads)) - np.repeat(group_start, group_sizes)
+
+        # order heads by (rank, position) so every round is contiguous. Each
+        # round handles at most one access per set, so it is vectorized.
+        order = np.lexsort((heads, rank))
+        bounds = np.searchsorted(rank[order], np.arange(rank.max() + 2))
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            h = order[lo:hi]
+            idx = heads[h]
+            s, t, ts = set_index[idx], tag_bits[idx], timestamps[idx]
+            w = is_write[idx]
+
+            match = (self.tags[s] == t[:, None]) & self.valid[s]
+            hit = match.any(axis=1)
+            hits[idx] = hit
+            way = match.argmax(axis=1)
+
+            # hits
+            hs, hw = s[hit], way[hit]
+            if (self.last_access[hs, hw] > ts[hit]).any():
+                raise ValueError("Timestamps are not monotonically increasing")
+
+            # misses that bring a line in
+            fill = ~hit & (w | allocate_on_read_miss)
+            fs = s[fill]
+            if len(fs):
+                invalid = ~self.valid[fs]
+                has_invalid = invalid.any(axis=1)
+                fw = np.where(
+                    has_invalid,
+                    invalid.argmax(axis=1),
+                    self.policy.victim(self, fs),
+                )
+                way[fill] = fw
+                evicting = ~has_invalid
+                if evicting.any():
+                    es, ew = fs[evicting], fw[evicting]
+                    record = np.empty(len(es), dtype=EVICTION_DTYPE)
+                    record["index"] = idx[fill][evicting]
+                    record["address"] = (
+                        self.tags[es, ew] << self.tag_shift_size
+                    ) | (es << self.bo_size)
+                    record["data"] = self.data[es, ew]
+                    record["last_access"] = self.last_access[es, ew]
+                    evictions.append(record)
+
+                self.tags[fs, fw] = t[fill]
+                self.valid[fs, fw] = True
+                self.data[fs, fw] = 0
+                self.fill_time[fs, fw] = ts[fill]
+
+            # every resident line now reflects the whole run
+            resident = hit | fill
+            rs, rw = s[resident], way[resident]
+            self.last_access[rs, rw] = head_ts[h][resident]
+            written = resident & head_has_write[h]
+            self.data[s[written], way[written]] = head_data[h][written]
+            # a line filled by a read holds 1, like Cache.write(addr, 1, ...)
+            read_fill = fill & ~head_has_write[h]
+            self.data[s[read_fill], way[read_fill]] = 1
+
+        num_writes = int(is_write.sum())
+        write_hits = int((hits & is_write).sum())
+        read_hits = int(hits.sum()) - write_hits
+        self.read_hits += read_hits
+        self.read_misses += n - num_writes - read_hits
+        self.write_hits += write_hits
+        self.write_misses += num_writes - write_hits
+
+        if evictions:
+            evictions = np.concatenate(evictions)
+            evictions.sort(order="index")
+        else:
+            evictions = np.empty(0, dtype=EVICTION_DTYPE)
+        self.write_evictions += len(evictions)
+        return AccessResult(hits, evictions)
+
     def print_set(self, set_index):
         """Print the contents of a set"""
-        s = self.sets[set_index]
         print(f"Set {set_index}")
-        print(json.dumps(s))
+        for way in range(self.set_assoc):
+            print(self._line(set_index, way))
 
     def dump_contents(self):
         """Dump contents for debugging"""
 
-        for i, s in enumerate(self.sets):
-            print("Set", i)
-            for k in s:
-                print(k)
+        for i in range(self.num_sets):
+            self.print_set(i)
 
     def init_stats(self):
         self.read_hits = 0
@@ -10,6 +10,7 @@ import time
 # custom imports
 from cache import Cache
 from rowcounters import RowCounters
+from trace_analyzer.columnar import load_trace
 
 from IPython.core.debugger import set_trace
 
@@ -33,9 +34,21 @@ for TRACE_FILE in TRACE_FILES:
     init_timestamp = 0
 
     s = set()
+    # a trace converted with `python -m trace_analyzer.convert`
+    columnar_trace = os.path.splitext(TRACE_FILE)[0] + ".rht"
     if ".json" in TRACE_FILE:
         print("INFO: loading from json")
         accessed_addresses = json.load(open(TRACE_FILE))
+    elif os.path.isdir(columnar_trace):
+        print(f"INFO: loading from columnar trace {columnar_trace}")
+        trace = load_trace(columnar_trace)
+        w = trace.window(0)
+        ops = [trace.ops[o] for o in w.op.tolist()]
+        clocked_accesses[0] = list(
+            zip(w.tick.tolist(), w.start.tolist(), w.end.tolist(), ops)
+        )
+        addresses, counts = np.unique(w.start, return_counts=True)
+        accessed_addresses[0] = dict(zip(addresses.tolist(), counts.tolist()))
     else:
         print("INFO: parsing from file. this could a minute or two...")
         counter = 0
@@ -144,16 +157,11 @@ for TRACE_FILE in TRACE_FILES:
             # print("WRITE", op)
             cache.write(addr, 1, timestamp)
 
-    c = RowCounters()
-
-    for access in clocked_accesses[0]:
-        timestamp = access[0]
-        start_address = access[1]
-        end_address = access[2]
-        op = access[3]
-
-        row = c.convert_address_to_row(start_address)
-        c[row] += 1
+    # wide counters so that no row saturates
+    c = RowCounters(width=32)
+    c.add_many(
+        c.convert_addresses_to_rows([a[1] for a in clocked_accesses[0]])
+    )
 
     accesses_per_row = {}
     row_accesses = c.get_sorted()  # get the sorted list of rows
@@ -1,3 +1,10 @@
+from typing import (
+    Dict,
+    Tuple,
+)
+
+import numpy as np
+
 # 32 GB of memory space = 8M lines
 DRAM_SIZE = 32 * 2**30
 ROW_SIZE = 8 * 2**10
@@ -5,53 +12,186 @@ NUM_ROWS = DRAM_SIZE // ROW_SIZE
 WIDTH = 8  # in bits
 
 
-# a row counter object. we will then have a list of these
+def _counter_dtype(width):
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if width <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError(f"Counters cannot be wider than 64 bits, got {width}")
+
+
+# one counter per row, kept in a single fixed-width integer array
 class RowCounters:
-    def __init__(self):
-        self._width = 8  # in bits
-        self._counters = [0 for _ in range(NUM_ROWS)]
+    def __init__(self, num_rows=NUM_ROWS, width=WIDTH, saturate=True):
+        """
+        :param num_rows: Number of rows, i.e. counters.
+        :param width: Counter width in bits.
+        :param saturate: Stop counting at ``2**width - 1``. Otherwise the
+            counters wrap around, like an unchecked hardware counter.
+        """
+        self._num_rows = num_rows
+        self._width = width  # in bits
+        self._max = (1 << width) - 1
+        self._saturate = saturate
+        self._dtype = _counter_dtype(width)
+        self._counters = np.zeros(num_rows, dtype=self._dtype)
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def max_value(self):
+        return self._max
+
+    def _fit(self, values):
+        """Bring (wider) counter values back into the counter width."""
+        if self._saturate:
+            values = np.minimum(values, self._max)
+        else:
+            values = values & self._max
+        return values.astype(self._dtype)
+
+    def _check_index(self, index):
+        if index < 0 or index >= self._num_rows:
+            raise IndexError("Index out of bounds")
 
     def __getitem__(self, index):
         # TODO: support slicing at some point
-        return self._counters[index]
+        return int(self._counters[index])
 
     def __setitem__(self, index, value):
         # TODO: support slicing at some point
-        if index < 0 or index >= NUM_ROWS:
-            raise IndexError("Index out of bounds")
-        # if value > 2**WIDTH-1:
-        #     print("WARNING: counter spill over")
-        self._counters[index] = value
+        self._check_index(index)
+        self._counters[index] = self._fit(np.uint64(value))
 
     def __contains__(self, index):
-        if index < 0 or index >= NUM_ROWS:
+        if index < 0 or index >= self._num_rows:
             return False
         else:
             return True
 
     def __len__(self):
-        return NUM_ROWS
+        return self._num_rows
 
     def convert_address_to_row(self, address) -> int:
         """Returns a row index given an address."""
         return address // ROW_SIZE
 
-    def check_counters(self, threshold=2 ** (WIDTH - 1)) -> list:
-        """Returns a list of indeces of rows that have reached the threshold."""
-        # check if any counters
-        ind = []
-        for i in range(NUM_ROWS):
-            if self[i] >= threshold:
-                ind.append(i)
-        return ind
+    def convert_addresses_to_rows(self, addresses) -> np.ndarray:
+        """Vectorized ``convert_address_to_row``."""
+        return np.asarray(addresses, dtype=np.int64) // ROW_SIZE
+
+    def add_many(self, rows):
+        """Count one activation per entry of ``rows`` (duplicates count
+        several times)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        if rows.min() < 0 or rows.max() >= self._num_rows:
+            raise IndexError("Index out of bounds")
+        counts = np.bincount(rows, minlength=self._num_rows)
+        touched = np.flatnonzero(counts)
+        self._counters[touched] = self._fit(
+            self._counters[touched].astype(np.uint64)
+            + counts[touched].astype(np.uint64)
+        )
+
+    def nonzero(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The ``(rows, counts)`` of every row with a non-zero counter."""
+        rows = np.flatnonzero(self._counters)
+        return rows, self._counters[rows]
+
+    def check_counters(self, threshold=None) -> np.ndarray:
+        """Returns the indices of rows that have reached the threshold.
+        The threshold defaults to half of the counter range."""
+        if threshold is None:
+            threshold = 1 << (self._width - 1)
+        return np.flatnonzero(self._counters >= threshold)
+
+    def clear_all(self):
+        self._counters[:] = 0
+
+    def top_k(self, k=10) -> Tuple[np.ndarray, np.ndarray]:
+        """The ``(rows, counts)`` of the ``k`` highest counters, highest
+        first, without sorting all counters."""
+        rows, counts = self.nonzero()
+        if k <= 0:
+            return rows[:0], counts[:0]
+        if k < len(rows):
+            part = np.argpartition(counts, -k)[-k:]
+            rows, counts = rows[part], counts[part]
+        order = np.argsort(counts, kind="stable")[::-1]
+        return rows[order], counts[order]
+
+    def get_sorted(self) -> Dict[int, int]:
+        """returns a dictionary of the non-zero counters sorted by the
+        counter value"""
+        rows, counts = self.top_k(len(self))
+        return dict(zip(rows.tolist(), counts.tolist()))
+
+
+# for traces that touch few rows: only the touched rows are stored, as a
+# sorted array of row indices and their counters
+class SparseRowCounters(RowCounters):
+    def __init__(self, num_rows=NUM_ROWS, width=WIDTH, saturate=True):
+        super().__init__(num_rows=0, width=width, saturate=saturate)
+        self._num_rows = num_rows
+        self._rows = np.zeros(0, dtype=np.int64)
+
+    def _find(self, index):
+        pos = int(np.searchsorted(self._rows, index))
+        if pos < len(self._rows) and self._rows[pos] == index:
+            return pos, True
+        return pos, False
+
+    def __getitem__(self, index):
+        self._check_index(index)
+        pos, found = self._find(index)
+        return int(self._counters[pos]) if found else 0
+
+    def __setitem__(self, index, value):
+        self._check_index(index)
+        value = self._fit(np.uint64(value))
+        pos, found = self._find(index)
+        if found:
+            self._counters[pos] = value
+        else:
+            self._rows = np.insert(self._rows, pos, index)
+            self._counters = np.insert(self._counters, pos, value)
+
+    def add_many(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        if rows.min() < 0 or rows.max() >= self._num_rows:
+            raise IndexError("Index out of bounds")
+        rows, counts = np.unique(rows, return_counts=True)
+        counts = counts.astype(np.uint64)
+
+        pos = np.searchsorted(self._rows, rows)
+        found = np.zeros(len(rows), dtype=bool)
+        in_range = pos < len(self._rows)
+        found[in_range] = self._rows[pos[in_range]] == rows[in_range]
+
+        old = pos[found]
+        self._counters[old] = self._fit(
+            self._counters[old].astype(np.uint64) + counts[found]
+        )
+        new = ~found
+        self._rows = np.insert(self._rows, pos[new], rows[new])
+        self._counters = np.insert(
+            self._counters, pos[new], self._fit(counts[new])
+        )
+
+    def nonzero(self):
+        keep = self._counters != 0
+        return self._rows[keep], self._counters[keep]
+
+    def check_counters(self, threshold=None):
+        if threshold is None:
+            threshold = 1 << (self._width - 1)
+        return self._rows[self._counters >= threshold]
 
     def clear_all(self):
-        for i in range(NUM_ROWS):
-            self[i] = 0
-
-    def get_sorted(self):
-        """returns a dictionary sorted by the counter value"""
-        d = {}
-        for i in range(NUM_ROWS):
-            d[i] = self[i]
-        return dict(sorted(d.items(), key=lambda item: item[1], reverse=True))
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._counters = np.zeros(0, dtype=self._dtype)
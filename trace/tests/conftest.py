@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The trace tools are run from trace/, e.g. `python -m trace_analyzer`.
+TRACE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TRACE_DIR)
@@ -0,0 +1,29 @@
+import unittest
+
+from rowcounters import (
+    RowCounters,
+    SparseRowCounters,
+)
+
+
+class RowCountersTestSuite(unittest.TestCase):
+    def _counters(self):
+        for cls in (RowCounters, SparseRowCounters):
+            counters = cls(num_rows=16)
+            counters.add_many([1, 3, 3, 7, 7, 7])
+            yield counters
+
+    def test_top_k(self):
+        for counters in self._counters():
+            rows, counts = counters.top_k(2)
+            self.assertEqual(rows.tolist(), [7, 3])
+            self.assertEqual(counts.tolist(), [3, 2])
+            rows, counts = counters.top_k(10)
+            self.assertEqual(rows.tolist(), [7, 3, 1])
+
+    def test_top_k_not_positive(self):
+        for counters in self._counters():
+            for k in (0, -1):
+                rows, counts = counters.top_k(k)
+                self.assertEqual(len(rows), 0)
+                self.assertEqual(len(counts), 0)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from trace_analyzer.analyze import (
+    _merge,
+    analyze_trace,
+)
+from trace_analyzer.parse import (
+    TICKS_PER_MS,
+    find_init_tick,
+    find_shards,
+    parse_shard,
+)
+
+
+def _write_trace(path, num_accesses):
+    with open(path, "w") as f:
+        f.write("gem5 started\n")
+        for i in range(num_accesses):
+            tick = 1000 + i * 7 * TICKS_PER_MS
+            op = "ReadReq" if i % 3 else "WriteReq"
+            addr = (i * 5 % 11) << 13
+            f.write(
+                f"{tick}: system.secure_module.mem_side: MEM {op} "
+                f"[{addr:x}:{addr + 63:x}]\n"
+            )
+            if i % 4 == 0:
+                f.write(f"{tick}: system.cpu: unrelated line\n")
+
+
+class TraceAnalyzerTestSuite(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "trace.stdout")
+        _write_trace(self.path, 100)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _single_shard(self):
+        size = os.path.getsize(self.path)
+        init_tick = find_init_tick(self.path)
+        return parse_shard(self.path, 0, size, init_tick)
+
+    def test_shards_are_line_aligned(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        num_shards = 7
+        # some of the evenly spaced offsets fall inside a record
+        self.assertTrue(
+            any(
+                data[size * i // num_shards - 1] != ord("\n")
+                for i in range(1, num_shards)
+            )
+        )
+        shards = find_shards(self.path, num_shards)
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], size)
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1], ord("\n"))
+
+    def test_multi_shard_matches_single_shard(self):
+        expected = self._single_shard()
+        self.assertEqual(sum(w.accesses for w in expected.values()), 100)
+
+        init_tick = find_init_tick(self.path)
+        windows = {}
+        for start, end in find_shards(self.path, 7):
+            _merge(windows, parse_shard(self.path, start, end, init_tick))
+        self.assertEqual(dict(sorted(windows.items())), expected)
+
+    def test_analyze_trace(self):
+        self.assertEqual(
+            analyze_trace(self.path, workers=2), self._single_shard()
+        )
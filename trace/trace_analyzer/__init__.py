@@ -0,0 +1,37 @@
+"""Streaming, multi-process analysis of SecureModule memory traces.
+
+The ``*.stdout`` traces produced by the rowhammer and mem_pipe runs are
+split into byte-range shards which are parsed in a process pool. Each worker
+reduces its shard into per-refresh-window summaries which are merged in the
+parent, so no stage ever holds the full list of accesses in memory.
+
+Traces can also be converted once into a memory mapped columnar format (see
+``columnar.py``) so that re-analyzing them costs no parsing at all.
+
+Run ``python -m trace_analyzer --help`` and
+``python -m trace_analyzer.convert --help`` from the ``trace`` directory for
+the command line interfaces.
+"""
+
+from .analyze import (
+    analyze_trace,
+    analyze_traces,
+)
+from .columnar import (
+    ColumnarTrace,
+    TraceWindow,
+    convert_trace,
+    convert_traces,
+    load_trace,
+)
+from .parse import (
+    DEFAULT_ROW_SHIFT,
+    DEFAULT_WINDOW_TICKS,
+    TICKS_PER_MS,
+    TRACE_PATTERN,
+    WindowSummary,
+    find_init_tick,
+    find_shards,
+    iter_accesses,
+    parse_shard,
+)
@@ -0,0 +1,98 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from .analyze import analyze_traces
+from .parse import (
+    DEFAULT_ROW_SHIFT,
+    TICKS_PER_MS,
+)
+
+parser = argparse.ArgumentParser(
+    prog="trace_analyzer",
+    description="Summarize SecureModule memory traces per refresh window.",
+)
+parser.add_argument(
+    "traces",
+    nargs="+",
+    help="Trace files or glob patterns, e.g. 'runs/*/traces/*.stdout'",
+)
+parser.add_argument(
+    "-j",
+    "--workers",
+    type=int,
+    default=os.cpu_count(),
+    help="Number of worker processes",
+)
+parser.add_argument(
+    "--window-ms",
+    type=int,
+    default=64,
+    help="Length of a refresh window in milliseconds",
+)
+parser.add_argument(
+    "--row-shift",
+    type=int,
+    default=DEFAULT_ROW_SHIFT,
+    help="log2 of the DRAM row size in bytes",
+)
+parser.add_argument(
+    "--trh",
+    type=int,
+    default=250,
+    help="Row hammer threshold used to estimate extra refreshes",
+)
+parser.add_argument(
+    "--top",
+    type=int,
+    default=0,
+    help="Also print the N most activated rows of each window",
+)
+parser.add_argument(
+    "--json",
+    type=str,
+    default=None,
+    help="Write the per-window summaries to this json file",
+)
+args = parser.parse_args()
+
+paths = []
+for pattern in args.traces:
+    matches = sorted(glob.glob(pattern))
+    paths.extend(matches if matches else [pattern])
+
+print(f"INFO: analyzing {len(paths)} trace(s) with {args.workers} workers")
+start = time.time()
+results = analyze_traces(
+    paths,
+    workers=args.workers,
+    window_ticks=args.window_ms * TICKS_PER_MS,
+    row_shift=args.row_shift,
+)
+print(f"INFO: done in {time.time() - start:0.1f}s")
+
+output = {}
+for path, windows in results.items():
+    benchmark = os.path.basename(path).split("_")[0]
+    output[path] = []
+    for w in windows.values():
+        extra_refreshes = w.extra_refreshes(args.trh)
+        print(
+            f"INFO:{benchmark} window {w.window:<4} | "
+            f"accesses {w.accesses:<10} reads {w.reads:<10} "
+            f"writes {w.writes:<10} | rows {w.num_rows:<8} | "
+            f"extra refreshes {extra_refreshes:<8} | "
+            f"duration {w.duration / TICKS_PER_MS:0.2f} ms"
+        )
+        for row, count in w.top_rows(args.top):
+            print(f"    row {row:#x}: {count}")
+        entry = w.to_json()
+        entry["extra_refreshes"] = extra_refreshes
+        output[path].append(entry)
+
+if args.json:
+    with open(args.json, "w") as f:
+        json.dump(output, f, indent=4)
+    print(f"INFO: summaries written to {args.json}")
@@ -0,0 +1,103 @@
+import concurrent.futures
+import os
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+)
+
+from .parse import (
+    DEFAULT_ROW_SHIFT,
+    DEFAULT_WINDOW_TICKS,
+    WindowSummary,
+    find_init_tick,
+    find_shards,
+    parse_shard,
+)
+
+# Shards per worker. More shards than workers keeps the pool busy when some
+# parts of a trace are denser than others.
+_SHARDS_PER_WORKER = 4
+
+
+def _merge(
+    into: Dict[int, WindowSummary], windows: Dict[int, WindowSummary]
+) -> None:
+    for window, summary in windows.items():
+        if window in into:
+            into[window].merge(summary)
+        else:
+            into[window] = summary
+
+
+def analyze_trace(
+    path: str,
+    workers: Optional[int] = None,
+    window_ticks: int = DEFAULT_WINDOW_TICKS,
+    row_shift: int = DEFAULT_ROW_SHIFT,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> Dict[int, WindowSummary]:
+    """Parse a trace in parallel and return its per-window summaries,
+    sorted by window index.
+
+    :param path: The ``*.stdout`` trace to analyze.
+    :param workers: Number of worker processes. Defaults to the CPU count.
+    :param window_ticks: Length of a refresh window in ticks.
+    :param row_shift: log2 of the DRAM row size in bytes.
+    :param executor: An existing executor to submit the shards to. If not
+        given, a process pool is created for this trace.
+    """
+    init_tick = find_init_tick(path)
+    if init_tick is None:
+        return {}
+
+    workers = workers or os.cpu_count()
+    shards = find_shards(path, workers * _SHARDS_PER_WORKER)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            executor.submit(
+                parse_shard,
+                path,
+                start,
+                end,
+                init_tick,
+                window_ticks,
+                row_shift,
+            )
+            for start, end in shards
+        ]
+        windows: Dict[int, WindowSummary] = {}
+        for future in concurrent.futures.as_completed(futures):
+            _merge(windows, future.result())
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return dict(sorted(windows.items()))
+
+
+def analyze_traces(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    window_ticks: int = DEFAULT_WINDOW_TICKS,
+    row_shift: int = DEFAULT_ROW_SHIFT,
+) -> Dict[str, Dict[int, WindowSummary]]:
+    """Analyze several traces, sharing a single process pool between them."""
+    workers = workers or os.cpu_count()
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        for path in paths:
+            results[path] = analyze_trace(
+                path,
+                workers=workers,
+                window_ticks=window_ticks,
+                row_shift=row_shift,
+                executor=executor,
+            )
+    return results
@@ -0,0 +1,246 @@
+"""Compact on-disk columnar format for memory traces.
+
+A converted trace is a directory (by convention ``<trace>.rht``) holding one
+raw little-endian file per column plus a ``meta.json`` describing them:
+
+    tick.bin   uint64  tick of the access
+    op.bin     uint8   index into ``meta["ops"]`` (e.g. ReadReq, WriteReq)
+    start.bin  uint64  start address
+    end.bin    uint64  end address
+
+``meta["window_offsets"]`` holds the index of the first access of every
+refresh window (plus a final entry equal to the number of accesses), so a
+window is a plain slice of each column. Readers open the columns with
+``np.memmap`` and never parse text again.
+"""
+
+import concurrent.futures
+import json
+import os
+from array import array
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+import numpy as np
+
+from .parse import (
+    DEFAULT_WINDOW_TICKS,
+    find_init_tick,
+    iter_accesses,
+)
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+COLUMNS = {
+    "tick": np.dtype("<u8"),
+    "op": np.dtype("u1"),
+    "start": np.dtype("<u8"),
+    "end": np.dtype("<u8"),
+}
+_ARRAY_CODES = {"tick": "Q", "op": "B", "start": "Q", "end": "Q"}
+
+# number of accesses buffered before they are flushed to the column files
+_FLUSH_EVERY = 1 << 20
+
+
+class TraceWindow(NamedTuple):
+    """The accesses of one refresh window. Every field is a view into the
+    memory mapped columns."""
+
+    index: int
+    tick: np.ndarray
+    op: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+
+def convert_trace(
+    path: str,
+    output: Optional[str] = None,
+    window_ticks: int = DEFAULT_WINDOW_TICKS,
+) -> str:
+    """Convert an ASCII ``*.stdout`` trace into the columnar format.
+
+    The trace is streamed once; at most ``_FLUSH_EVERY`` accesses are held in
+    memory at any point.
+
+    :param path: The trace to convert.
+    :param output: The output directory. Defaults to ``<path>.rht``.
+    :param window_ticks: Length of a refresh window in ticks.
+
+    :returns: The output directory.
+    """
+    if output is None:
+        output = os.path.splitext(path)[0] + ".rht"
+    os.makedirs(output, exist_ok=True)
+
+    init_tick = find_init_tick(path)
+    ops: Dict[bytes, int] = {}
+    window_offsets: List[int] = []
+    count = 0
+    current_window = -1
+
+    buffers = {name: array(code) for name, code in _ARRAY_CODES.items()}
+    files = {
+        name: open(os.path.join(output, f"{name}.bin"), "wb")
+        for name in COLUMNS
+    }
+    try:
+        for tick, op, start, end in iter_accesses(path):
+            window = (tick - init_tick) // window_ticks
+            if window != current_window:
+                if window < current_window:
+                    raise ValueError(
+                        f"{path}: ticks are not monotonically increasing "
+                        f"(tick {tick})"
+                    )
+                # windows without any access are empty slices
+                window_offsets.extend([count] * (window - current_window))
+                current_window = window
+            code = ops.get(op)
+            if code is None:
+                if len(ops) == 256:
+                    raise ValueError(f"{path}: too many distinct ops")
+                code = ops[op] = len(ops)
+            buffers["tick"].append(tick)
+            buffers["op"].append(code)
+            buffers["start"].append(start)
+            buffers["end"].append(end)
+            count += 1
+            if count % _FLUSH_EVERY == 0:
+                for name, buf in buffers.items():
+                    buf.tofile(files[name])
+                    del buf[:]
+        for name, buf in buffers.items():
+            buf.tofile(files[name])
+    finally:
+        for f in files.values():
+            f.close()
+
+    window_offsets.append(count)
+    meta = {
+        "version": FORMAT_VERSION,
+        "source": os.path.abspath(path),
+        "count": count,
+        "init_tick": init_tick,
+        "window_ticks": window_ticks,
+        "ops": [op.decode() for op in ops],
+        "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+        "window_offsets": window_offsets,
+    }
+    with open(os.path.join(output, META_FILE), "w") as f:
+        json.dump(meta, f, indent=4)
+    return output
+
+
+def convert_traces(
+    paths: Iterable[str],
+    output_dir: Optional[str] = None,
+    window_ticks: int = DEFAULT_WINDOW_TICKS,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Convert several traces in parallel, one worker process per trace."""
+    paths = list(paths)
+    outputs = [
+        None
+        if output_dir is None
+        else os.path.join(
+            output_dir, os.path.splitext(os.path.basename(p))[0] + ".rht"
+        )
+        for p in paths
+    ]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        return list(
+            executor.map(
+                convert_trace, paths, outputs, [window_ticks] * len(paths)
+            )
+        )
+
+
+class ColumnarTrace:
+    """A memory mapped, read-only view of a converted trace.
+
+    .. code-block:: python
+
+        trace = ColumnarTrace("runs/.../traces/mcf_r_0.rht")
+        for w in trace.windows():
+            rows = w.start >> 13
+            reads = trace.is_read(w.op)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"{path}: unsupported format version {self.meta['version']}"
+            )
+        self.ops = self.meta["ops"]
+        self.init_tick = self.meta["init_tick"]
+        self.window_ticks = self.meta["window_ticks"]
+        self.window_offsets = np.asarray(
+            self.meta["window_offsets"], dtype=np.int64
+        )
+        count = self.meta["count"]
+        for name, dtype in self.meta["columns"].items():
+            if count == 0:
+                column = np.empty(0, dtype=dtype)
+            else:
+                column = np.memmap(
+                    os.path.join(path, f"{name}.bin"),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(count,),
+                )
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def num_windows(self) -> int:
+        return len(self.window_offsets) - 1
+
+    def window(self, index: int) -> TraceWindow:
+        """The accesses of refresh window ``index``."""
+        if index < 0:
+            index += self.num_windows
+        if not 0 <= index < self.num_windows:
+            raise IndexError(f"window {index} out of range")
+        lo, hi = self.window_offsets[index], self.window_offsets[index + 1]
+        return TraceWindow(
+            index,
+            self.tick[lo:hi],
+            self.op[lo:hi],
+            self.start[lo:hi],
+            self.end[lo:hi],
+        )
+
+    def windows(self) -> Iterator[TraceWindow]:
+        for i in range(self.num_windows):
+            yield self.window(i)
+
+    def op_code(self, name: str) -> int:
+        return self.ops.index(name)
+
+    def is_read(self, op: np.ndarray) -> np.ndarray:
+        """Boolean mask of the read accesses in an ``op`` column slice."""
+        codes = [i for i, name in enumerate(self.ops) if "Read" in name]
+        return np.isin(op, codes)
+
+
+def load_trace(path: str) -> ColumnarTrace:
+    """Open a converted trace. ``path`` may also be the original ``.stdout``
+    trace, in which case the ``.rht`` next to it is opened."""
+    if not os.path.isdir(path):
+        path = os.path.splitext(path)[0] + ".rht"
+    return ColumnarTrace(path)
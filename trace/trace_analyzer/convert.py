@@ -0,0 +1,58 @@
+import argparse
+import glob
+import os
+import time
+
+from .columnar import convert_traces
+from .parse import TICKS_PER_MS
+
+parser = argparse.ArgumentParser(
+    prog="trace_analyzer.convert",
+    description="Convert ASCII memory traces to the columnar .rht format.",
+)
+parser.add_argument(
+    "traces",
+    nargs="+",
+    help="Trace files or glob patterns, e.g. 'runs/*/traces/*.stdout'",
+)
+parser.add_argument(
+    "-o",
+    "--output-dir",
+    type=str,
+    default=None,
+    help="Directory for the converted traces. Defaults to next to the input",
+)
+parser.add_argument(
+    "-j",
+    "--workers",
+    type=int,
+    default=os.cpu_count(),
+    help="Number of traces converted in parallel",
+)
+parser.add_argument(
+    "--window-ms",
+    type=int,
+    default=64,
+    help="Length of a refresh window in milliseconds",
+)
+args = parser.parse_args()
+
+paths = []
+for pattern in args.traces:
+    matches = sorted(glob.glob(pattern))
+    paths.extend(matches if matches else [pattern])
+
+if args.output_dir:
+    os.makedirs(args.output_dir, exist_ok=True)
+
+print(f"INFO: converting {len(paths)} trace(s)")
+start = time.time()
+outputs = convert_traces(
+    paths,
+    output_dir=args.output_dir,
+    window_ticks=args.window_ms * TICKS_PER_MS,
+    workers=args.workers,
+)
+for path, output in zip(paths, outputs):
+    print(f"INFO: {path} -> {output}")
+print(f"INFO: done in {time.time() - start:0.1f}s")
@@ -0,0 +1,210 @@
+import os
+import re
+from collections import Counter
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+# gem5 ticks are picoseconds
+TICKS_PER_MS = 10**9
+# a DRAM row must be refreshed every 64ms
+DEFAULT_WINDOW_TICKS = 64 * TICKS_PER_MS
+# 8KB rows
+DEFAULT_ROW_SHIFT = 13
+
+# Matches the memory side lines printed by the (Rh)SecureModule debug flags,
+# e.g. "1234: system.secure_module.mem_side: MEM ReadReq [1f40:1f7f]".
+# The pattern is applied to whole blocks with re.MULTILINE, so the wildcards
+# must never cross a line boundary.
+TRACE_PATTERN = re.compile(
+    rb"^([0-9]+)[^\n]*mem_side[^\n]*MEM[ \t](\w+)[ \t]\[(\w+):(\w+)\]",
+    re.MULTILINE,
+)
+
+# size of the blocks read from disk by the workers
+_BLOCK_SIZE = 64 * 2**20
+
+
+@dataclass
+class WindowSummary:
+    """Mergeable statistics of a single refresh window."""
+
+    window: int
+    accesses: int = 0
+    reads: int = 0
+    writes: int = 0
+    first_tick: Optional[int] = None
+    last_tick: Optional[int] = None
+    rows: Counter = field(default_factory=Counter)
+
+    def add(self, tick: int, is_read: bool, row: int) -> None:
+        self.accesses += 1
+        if is_read:
+            self.reads += 1
+        else:
+            self.writes += 1
+        if self.first_tick is None or tick < self.first_tick:
+            self.first_tick = tick
+        if self.last_tick is None or tick > self.last_tick:
+            self.last_tick = tick
+        self.rows[row] += 1
+
+    def merge(self, other: "WindowSummary") -> "WindowSummary":
+        """Fold ``other`` (the same window seen by another shard) into this
+        summary and return it."""
+        if other.window != self.window:
+            raise ValueError(
+                f"Cannot merge window {other.window} into {self.window}"
+            )
+        self.accesses += other.accesses
+        self.reads += other.reads
+        self.writes += other.writes
+        if other.first_tick is not None:
+            if self.first_tick is None or other.first_tick < self.first_tick:
+                self.first_tick = other.first_tick
+        if other.last_tick is not None:
+            if self.last_tick is None or other.last_tick > self.last_tick:
+                self.last_tick = other.last_tick
+        self.rows.update(other.rows)
+        return self
+
+    @property
+    def duration(self) -> int:
+        """Ticks between the first and last access of the window."""
+        if self.first_tick is None:
+            return 0
+        return self.last_tick - self.first_tick
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.rows)
+
+    def top_rows(self, k: int = 10) -> List[Tuple[int, int]]:
+        """The ``k`` most activated rows as ``(row, count)`` pairs."""
+        return self.rows.most_common(k)
+
+    def extra_refreshes(self, trh: int) -> int:
+        """Refreshes needed if every row is refreshed each time it reaches
+        ``trh`` activations within the window."""
+        return sum(c // trh for c in self.rows.values())
+
+    def to_json(self) -> Dict:
+        return {
+            "window": self.window,
+            "accesses": self.accesses,
+            "reads": self.reads,
+            "writes": self.writes,
+            "first_tick": self.first_tick,
+            "last_tick": self.last_tick,
+            "num_rows": self.num_rows,
+        }
+
+
+def find_shards(path: str, num_shards: int) -> List[Tuple[int, int]]:
+    """Split ``path`` into at most ``num_shards`` ``(start, end)`` byte ranges.
+
+    Every range starts at the beginning of a line and ends just after a
+    newline (or at EOF), so no line is split between two shards.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    num_shards = max(1, min(num_shards, size))
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, num_shards):
+            offset = size * i // num_shards
+            if offset <= boundaries[-1]:
+                continue
+            f.seek(offset)
+            f.readline()  # move to the start of the next line
+            offset = f.tell()
+            if offset >= size:
+                break
+            if offset > boundaries[-1]:
+                boundaries.append(offset)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _iter_blocks(
+    path: str, start: int, end: int, block_size: int = _BLOCK_SIZE
+) -> Iterator[bytes]:
+    """Yield the bytes of ``[start, end)`` in large blocks that always end on
+    a line boundary."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        carry = b""
+        while remaining > 0:
+            data = f.read(min(block_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                carry = data
+                continue
+            carry = data[cut:]
+            yield data[:cut]
+        if carry:
+            yield carry
+
+
+def iter_accesses(
+    path: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[Tuple[int, bytes, int, int]]:
+    """Yield ``(tick, op, start_addr, end_addr)`` for every memory side
+    access in the ``[start, end)`` byte range of a trace."""
+    if end is None:
+        end = os.path.getsize(path)
+    for block in _iter_blocks(path, start, end):
+        for m in TRACE_PATTERN.finditer(block):
+            yield int(m[1]), m[2], int(m[3], 16), int(m[4], 16)
+
+
+def find_init_tick(path: str) -> Optional[int]:
+    """Return the tick of the first memory side access in a trace, which is
+    the origin of the refresh windows. ``None`` if the trace has none."""
+    with open(path, "rb") as f:
+        for line in f:
+            m = TRACE_PATTERN.match(line)
+            if m:
+                return int(m[1])
+    return None
+
+
+def parse_shard(
+    path: str,
+    start: int,
+    end: int,
+    init_tick: int,
+    window_ticks: int = DEFAULT_WINDOW_TICKS,
+    row_shift: int = DEFAULT_ROW_SHIFT,
+) -> Dict[int, WindowSummary]:
+    """Reduce one shard of a trace to per-window summaries.
+
+    This is the unit of work of the process pool, so it only takes and
+    returns picklable values.
+    """
+    windows: Dict[int, WindowSummary] = {}
+    current = None
+    for block in _iter_blocks(path, start, end):
+        for m in TRACE_PATTERN.finditer(block):
+            tick = int(m[1])
+            window = (tick - init_tick) // window_ticks
+            if current is None or current.window != window:
+                current = windows.get(window)
+                if current is None:
+                    current = windows[window] = WindowSummary(window)
+            current.add(tick, b"Read" in m[2], int(m[3], 16) >> row_shift)
+    return windows
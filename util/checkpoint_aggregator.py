@@ -29,9 +29,20 @@
 import gzip
 import os
 import re
+import shutil
 import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from configparser import ConfigParser
 
+PAGE_SIZE = 1 << 12
+PMEM_FILE = "system.physmem.store0.pmem"
+
+# memory is streamed in blocks of this size
+BLOCK_SIZE = 16 << 20
+# size of the zero run held by each gzip member of the padding
+ZERO_RUN_SIZE = 256 << 20
+
 
 class myCP(ConfigParser):
     def __init__(self):
@@ -41,28 +52,103 @@ class myCP(ConfigParser):
         return optionstr
 
 
-def aggregate(output_dir, cpts, no_compress, memory_size):
+def _copy_pages(src, dst, offset, size, compress_level):
+    """Copy the first size bytes of the (compressed) memory image src into
+    dst. If compress_level is None, dst is the uncompressed output image and
+    the data is written at offset, leaving all-zero blocks as holes.
+    Otherwise dst is a new file holding the data as one gzip member, to be
+    concatenated with the others."""
+    sparse = compress_level is None
+    zero_block = bytes(BLOCK_SIZE)
+    with gzip.open(src, "rb") as gf:
+        if sparse:
+            out = open(dst, "r+b")
+            out.seek(offset)
+        else:
+            out = gzip.GzipFile(
+                dst, mode="wb", compresslevel=compress_level, mtime=0
+            )
+        with out:
+            remaining = size
+            while remaining:
+                block = gf.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    raise ValueError(
+                        f"{src} holds {size - remaining} bytes, "
+                        f"{size} expected"
+                    )
+                remaining -= len(block)
+                if sparse and block == zero_block[: len(block)]:
+                    # the file was truncated to its full size, skipping
+                    # the block leaves a hole that reads back as zeros
+                    out.seek(len(block), os.SEEK_CUR)
+                else:
+                    out.write(block)
+    return size
+
+
+def _zero_member(size, level):
+    """A complete gzip member holding size zero bytes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    chunks = []
+    zero_block = bytes(min(size, BLOCK_SIZE))
+    remaining = size
+    while remaining:
+        n = min(remaining, len(zero_block))
+        chunks.append(compressor.compress(zero_block[:n]))
+        remaining -= n
+    chunks.append(compressor.flush())
+    return b"".join(chunks)
+
+
+def _write_padding(out, size, compress_level):
+    """Append size zero bytes to the compressed output. Concatenated gzip
+    members are a valid gzip stream, so one compressed zero run is simply
+    repeated instead of compressing all of the padding."""
+    if size <= 0:
+        return
+    full, rest = divmod(size, ZERO_RUN_SIZE)
+    if full:
+        run = _zero_member(ZERO_RUN_SIZE, compress_level)
+        for _ in range(full):
+            out.write(run)
+    if rest:
+        out.write(_zero_member(rest, compress_level))
+
+
+def aggregate(
+    output_dir, cpts, no_compress, memory_size, jobs=None, compress_level=6
+):
+    """Merge the checkpoints in cpts into a single checkpoint in output_dir,
+    one process per checkpoint. The memory images are placed one after the
+    other and padded with zeros up to memory_size bytes.
+
+    The memory images are decompressed (and, unless no_compress is set,
+    compressed again) in parallel by jobs worker processes. The uncompressed
+    image is a sparse file, zero pages take no disk space and it can be
+    mmapped as is.
+    """
     merged_config = None
     page_ptr = 0
 
     output_path = output_dir
-    if not os.path.isdir(output_path):
-        os.system("mkdir -p " + output_path)
+    os.makedirs(output_path, exist_ok=True)
 
-    agg_mem_file = open(output_path + "/system.physmem.store0.pmem", "wb+")
-    agg_config_file = open(output_path + "/m5.cpt", "wb+")
-
-    if not no_compress:
-        merged_mem = gzip.GzipFile(fileobj=agg_mem_file, mode="wb")
+    agg_mem_path = os.path.join(output_path, PMEM_FILE)
+    agg_config_file = open(output_path + "/m5.cpt", "w")
 
     max_curtick = 0
     num_digits = len(str(len(cpts) - 1))
 
+    # (checkpoint, first page, number of pages) of every memory image
+    images = []
+
     for i, arg in enumerate(cpts):
         print(arg)
         merged_config = myCP()
         config = myCP()
-        config.readfp(open(cpts[i] + "/m5.cpt"))
+        with open(cpts[i] + "/m5.cpt") as f:
+            config.read_file(f)
 
         for sec in config.sections():
             if re.compile("cpu").search(sec):
@@ -73,13 +159,15 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
                 for item in items:
                     if item[0] == "paddr":
                         merged_config.set(
-                            newsec, item[0], int(item[1]) + (page_ptr << 12)
+                            newsec,
+                            item[0],
+                            str(int(item[1]) + (page_ptr << 12)),
                         )
                         continue
                     merged_config.set(newsec, item[0], item[1])
 
                 if re.compile("workload.FdMap256$").search(sec):
-                    merged_config.set(newsec, "M5_pid", i)
+                    merged_config.set(newsec, "M5_pid", str(i))
 
             elif sec == "system":
                 pass
@@ -98,37 +186,51 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
 
         ### memory stuff
         pages = int(config.get("system", "pagePtr"))
+        images.append((cpts[i] + "/" + PMEM_FILE, page_ptr, pages))
         page_ptr = page_ptr + pages
         print("pages to be read: ", pages)
 
-        f = open(cpts[i] + "/system.physmem.store0.pmem", "rb")
-        gf = gzip.GzipFile(fileobj=f, mode="rb")
+    merged_config.add_section("system")
+    merged_config.set("system", "pagePtr", str(page_ptr))
+    merged_config.set("system", "nextPID", str(len(cpts)))
 
-        x = 0
-        while x < pages:
-            bytesRead = gf.read(1 << 12)
-            if not no_compress:
-                merged_mem.write(bytesRead)
-            else:
-                agg_mem_file.write(bytesRead)
-            x += 1
+    data_size = page_ptr * PAGE_SIZE
+    file_size = data_size
+    if memory_size is not None and memory_size > file_size:
+        # pad to a whole number of pages, like the checkpointed memory
+        page_ptr = -(-memory_size // PAGE_SIZE)
+        file_size = page_ptr * PAGE_SIZE
 
-        gf.close()
-        f.close()
+    if no_compress:
+        with open(agg_mem_path, "wb") as f:
+            # sparse: the padding and all-zero pages are holes
+            f.truncate(file_size)
+        targets = [agg_mem_path] * len(images)
+    else:
+        targets = [f"{agg_mem_path}.part{i}" for i in range(len(images))]
 
-    merged_config.add_section("system")
-    merged_config.set("system", "pagePtr", page_ptr)
-    merged_config.set("system", "nextPID", len(cpts))
-
-    file_size = page_ptr * 4 * 1024
-    dummy_data = "".zfill(4096)
-    while file_size < memory_size:
-        if not no_compress:
-            merged_mem.write(dummy_data)
-        else:
-            agg_mem_file.write(dummy_data)
-        file_size += 4 * 1024
-        page_ptr += 1
+    with ProcessPoolExecutor(jobs) as executor:
+        futures = [
+            executor.submit(
+                _copy_pages,
+                src,
+                dst,
+                first_page * PAGE_SIZE,
+                pages * PAGE_SIZE,
+                None if no_compress else compress_level,
+            )
+            for (src, first_page, pages), dst in zip(images, targets)
+        ]
+        for future in futures:
+            future.result()
+
+    if not no_compress:
+        with open(agg_mem_path, "wb") as out:
+            for part in targets:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, BLOCK_SIZE)
+                os.remove(part)
+            _write_padding(out, file_size - data_size, compress_level)
 
     print("WARNING: ")
     print(
@@ -136,19 +238,14 @@ def aggregate(output_dir, cpts, no_compress, memory_size):
     )
     print(page_ptr, "x 4K of memory")
     merged_config.set(
-        "system.physmem.store0", "range_size", page_ptr * 4 * 1024
+        "system.physmem.store0", "range_size", str(page_ptr * PAGE_SIZE)
     )
 
     merged_config.add_section("Globals")
-    merged_config.set("Globals", "curTick", max_curtick)
+    merged_config.set("Globals", "curTick", str(max_curtick))
 
     merged_config.write(agg_config_file)
-
-    if not no_compress:
-        merged_mem.close()
-        agg_mem_file.close()
-    else:
-        agg_mem_file.close()
+    agg_config_file.close()
 
 
 if __name__ == "__main__":
@@ -161,9 +258,29 @@ if __name__ == "__main__":
     parser.add_argument(
         "-o", "--output-dir", action="store", help="Output directory"
     )
-    parser.add_argument("-c", "--no-compress", action="store_true")
+    parser.add_argument(
+        "-c",
+        "--no-compress",
+        action="store_true",
+        help="Write an uncompressed, sparse memory image",
+    )
     parser.add_argument("--cpts", nargs="+")
     parser.add_argument("--memory-size", action="store", type=int)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=6,
+        choices=range(1, 10),
+        metavar="[1-9]",
+        help="gzip compression level of the memory image (default: 6)",
+    )
 
     # Assume x86 ISA.  Any other ISAs would need extra stuff in this script
     # to appropriately parse their page tables and understand page sizes.
@@ -180,4 +297,6 @@ if __name__ == "__main__":
         options.cpts,
         options.no_compress,
         options.memory_size,
+        jobs=options.jobs,
+        compress_level=options.compress_level,
     )
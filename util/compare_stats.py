@@ -0,0 +1,121 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Compare a stat across the runs of a sweep, as a table of one parameter by
+another.
+
+Usage
+-----
+
+```sh
+# IPC of every benchmark by read_issue_latency
+python3 util/compare_stats.py runs/sweep system.switch_cpus.ipc \
+    --index benchmark --columns read_issue_latency
+# the same, relative to the runs without read latency
+python3 util/compare_stats.py runs/sweep system.switch_cpus.ipc \
+    --index benchmark --columns read_issue_latency \
+    --baseline read_issue_latency=0
+# total DRAM bandwidth: the sum of the stats matching a regex
+python3 util/compare_stats.py runs/sweep '.*dram\.bwTotal::total' --sum \
+    --index benchmark --columns read_issue_latency
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), os.pardir, "src", "python")
+)
+
+from m5.ext.pystats.stats_table import read_runs
+
+
+def _param(text):
+    name, _, value = text.partition("=")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return name, value
+
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+parser.add_argument("roots", nargs="+", help="Directories to search.")
+parser.add_argument("stat", help="The stat name, as in stats.txt.")
+parser.add_argument(
+    "--sum",
+    action="store_true",
+    help="Treat the stat as a regular expression and sum the matching stats.",
+)
+parser.add_argument(
+    "--index", required=True, help="The parameter of the table rows."
+)
+parser.add_argument(
+    "--columns", required=True, help="The parameter of the table columns."
+)
+parser.add_argument(
+    "--where",
+    nargs="+",
+    type=_param,
+    default=[],
+    metavar="PARAM=VALUE",
+    help="Only the runs with these parameter values.",
+)
+parser.add_argument(
+    "--baseline",
+    nargs="+",
+    type=_param,
+    default=[],
+    metavar="PARAM=VALUE",
+    help="Show the stat relative to the runs with these parameter values.",
+)
+parser.add_argument(
+    "--dump", type=int, default=-1, help="The stats dump to use."
+)
+parser.add_argument(
+    "-j", "--jobs", type=int, default=None, help="Parallel parsers."
+)
+
+args = parser.parse_args()
+
+runs = read_runs(
+    args.roots, stats=args.stat, dump=args.dump, workers=args.jobs
+).where(**dict(args.where))
+values = runs.sum(args.stat) if args.sum else args.stat
+if args.baseline:
+    values = runs.relative(values, **dict(args.baseline))
+
+rows, columns, table = runs.pivot(
+    values, index=args.index, columns=args.columns
+)
+width = max([len(str(r)) for r in rows] + [len(args.index)])
+print(f"{args.index:<{width}}" + "".join(f" {str(c):>12}" for c in columns))
+for row, line in zip(rows, table):
+    print(f"{str(row):<{width}}" + "".join(f" {v:>12.4g}" for v in line))
@@ -0,0 +1,120 @@
+# Copyright (c) 2024 The Regents of The University of California
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met: redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer;
+# redistributions in binary form must reproduce the above copyright
+# notice, this list of conditions and the following disclaimer in the
+# documentation and/or other materials provided with the distribution;
+# neither the name of the copyright holders nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Harvest the stats of gem5 run directories into a SQLite database and query
+them. Only run directories whose stats changed since the last harvest are
+parsed.
+
+Usage
+-----
+
+```sh
+# index (or update the index of) every run under runs/
+python3 util/harvest_stats.py runs/stats.db harvest runs/
+# IPC of every mcf_r run, by read_issue_latency
+python3 util/harvest_stats.py runs/stats.db query system.switch_cpus.ipc \
+    --by read_issue_latency --where benchmark=mcf_r
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), os.pardir, "src", "python")
+)
+
+from m5.ext.pystats.harvester import Harvester
+
+
+def _param(text):
+    name, _, value = text.partition("=")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return name, value
+
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+parser.add_argument("database", help="The SQLite database file.")
+parser.add_argument(
+    "--stat",
+    action="append",
+    help="Regular expression of the stats to keep (repeatable). Defaults to "
+    "the selection the database was harvested with, or all stats.",
+)
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+harvest_parser = subparsers.add_parser(
+    "harvest", help="Index run directories."
+)
+harvest_parser.add_argument("roots", nargs="+", help="Directories to search.")
+harvest_parser.add_argument(
+    "-j", "--jobs", type=int, default=None, help="Parallel parsers."
+)
+harvest_parser.add_argument(
+    "--prune",
+    action="store_true",
+    help="Forget runs whose stats file no longer exists.",
+)
+
+query_parser = subparsers.add_parser("query", help="Query a stat.")
+query_parser.add_argument("name", help="The stat name, as in stats.txt.")
+query_parser.add_argument(
+    "--by", nargs="+", default=[], help="Parameters to group the runs by."
+)
+query_parser.add_argument(
+    "--where",
+    nargs="+",
+    type=_param,
+    default=[],
+    metavar="PARAM=VALUE",
+    help="Only the runs with these parameter values.",
+)
+query_parser.add_argument(
+    "--dump", type=int, default=-1, help="The stats dump to use."
+)
+
+args = parser.parse_args()
+
+with Harvester(
+    args.database, stats=args.stat, workers=getattr(args, "jobs", None)
+) as harvester:
+    if args.command == "harvest":
+        summary = harvester.harvest(args.roots, prune=args.prune)
+        print(
+            f"{summary.added} added, {summary.updated} updated, "
+            f"{summary.unchanged} unchanged, {summary.removed} removed"
+        )
+    else:
+        for row in harvester.query(
+            args.name, by=args.by, dump=args.dump, **dict(args.where)
+        ):
+            print("\t".join(str(v) for v in row))